@@ -72,6 +72,13 @@ class AMRControlPanel:
     def set_client(self, client): self._client = client
     def get_client(self): return self._client
 
+    def set_target_node(self, node_name: str):
+        """외부(미니맵 클릭 등)에서 Target Node 지정. Cancel/Pause/Resume 처럼 노드를 안 쓰는 명령이면 무시."""
+        if not node_name or self._current_command_label() not in ("Move", "Rack Move"):
+            return
+        self._node.set_value(str(node_name))
+        print(f"[AMRControl] Map 선택 → Target Node = {node_name}")
+
     # ───────── AMR 리스트 갱신 (AMRInfo 수신마다 호출) ─────────
     def update_amr_list(self, items: Iterable[Dict[str, Any]] | Dict[str, Dict[str, Any]]):
         # 1) 수신 → id 추출 & 미션코드 캐시
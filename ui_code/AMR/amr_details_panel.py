@@ -3,6 +3,7 @@ import omni.ui as ui
 from omni.ui import dock_window_in_window, DockPosition
 
 from ui_code.ui.utils.common import _fill, ASSET_DIR, _fmt_status, _fmt_lift
+from ui_code.ui.utils import binding
 
 # ABGR 색상
 _COL_TEXT    = 0xFFFFFFFF
@@ -36,6 +37,7 @@ class AMRPanel:
         # 위젯 참조
         self._bbar: Optional[ui.ProgressBar] = None
         self._status_dot: Optional[ui.Label] = None
+        self._batt_col: Optional[int] = None
         self._resolver: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None
     # UI
     def show(self, amr_id: Optional[str] = None):
@@ -123,6 +125,9 @@ class AMRPanel:
         if   v >= 0.70: col = _COL_GREEN
         elif v >= 0.20: col = _COL_ORANGE
         else:           col = _COL_RED
+        if col == self._batt_col:
+            return
+        self._batt_col = col
 
         # 문서 스타일 우선 → 폴백 순서대로 적용
         self._apply_progress_style({"color": col})
@@ -138,7 +143,7 @@ class AMRPanel:
         else:
             col = _COL_DOT_WORKING
         try:
-            self._status_dot.style = {"color": col, "font_size": 16}
+            binding.set_style(self._status_dot, {"color": col, "font_size": 16})
         except Exception:
             pass
 
@@ -151,30 +156,31 @@ class AMRPanel:
             return default
 
         rid = g("robotId", "amrId")
-        if rid:
+        if rid and self._selected_id.as_string != str(rid):
             self._selected_id.set_value(str(rid))
 
         status_fmt = _fmt_status(g("status", "robotStatus", "state"))
         lift_fmt   = _fmt_lift(g("liftStatus", "lift_state"))
-        self._m_status.set_value(status_fmt)
-        self._m_lift.set_value(lift_fmt)
+        binding.set_value(self._m_status, status_fmt)
+        binding.set_value(self._m_lift, lift_fmt)
         self._sync_status_dot(status_fmt)
 
-        self._m_rack.set_value(str(g("containerCode", "palletCode", "container", "rack") or "-"))
-        self._m_mission.set_value(str(g("missionCode", "workingType", "missionType", "mission") or "-"))
-        self._m_node.set_value(str(g("nodeCode") or "-"))
+        binding.set_value(self._m_rack, str(g("containerCode", "palletCode", "container", "rack") or "-"))
+        binding.set_value(self._m_mission, str(g("missionCode", "workingType", "missionType", "mission") or "-"))
+        binding.set_value(self._m_node, str(g("nodeCode") or "-"))
 
         x = g("x"); y = g("y"); th = g("robotOrientation", "theta", "yaw")
         if x is None or y is None:
-            self._m_pos.set_value("-")
+            binding.set_value(self._m_pos, "-")
         else:
             try:
-                self._m_pos.set_value(
+                binding.set_value(
+                    self._m_pos,
                     f"({float(x):.2f}, {float(y):.2f})  Rotate={float(th):.1f}°" if th is not None
                     else f"({float(x):.2f}, {float(y):.2f})"
                 )
             except Exception:
-                self._m_pos.set_value(f"({x}, {y})")
+                binding.set_value(self._m_pos, f"({x}, {y})")
 
         batt = g("batteryLevel", "battery", "batteryPercent") or 0
         try:
@@ -183,7 +189,7 @@ class AMRPanel:
             batt = 0.0
         if batt > 1.0:
             batt /= 100.0
-        self._m_batt.set_value(max(0.0, min(1.0, batt)))
+        binding.set_value(self._m_batt, max(0.0, min(1.0, batt)))
         self._sync_batt_color()
 
     # 선택만 바꾸고 열기
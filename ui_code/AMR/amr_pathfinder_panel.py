@@ -1,20 +1,44 @@
 # amr_pathfinder_panel.py
 # Kit 107.3 호환 (ui.MouseArea 미사용)
-# - 미니맵: 고정 Frame + 내부 수동 드로잉
+# - 미니맵: RasterCanvas 이미지 1장(ui.ImageWithProvider)
+#   · 노드/엣지는 배율 레벨(최대 줌 ÷ 2^k)별로 전체 맵을 1회 래스터화(백그라운드 워밍업)
+#     → 팬/줌은 가장 가까운 더 고해상도 레벨에서 화면 크기만큼 인덱스 샘플링만
+#   · 로봇은 매 합성 때 점으로 덧그림. 합성은 요청을 모아 UI 프레임당 최대 1회
 # - 마우스 휠: 확대/축소(커서 기준 줌, 다양한 콜백 시그니처 대응)
-# - 좌클릭 드래그: 팬(상/하/좌/우)
+# - 좌클릭 드래그: 팬(상/하/좌/우), 좌클릭(이동 없이): 가장 가까운 노드 선택 → node pick 핸들러
+# - 노드/엣지 공간 인덱스(균일 격자)는 맵 로드 시 1회 생성 → 사각형/최근접/엣지 스냅 질의
 # - 줌/리셋 버튼 제거, 스크롤바 미사용
 # - 로봇 좌표는 resolver(권장) 또는 기본 HTTP (mm→m 자동 보정)
 
 import json
+import math
 import os
 import threading
 import time
 from typing import Callable, Dict, List, Optional, Tuple
 
+import numpy as np
 import requests
+import omni.kit.app as kit_app
 import omni.ui as ui
 
+from ui_code.ui.components.raster_canvas import RasterCanvas
+from ui_code.ui.utils.spatial_index import SpatialGrid
+
+# 미니맵 색(RGBA)
+_MAP_BG       = (30, 30, 30, 255)
+_EDGE_RGBA    = (106, 106, 106, 255)
+_NODE_RGBA    = (207, 207, 207, 255)
+_ROBOT_RGBA   = (255, 184, 34, 255)
+_ROBOT_BORDER = (102, 62, 13, 255)
+_FRAME_RGBA   = (90, 90, 90, 255)
+_PICK_RGBA    = (80, 200, 255, 255)
+
+_PICK_RADIUS_PX = 12.0   # 클릭 → 노드 선택 허용 반경(화면 px)
+_CLICK_SLOP_PX = 4.0     # 눌렀다 뗄 때 이 이상 움직였으면 드래그(선택 안 함)
+
+_STATIC_LEVELS = 4   # 정적 레이어 배율 단계 수: 최대 배율 ÷ 1, 2, 4, 8 (합계 ≈ 최대 배율 1장의 4/3)
+
 
 class PathFinderPanel:
     TITLE = "AMR Path Finder"
@@ -46,9 +70,15 @@ class PathFinderPanel:
 
         # 데이터
         self._nodes: List[Tuple[float, float]] = []
+        self._node_labels: List[Optional[str]] = []   # _nodes 와 같은 순서
         self._edges: List[Tuple[Tuple[float, float], Tuple[float, float]]] = []
         self._robots: List[Tuple[float, float]] = []
         self._robots_lock = threading.Lock()
+        self._node_xy = np.zeros((0, 2), dtype=np.float32)   # 래스터화용 배열(로드 시 1회)
+        self._edge_xy = np.zeros((0, 4), dtype=np.float32)
+        self._index = SpatialGrid()                           # 노드/엣지 공간 인덱스(로드 시 1회)
+        self._picked: Optional[Tuple[str, float, float]] = None   # (label, x, y)
+        self._node_pick_handler: Optional[Callable[[str], None]] = None
 
         # 맵 파일 경로
         self._map_json_path = self._resolve_map_path(map_json_path)
@@ -56,6 +86,13 @@ class PathFinderPanel:
         # 미니맵/뷰 상태
         self._viewport_height = int(viewport_height)
         self._minimap_frame: Optional[ui.Frame] = None
+        self._canvas: Optional[RasterCanvas] = None
+        self._static_cache: Dict[float, np.ndarray] = {}   # 레벨 배율(px/m) → RGBA
+        self._static_lock = threading.Lock()
+        self._warm_thread: Optional[threading.Thread] = None
+        self._static_gen = 0   # 맵 다시 읽으면 증가 → 이전 워밍업 결과는 버림
+        self._map_dirty = False
+        self._tick_sub = None
 
         self._px_base = float(px_per_world)
         self._zoom = 1.0          # 0.3 ~ 3.0
@@ -69,6 +106,8 @@ class PathFinderPanel:
         # 드래그 상태
         self._dragging = False
         self._drag_last_xy: Tuple[float, float] = (0.0, 0.0)
+        self._press_xy: Optional[Tuple[float, float]] = None
+        self._overlay = None
 
         # 로봇 폴링
         self._poll_interval = 1.0
@@ -113,6 +152,8 @@ class PathFinderPanel:
             self._build_ui()
         self._win.visible = True
         self._win.focus()
+        self._subscribe_tick()
+        self._warm_static_levels()
         if self._poll_thread is None:
             self._start_robot_polling()
 
@@ -120,6 +161,38 @@ class PathFinderPanel:
         """외부(예: bottom_bar)에서 최신 AMR 좌표를 공급할 수 있음."""
         self._robot_resolver = fn
 
+    def set_node_pick_handler(self, fn: Optional[Callable[[str], None]]):
+        """미니맵 클릭으로 노드가 선택되면 fn(nodeLabel) 호출(예: AMR Control 의 Target Node 채우기)."""
+        self._node_pick_handler = fn
+
+    def nearest_node(self, x: float, y: float,
+                     max_dist: float = math.inf) -> Optional[Tuple[str, float, float]]:
+        """월드 좌표(m) 에서 가장 가까운 라벨 있는 노드 (label, x, y). 없으면 None."""
+        k = 1
+        while True:
+            idx, _ = self._index.nearest(x, y, k=k, max_dist=max_dist)
+            for i in idx:
+                label = self._node_labels[int(i)]
+                if label is not None:
+                    nx, ny = self._nodes[int(i)]
+                    return label, nx, ny
+            if len(idx) < k:
+                return None
+            k *= 4   # 라벨 없는 노드만 걸렸을 때만 넓힘
+
+    def nodes_in_rect(self, x0: float, y0: float, x1: float, y1: float) -> List[int]:
+        """사각형(월드 m) 안의 노드 인덱스(_nodes 기준)."""
+        return self._index.query_rect(x0, y0, x1, y1).tolist()
+
+    def snap_to_edge(self, x: float, y: float,
+                     max_dist: float = math.inf) -> Optional[Tuple[float, float, float]]:
+        """가장 가까운 엣지 위의 점 (x, y, 거리). 로봇 위치 보정 등에 사용."""
+        hit = self._index.snap(x, y, max_dist=max_dist)
+        if hit is None:
+            return None
+        _, px, py, _, d = hit
+        return px, py, d
+
     # ----------------------- UI Build -------------------------
     def _build_ui(self):
         self._win = ui.Window(self.TITLE, width=720, height=660)
@@ -205,6 +278,8 @@ class PathFinderPanel:
 
     # ----------------------- Map / Robots ---------------------
     def _load_map(self):
+        self._nodes, self._node_labels, self._edges = [], [], []
+        self._picked = None
         try:
             if not os.path.exists(self._map_json_path):
                 self._set(f"[MAP] not found: {self._map_json_path}")
@@ -223,6 +298,7 @@ class PathFinderPanel:
                     y = float(n.get("yCoordinate"))
                     self._nodes.append((x, y))
                     label = n.get("nodeLabel")
+                    self._node_labels.append(str(label) if label is not None else None)
                     if label is not None:
                         label_to_xy[label] = (x, y)
 
@@ -235,6 +311,13 @@ class PathFinderPanel:
                     if abs(a[0] - b[0]) < 1e-6 or abs(a[1] - b[1]) < 1e-6:
                         self._edges.append((a, b))
 
+            self._node_xy = np.array(self._nodes, dtype=np.float32).reshape(-1, 2)
+            self._edge_xy = np.array([(a[0], a[1], b[0], b[1]) for a, b in self._edges],
+                                     dtype=np.float32).reshape(-1, 4)
+            self._index = SpatialGrid(self._node_xy, self._edge_xy)
+            with self._static_lock:
+                self._static_cache.clear()
+                self._static_gen += 1
             self._set(f"[MAP] nodes={len(self._nodes)} edges={len(self._edges)} loaded ({os.path.basename(self._map_json_path)})")
         except Exception as e:
             self._set(f"[ERR load map] {e}")
@@ -264,8 +347,10 @@ class PathFinderPanel:
                     fn = self._robot_resolver or self._default_robot_resolver
                     pts = fn() or []
                     with self._robots_lock:
+                        changed = pts != self._robots
                         self._robots = pts
-                    self._rebuild_minimap()
+                    if changed:
+                        self._request_redraw()
                 except Exception:
                     pass
                 time.sleep(self._poll_interval)
@@ -367,12 +452,36 @@ class PathFinderPanel:
         return max(2.0, self._px_base * self._zoom)
 
     def _rebuild_minimap(self):
+        """위젯 재구성(창 크기 변경 시). 팬/줌/로봇 갱신은 _request_redraw()."""
         if self._minimap_frame:
             try:
                 self._minimap_frame.rebuild()
             except Exception:
                 pass
 
+    def _request_redraw(self):
+        """다음 UI 프레임에 1회 합성(마우스 이동/폴링이 몰려도 프레임당 1번)."""
+        self._map_dirty = True
+
+    def _subscribe_tick(self):
+        if self._tick_sub is None:
+            stream = kit_app.get_app().get_update_event_stream()
+            self._tick_sub = stream.create_subscription_to_pop(self._on_tick, name="pathfinder-minimap")
+
+    def _on_tick(self, _e):
+        cv = self._canvas
+        if not self._minimap_frame or cv is None:
+            return
+        try:
+            rect_w, rect_h = self._get_minimap_rect()
+            if rect_w >= 1 and rect_h >= 1 and (int(rect_w), int(rect_h)) != (cv.width, cv.height):
+                self._rebuild_minimap()
+                return
+            if self._map_dirty:
+                self._redraw_minimap()
+        except Exception as e:
+            print("[PathFinderPanel] minimap redraw failed:", e)
+
     def _get_minimap_rect(self) -> Tuple[float, float]:
         try:
             if self._minimap_frame:
@@ -387,6 +496,92 @@ class PathFinderPanel:
             return
 
         rect_w, rect_h = self._get_minimap_rect()
+        if rect_w < 1 or rect_h < 1:   # 첫 레이아웃 전
+            rect_w, rect_h = 720.0, float(self._viewport_height)
+        w, h = int(rect_w), int(rect_h)
+        self._canvas = RasterCanvas(w, h, background=_MAP_BG)
+
+        with ui.ZStack():
+            ui.ImageWithProvider(self._canvas.provider, width=w, height=h)
+
+            # 입력 오버레이(투명)
+            self._create_input_overlay(width=w, height=h)
+        self._redraw_minimap()
+
+    def _static_levels(self) -> List[float]:
+        """정적 레이어 배율(px/m), 고해상도 → 저해상도."""
+        top = self._px_base * 3.0
+        return [top / (2 ** k) for k in range(_STATIC_LEVELS)]
+
+    def _render_static(self, level: float, node_xy: np.ndarray, edge_xy: np.ndarray) -> np.ndarray:
+        """노드/엣지 전체를 level(px/m) 로 래스터화한 RGBA. 좌상단 = (X_MIN, Y_MAX). UI 의존 없음."""
+        t0 = time.perf_counter()
+        w = int(math.ceil((self.X_MAX - self.X_MIN) * level)) + 1
+        h = int(math.ceil((self.Y_MAX - self.Y_MIN) * level)) + 1
+        cv = RasterCanvas(w, h, provider=False, background=_MAP_BG)
+        e = edge_xy
+        if len(e):
+            cv.lines((e[:, 0] - self.X_MIN) * level, (self.Y_MAX - e[:, 1]) * level,
+                     (e[:, 2] - self.X_MIN) * level, (self.Y_MAX - e[:, 3]) * level,
+                     _EDGE_RGBA, thickness=2)
+        n = node_xy
+        if len(n):
+            cv.fill_circles((n[:, 0] - self.X_MIN) * level, (self.Y_MAX - n[:, 1]) * level, 2.0, _NODE_RGBA)
+        print(f"[PathFinderPanel] static layer {w}x{h} @ {level:.1f}px/m in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        return cv.buf
+
+    def _warm_static_levels(self):
+        """전 레벨을 백그라운드에서 미리 래스터화(저해상도부터 → 첫 화면이 빨리 뜸). UI 스레드는 그리지 않음."""
+        if self._warm_thread is not None and self._warm_thread.is_alive():
+            return
+        with self._static_lock:
+            gen = self._static_gen
+            node_xy, edge_xy = self._node_xy, self._edge_xy
+
+        def _warm():
+            for level in reversed(self._static_levels()):
+                with self._static_lock:
+                    if gen != self._static_gen:
+                        return   # 맵이 바뀜: 새 워밍업이 이어받음
+                    if level in self._static_cache:
+                        continue
+                img = self._render_static(level, node_xy, edge_xy)
+                with self._static_lock:
+                    if gen != self._static_gen:
+                        return
+                    self._static_cache[level] = img
+                self._request_redraw()
+
+        self._warm_thread = threading.Thread(target=_warm, daemon=True)
+        self._warm_thread.start()
+
+    def _static_for(self, scale: float) -> Optional[Tuple[float, np.ndarray]]:
+        """
+        scale 이상인 레벨 중 가장 낮은 것(축소 샘플링 비율 < 2 → 2px 엣지가 끊기지 않음).
+        아직 없으면 워밍업을 (재)시작하고, 있는 레벨 중 가장 가까운 것으로 임시 표시.
+        하나도 없으면 None(배경만) — 레벨이 생길 때마다 워밍업 스레드가 다시 합성 요청.
+        """
+        levels = self._static_levels()
+        want = min((l for l in levels if l >= scale - 1e-6), default=levels[0])
+        with self._static_lock:
+            img = self._static_cache.get(want)
+            if img is not None:
+                return want, img
+        self._warm_static_levels()
+        with self._static_lock:
+            if not self._static_cache:
+                return None
+            level = min(self._static_cache, key=lambda l: abs(math.log(l / scale)))
+            return level, self._static_cache[level]
+
+    def _redraw_minimap(self):
+        """정적 레이어 잘라 붙이기 + 로봇 점 + 테두리 → 업로드."""
+        cv = self._canvas
+        if cv is None:
+            return
+        self._map_dirty = False
+
+        rect_w, rect_h = float(cv.width), float(cv.height)
         pad = 12.0
         scale = self._px()
 
@@ -397,77 +592,50 @@ class PathFinderPanel:
         # 팬 보정(월드 경계 내)
         self._clamp_pan(view_world_w, view_world_h)
 
-        with ui.ZStack():
-            ui.Rectangle(style={"background_color": 0xFF1E1E1E})
-
-            # 화면 경계에 걸치는 것만 그리도록 간단 클리핑
-            vx1, vx2 = self._pan_x, self._pan_x + view_world_w
-            vy1, vy2 = self._pan_y, self._pan_y + view_world_h
-
-            # 엣지
-            edge_thick = 2
-            for (a, b) in self._edges:
-                if not (min(a[0], b[0]) <= vx2 and max(a[0], b[0]) >= vx1 and
-                        min(a[1], b[1]) <= vy2 and max(a[1], b[1]) >= vy1):
-                    continue
-                sx1, sy1 = self._world_to_screen(a[0], a[1], rect_w, rect_h, pad, scale)
-                sx2, sy2 = self._world_to_screen(b[0], b[1], rect_w, rect_h, pad, scale)
-                if abs(a[0] - b[0]) < 1e-6:
-                    top = min(sy1, sy2)
-                    height = int(abs(sy2 - sy1)) or 1
-                    with ui.Placer(offset_x=int(sx1 - edge_thick // 2), offset_y=int(top)):
-                        ui.Rectangle(width=edge_thick, height=height,
-                                     style={"background_color": 0xFF6A6A6A})
-                elif abs(a[1] - b[1]) < 1e-6:
-                    left = min(sx1, sx2)
-                    width = int(abs(sx2 - sx1)) or 1
-                    with ui.Placer(offset_x=int(left), offset_y=int(sy1 - edge_thick // 2)):
-                        ui.Rectangle(width=width, height=edge_thick,
-                                     style={"background_color": 0xFF6A6A6A})
-
-            # 노드
-            node_px = 4
-            half_n = node_px // 2
-            for (nx, ny) in self._nodes:
-                if not (vx1 - 1.0 <= nx <= vx2 + 1.0 and vy1 - 1.0 <= ny <= vy2 + 1.0):
-                    continue
-                sx, sy = self._world_to_screen(nx, ny, rect_w, rect_h, pad, scale)
-                with ui.Placer(offset_x=int(sx - half_n), offset_y=int(sy - half_n)):
-                    ui.Rectangle(width=node_px, height=node_px,
-                                 style={"background_color": 0xFFCFCFCF, "border_radius": half_n})
-
-            # 로봇
-            robot_px = 7
-            half_r = robot_px // 2
-            with self._robots_lock:
-                robots_copy = list(self._robots)
-            for (rx, ry) in robots_copy:
-                if abs(rx) > 999.0 or abs(ry) > 999.0:
-                    rx *= 0.001; ry *= 0.001
-                if not (vx1 - 1.0 <= rx <= vx2 + 1.0 and vy1 - 1.0 <= ry <= vy2 + 1.0):
-                    continue
-                sx, sy = self._world_to_screen(rx, ry, rect_w, rect_h, pad, scale)
-                with ui.Placer(offset_x=int(sx - half_r), offset_y=int(sy - half_r)):
-                    ui.Rectangle(
-                        width=robot_px, height=robot_px,
-                        style={"background_color": 0xFF22B8FF,
-                               "border_radius": half_r,
-                               "border_color": 0xFF0D3E66, "border_width": 1}
-                    )
-
-            # 테두리
-            ui.Rectangle(style={
-                "border_color": 0xFF5A5A5A,
-                "border_width": 1,
-                "background_color": 0x00000000
-            })
-
-            # 입력 오버레이(투명)
-            self._create_input_overlay(width=int(rect_w), height=int(rect_h))
+        # 정적 레이어: 화면 픽셀 → 월드 → 레벨 픽셀 인덱스(행/열 분리) 로 한 번에 샘플링
+        static = self._static_for(scale)
+        w, h = cv.width, cv.height
+        if static is None:
+            cv.clear(_MAP_BG)   # 워밍업 첫 레벨 전: 배경만(레벨이 생기면 다시 합성됨)
+        else:
+            level, img = static
+            ix = np.floor(((np.arange(w) + 0.5 - pad) / scale + self._pan_x - self.X_MIN) * level).astype(np.int64)
+            iy = np.floor((self.Y_MAX - self._pan_y - (rect_h - pad - np.arange(h) - 0.5) / scale) * level).astype(np.int64)
+            ok_x = (ix >= 0) & (ix < img.shape[1])
+            ok_y = (iy >= 0) & (iy < img.shape[0])
+            px = img.view(np.uint32)[:, :, 0]   # RGBA 4바이트를 한 원소로 → 인덱싱 1회
+            view = px.take(np.clip(iy, 0, img.shape[0] - 1), axis=0).take(np.clip(ix, 0, img.shape[1] - 1), axis=1)
+            bg = np.array(_MAP_BG, dtype=np.uint8).view(np.uint32)[0]
+            view[~ok_y] = bg
+            view[:, ~ok_x] = bg
+            cv.blit(view.view(np.uint8).reshape(h, w, 4), 0, 0)
+
+        # 로봇
+        with self._robots_lock:
+            robots_copy = list(self._robots)
+        if robots_copy:
+            r = np.asarray(robots_copy, dtype=np.float64).reshape(-1, 2)
+            big = (np.abs(r[:, 0]) > 999.0) | (np.abs(r[:, 1]) > 999.0)
+            r[big] *= 0.001
+            sx = pad + (r[:, 0] - self._pan_x) * scale
+            sy = rect_h - (pad + (r[:, 1] - self._pan_y) * scale)
+            cv.fill_circles(sx, sy, 4.0, _ROBOT_BORDER)
+            cv.fill_circles(sx, sy, 3.0, _ROBOT_RGBA)
+
+        # 선택 노드
+        if self._picked is not None:
+            _, px_, py_ = self._picked
+            sx, sy = self._world_to_screen(px_, py_, rect_w, rect_h, pad, scale)
+            cv.arc(sx, sy, 7.0, 4.5, 0.0, 360.0, _PICK_RGBA)
+
+        # 테두리
+        cv.rect(0, 0, rect_w, rect_h, _FRAME_RGBA)
+        cv.upload()
 
     # --------- 입력 오버레이 ----------
     def _create_input_overlay(self, width: int, height: int):
         overlay = ui.Rectangle(width=width, height=height, style={"background_color": 0x00000000})
+        self._overlay = overlay
 
         # 포커스 우선순위/마우스 진입시 포커스
         try:
@@ -519,6 +687,7 @@ class PathFinderPanel:
                 return True
             self._dragging = True
             self._drag_last_xy = (x, y)
+            self._press_xy = (x, y)
             return True
 
         def _moved(*a, **k):
@@ -542,11 +711,19 @@ class PathFinderPanel:
             self._pan_x -= dx / scale
             self._pan_y += dy / scale  # y축 반전
             self._clamp_pan(view_world_w, view_world_h)
-            self._rebuild_minimap()
+            self._request_redraw()
             return True
 
         def _released(*a, **k):
             self._dragging = False
+            press, self._press_xy = self._press_xy, None
+            try:
+                x, y = float(a[0]), float(a[1])
+            except Exception:
+                return True
+            # 거의 안 움직였으면 클릭 → 노드 선택
+            if press is not None and math.hypot(x - press[0], y - press[1]) < _CLICK_SLOP_PX:
+                self._on_minimap_click(x, y)
             return True
 
         for name, fn in (
@@ -566,6 +743,27 @@ class PathFinderPanel:
 
         return overlay
 
+    # --------- 클릭 → 노드 선택 ----------
+    def _on_minimap_click(self, x: float, y: float):
+        """x, y: 마우스 스크린 좌표. 격자 인덱스로 반경 내 최근접 노드를 찾아 핸들러로 전달."""
+        try:
+            ov = self._overlay
+            lx = x - float(getattr(ov, "screen_position_x", 0.0))
+            ly = y - float(getattr(ov, "screen_position_y", 0.0))
+            scale = self._px()
+            rect_h = float(self._canvas.height) if self._canvas is not None else self._get_minimap_rect()[1]
+            wx, wy = self._screen_to_world(lx, ly, rect_h, 12.0, scale)
+            hit = self.nearest_node(wx, wy, max_dist=_PICK_RADIUS_PX / scale)
+            if hit is None:
+                return
+            self._picked = hit
+            self._request_redraw()
+            self._set(f"[PICK] node {hit[0]} ({hit[1]:.2f}, {hit[2]:.2f})")
+            if self._node_pick_handler is not None:
+                self._node_pick_handler(hit[0])
+        except Exception as e:
+            self._set(f"[pick err] {e}")
+
     # --------- 통합 휠 핸들러 ----------
     def _on_wheel_unified(self, *args, **kwargs):
         """
@@ -669,11 +867,11 @@ class PathFinderPanel:
         self._pan_x = wx - (mx - pad) / new_scale
         self._pan_y = wy - (sy_inv - pad) / new_scale
 
-        # 7) 팬 클램프 & 리빌드
+        # 7) 팬 클램프 & 다시 합성
         vw = max(1e-6, (rect_w - 2 * pad) / new_scale)
         vh = max(1e-6, (rect_h - 2 * pad) / new_scale)
         self._clamp_pan(vw, vh)
-        self._rebuild_minimap()
+        self._request_redraw()
         return True
 
     # 좌표 변환/보조 ------------------------------------------
@@ -684,6 +882,10 @@ class PathFinderPanel:
         sy = rect_h - sy  # 좌상단 원점으로 변환
         return sx, sy
 
+    def _screen_to_world(self, sx: float, sy: float, rect_h: float,
+                         pad: float, scale: float) -> Tuple[float, float]:
+        return self._pan_x + (sx - pad) / scale, self._pan_y + (rect_h - sy - pad) / scale
+
     def _clamp_pan(self, view_world_w: float, view_world_h: float):
         max_x_eff = max(self.X_MIN, self.X_MAX - view_world_w)
         max_y_eff = max(self.Y_MIN, self.Y_MAX - view_world_h)
@@ -697,7 +899,10 @@ class PathFinderPanel:
             if self._poll_thread:
                 self._poll_thread.join(timeout=0.2)
             self._poll_thread = None
+            self._tick_sub = None
         else:
             self._poll_stop.clear()
+            self._subscribe_tick()
+            self._request_redraw()
             if self._poll_thread is None:
                 self._start_robot_polling()
@@ -1,5 +1,6 @@
 # ui_code/ui/panels/mission_panel.py
 import omni.ui as ui
+from ui_code.ui.utils import binding
 
 _ROW_STYLE = {"background_color": 0x00000000}
 _TXT = {"color": 0xFFFFFFFF}
@@ -146,6 +147,7 @@ class MissionPanel:
         # 제거
         for k in list(current_rows.keys()):
             if k not in desired_keys:
+                binding.forget(*current_rows[k]["labels"].values())
                 try:
                     current_rows[k]["frame"].destroy()
                 except Exception:
@@ -154,10 +156,10 @@ class MissionPanel:
 
     def update_data(self, *, working, waiting, reserved):
         total = len(working) + len(waiting) + len(reserved)
-        if self._lbl_total: self._lbl_total.text = f"Total: {total}"
-        if self._lbl_work:  self._lbl_work.text  = f"Working: {len(working)}"
-        if self._lbl_wait:  self._lbl_wait.text  = f"Waiting: {len(waiting)}"
-        if self._lbl_resv:  self._lbl_resv.text  = f"Reserved: {len(reserved)}"
+        binding.set_text(self._lbl_total, f"Total: {total}")
+        binding.set_text(self._lbl_work,  f"Working: {len(working)}")
+        binding.set_text(self._lbl_wait,  f"Waiting: {len(waiting)}")
+        binding.set_text(self._lbl_resv,  f"Reserved: {len(reserved)}")
 
         if self._v_work:
             self._sync_section(self._v_work, self._rows_work, working, _COL_WORK)
@@ -192,12 +194,12 @@ class MissionPanel:
 
     def _update_row(self, row_widgets, row, color):
         lbls = row_widgets["labels"]
-        lbls["missionStatus"].text = _t(row.get("missionStatus"))
-        lbls["process"].text       = _t(row.get("process"))
+        binding.set_text(lbls["missionStatus"], _t(row.get("missionStatus")))
+        binding.set_text(lbls["process"],       _t(row.get("process")))
         # missionCode 라벨에 cancelMissionCode가 있으면 그것을 우선 표시
-        lbls["missionCode"].text   = _t(row.get("cancelMissionCode") or row.get("missionCode"))
-        lbls["amrId"].text         = _t(row.get("amrId"))
-        lbls["targetNode"].text    = _t(row.get("targetNode"))
+        binding.set_text(lbls["missionCode"],   _t(row.get("cancelMissionCode") or row.get("missionCode")))
+        binding.set_text(lbls["amrId"],         _t(row.get("amrId")))
+        binding.set_text(lbls["targetNode"],    _t(row.get("targetNode")))
 
 
 
@@ -17,10 +17,14 @@ from omni.usd import StageEventType
 from omni.ui import SimpleStringModel
 import omni.ui as gui
 
-from .client import DigitalTwinClient
-from .main import UiLayoutBase
+from .client import DigitalTwinClient, DataType
+from .main import UiLayoutBase, AMR_PATHS
 from ui_code.Mission.mission_panel import MissionPanel   # 요청 경로 유지
 from ui_code.ui.scene.linecar import LineCarSpawner      # 상단에서만 import
+from ui_code.ui.scene.conveyor import ConveyorEngine
+from ui_code.ui.utils.freshness import FreshnessTracker
+from ui_code.ui.utils.map_graph import MapGraph, resolve_map_path
+from ui_code.ui.utils import binding
 
 SETTING_KEY = "/ext/platform_ui/operate_mode"
 # 다양한 버전 호환(일부는 /app/*, 일부는 /persistent/*만 반영됨)
@@ -118,6 +122,13 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
         UiLayoutBase.on_startup(self, ext_id)
         self._show_placeholder_amr_cards(4)
 
+        # 데이터 신선도 추적(SLA 1초) — 카드/3D stale 표시 + 주기 리포트
+        self._freshness = FreshnessTracker(sla_s=1.0)
+        self._amr3d.set_freshness(self._freshness)
+        self._stale_ids = set()
+        self._freshness_next_check = 0.0
+        self._freshness_next_report = 0.0
+
         # 컨테이너 패널 데이터 리졸버
         self._containers_latest = {}
         self._container_panel.set_data_resolver(lambda: self._containers_latest)
@@ -151,11 +162,16 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
         print(f"[Platform.ui] fleet_url = {self._fleet_url or 'N/A'}")
         print(f"[Platform.ui] map_code  = {self._map_code or 'N/A'}")
 
+        # 바닥 노드/엣지 오버레이: 캐시 USD 가 있으면 reference, 없으면 백그라운드 빌드
+        if getattr(self, "_floor_graph", None):
+            self._floor_graph.start(resolve_map_path(self._map_code))
+
         # 4) 클라이언트 시작 (URL 없으면 건너뜀)
         self._client = None
         if self._base_url:
             self._client = DigitalTwinClient(base_url=self._base_url, interval=0.5, timeout=5.0)
             self._client.add_on_alive_change(self._on_alive_change)
+            self._client.add_on_request(self._on_client_request)
             self._client.add_on_response(self._on_response)
             self._client.add_on_error(self._on_error)
             self._client.add_on_response(self._on_client_response)
@@ -191,28 +207,12 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
         else:
             print("[Platform.ui][WARN] 'fleet_base_url'이 비어 있습니다. Fleet 핑을 건너뜁니다.")
 
-        # # # 6) 라인카 스포너
-        # self._line_car_1 = LineCarSpawner(
-        #     usd_path=r"C:\BODY.usd",
-        #     parent_path="/World/LineCars",
-        #     start_x=-1700,
-        #     end_x=9650,
-        #     lane_y=1120,
-        #     count=20,
-        # )
-        # self._line_car_1.start()
-
-        # self._line_car_2 = LineCarSpawner(
-        #     usd_path=r"C:\BODY.usd",
-        #     parent_path="/World/LineCars2",
-        #     proto_path="/World/_BodyProto2",
-        #     start_x=10250,
-        #     end_x=-500,
-        #     lane_y=2425,
-        #     yaw_deg=-90,
-        #     count=19,
-        # )
-        # self._line_car_2.start()
+        # 6) 라인카(컨베이어): config/Conveyor.json 의 레인 전체를 엔진 1개(PointInstancer 1개)로
+        #    단일 레인 LineCarSpawner 도 그대로 사용 가능(render_mode="instancer" 권장)
+        self._conveyor = ConveyorEngine.from_config(
+            os.path.join(os.path.dirname(os.path.dirname(__file__)), "config", "Conveyor.json"))
+        if self._conveyor:
+            self._conveyor.start()
 
         ## # 7) 메인 메뉴바 ON/OFF
         main_window = get_main_window()
@@ -233,6 +233,12 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
                     self._line_car_2.stop()
                 except Exception:
                     pass
+            if getattr(self, "_conveyor", None):
+                try:
+                    self._conveyor.destroy()
+                except Exception:
+                    pass
+                self._conveyor = None
 
             if getattr(self, "_ui_tick_sub", None):
                 self._ui_tick_sub = None
@@ -389,12 +395,24 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
         if not rid_seen:
             self._append_error_line("No AMR errors")
 
+    def _on_client_request(self, endpoint, payload):
+        if payload and getattr(self, "_freshness", None):
+            self._freshness.note_request(payload.get("dataType"))
+
     def _on_client_response(self, endpoint, payload, response):
         if not payload:
             return
         data_type = payload.get("dataType")
         data = (response or {}).get("data")
 
+        fr = getattr(self, "_freshness", None)
+        if fr:
+            if data_type == DataType.AMR_INFO:
+                fr.note_response(data_type, response, data if isinstance(data, list) else [],
+                                 id_of=lambda it: str(it.get("robotId") or "").strip())
+            else:
+                fr.note_response(data_type, response)
+
         # ───────── AMRInfo ─────────
         if data_type == "AMRInfo":
             self._last_amrinfo_time = time.time()
@@ -436,8 +454,19 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
             self._post_to_ui(self._set_model, "m_amr_waiting",  f"Waiting: {waiting}")
             self._post_to_ui(self._set_model, "m_amr_charging", f"Charging: {charging}")
 
+            # 평균 배터리(%) 추세
+            levels = []
+            for it in arr:
+                try:
+                    b = float(it.get("batteryLevel") or 0)
+                except Exception:
+                    continue
+                levels.append(b if b > 1.0 else b * 100.0)
+            if levels:
+                self._post_to_ui(self._push_trend, "amr_battery_avg", sum(levels) / len(levels))
+
             self._post_to_ui(self._sync_amr_cards, arr)
-            self._post_to_ui(self._amr3d.sync, arr)
+            self._post_to_ui(self._amr3d.sync, arr, self._last_amrinfo_time)
 
             # AMR 캐시
             self._amrs_latest = arr
@@ -454,6 +483,9 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
             # 에러 로그
             self._post_to_ui(self._append_amr_errors_to_log, arr)
 
+            if fr:
+                self._post_to_ui(fr.mark_applied, data_type, list(amr_by_id.keys()))
+
         # ───────── ContainerInfo ─────────
         elif data_type == "ContainerInfo":
             arr = data if isinstance(data, list) else []
@@ -526,6 +558,10 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
                 self._containers_latest = norm
             self._post_to_ui(_apply)
 
+            # 3D 컨테이너(직전 응답과 달라진 것만 반영)
+            if getattr(self, "_container3d", None):
+                self._post_to_ui(self._container3d.apply, arr, self._get_map_graph())
+
         # ───────── WorkingInfo (미션) ─────────
         elif data_type == "WorkingInfo":
             if isinstance(data, dict):
@@ -535,6 +571,9 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
 
             self._mission_working, self._mission_waiting = self._calc_working_counts(items)
             self._update_mission_counters()
+            self._update_mission_throughput(items)
+            if "plans" in AMR_PATHS:
+                self._update_planned_paths(items)
 
             self._working_rows_latest = [self._norm_working_row(it) for it in items]
             if self._mission_panel:
@@ -570,6 +609,10 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
             self._post_to_ui(self._set_status_dot, "OPC UA", opc_ok)
             self._post_to_ui(self._set_status_dot, "Storage I/O", storage_ok)
 
+        # AMRInfo 외 DataType: 위 UI 작업 뒤에 반영 시각 기록(큐 FIFO)
+        if fr and data_type != DataType.AMR_INFO:
+            self._post_to_ui(fr.mark_applied, data_type)
+
     # ───────────────────── Operate/Edit 모드 ───────────────────
     def _apply_operate_mode(self, enable: bool):
         s = carb.settings.get_settings()
@@ -632,24 +675,90 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
         except Exception:
             pass
 
+    def _update_spawn_progress(self):
+        """Status Panel 의 AMR 생성 진행 표시(바뀔 때만 갱신)."""
+        lbl = getattr(self, "_amr_spawn_label", None)
+        if lbl is None:
+            return
+        state = self._amr3d.spawn_progress
+        if state == getattr(self, "_spawn_shown", None):
+            return
+        self._spawn_shown = state
+        done, total = state
+        lbl.visible = total > 0
+        if total:
+            lbl.text = f"Loading AMRs {done}/{total}"
+
     def _on_update(self, e):
         # 1) AMR 자연스러운 이동/회전 보간
         try:
             if hasattr(self, "_amr3d") and self._amr3d:
                 self._amr3d.update()
+                self._update_spawn_progress()
+            # 운반 중 컨테이너는 로봇을 따라감(운반 중인 것만 계산)
+            if getattr(self, "_container3d", None):
+                self._container3d.update()
+            # 바닥 그래프 빌드 완료 시 1회 reference
+            if getattr(self, "_floor_graph", None):
+                self._floor_graph.update()
+            # 라인카 레인(화면 밖 레인은 엔진이 일시정지)
+            if getattr(self, "_conveyor", None):
+                self._conveyor.update()
         except Exception as ex:
             print("[Platform.ui] amr3d.update failed:", ex)
 
-        # 2) 최근 AMRInfo 수신 확인(3초 무응답 시 5초 간격 경고)
+        # 2) 데이터 신선도 확인(무응답 경고 + 로봇별 stale 표시)
+        try:
+            self._check_freshness()
+        except Exception as ex:
+            print("[Platform.ui] freshness check failed:", ex)
+
+        # 3) UI 작업큐 비우기
+        self._drain_ui_jobs(e)
+
+    def _check_freshness(self):
+        fr = getattr(self, "_freshness", None)
+        if not fr:
+            return
         now = time.time()
-        if getattr(self, "_last_amrinfo_time", 0.0) > 0 and (now - self._last_amrinfo_time) > 3.0:
+
+        # AMRInfo 3초 무응답 시 5초 간격 경고
+        age = fr.age(DataType.AMR_INFO, now)
+        if age is not None and age > 3.0:
             if (now - getattr(self, "_last_no_update_warn", 0.0)) > getattr(self, "_warn_every_s", 5.0):
-                dt = now - self._last_amrinfo_time
-                print(f"[AMRInfo][WARN] no update for {dt:.1f}s (check server/mapCode, network, client polling)")
+                print(f"[AMRInfo][WARN] no update for {age:.1f}s (check server/mapCode, network, client polling)")
                 self._last_no_update_warn = now
 
-        # 3) UI 작업큐 비우기
-        self._drain_ui_jobs(e)
+        # 로봇별 stale 플래그(0.25초 간격, 바뀐 로봇만 카드/3D 반영)
+        if now < self._freshness_next_check:
+            return
+        self._freshness_next_check = now + 0.25
+
+        stale = fr.stale_ids(now)
+        if stale != self._stale_ids:
+            lst = getattr(self, "_amr_list", None)
+            for rid in stale ^ self._stale_ids:
+                flag = rid in stale
+                if lst:
+                    lst.set_stale(rid, flag)
+                if getattr(self, "_amr3d", None):
+                    self._amr3d.set_stale(rid, flag)
+            self._stale_ids = stale
+
+        # 30초마다 SLA 리포트
+        if now >= self._freshness_next_report:
+            self._freshness_next_report = now + 30.0
+            rep = fr.report()
+            a = rep.get(DataType.AMR_INFO)
+            u = rep.get("usd") or {}
+            if a and a["n"]:
+                print(
+                    f"[Freshness] AMRInfo apply p50={a['p50']*1000:.0f}ms p95={a['p95']*1000:.0f}ms "
+                    f"max={a['max']*1000:.0f}ms within {fr.sla_s:.1f}s={a['within_sla']*100:.1f}% | "
+                    f"usd p95={u.get('p95', 0.0)*1000:.0f}ms | clock_offset={rep['clock_offset']*1000:.0f}ms"
+                )
+            bs = binding.stats()
+            print(f"[UI] model writes={bs['written']} suppressed={bs['suppressed']} cached={bs['cached']}")
 
     # ───────────────────── Mission helpers ─────────────────────
     def _calc_working_counts(self, items):
@@ -974,6 +1083,71 @@ class PlatformUiExtension(UiLayoutBase, omni.ext.IExt):
         self._post_to_ui(self._set_model, "m_mission_waiting",  f"Waiting: {wait}")
         self._post_to_ui(self._set_model, "m_mission_reserved", f"Reserved: {reserved}")
 
+    def _update_mission_throughput(self, items):
+        """WorkingInfo 에서 사라진 미션 = 완료로 보고 최근 10분 완료 수를 시간당으로 환산."""
+        now = time.time()
+        codes = set()
+        for it in items or []:
+            code = str(it.get("Key") or it.get("missionCode") or "").strip()
+            if code:
+                codes.add(code)
+
+        prev = getattr(self, "_mission_codes_prev", None)
+        done = getattr(self, "_mission_done_ts", None)
+        if done is None:
+            done = self._mission_done_ts = deque()
+        if prev is not None:
+            for _ in prev - codes:
+                done.append(now)
+        self._mission_codes_prev = codes
+
+        window_s = 600.0
+        while done and (now - done[0]) > window_s:
+            done.popleft()
+        self._post_to_ui(self._push_trend, "mission_throughput", len(done) * (3600.0 / window_s))
+
+    def _get_map_graph(self) -> MapGraph:
+        """맵 노드 좌표(mm) — 첫 사용 시 1회 로드."""
+        graph = getattr(self, "_map_graph", None)
+        if graph is None:
+            graph = self._map_graph = MapGraph.load(resolve_map_path(self._map_code))
+        return graph
+
+    def _update_planned_paths(self, items):
+        """WorkingInfo.missionData 의 position(노드) 열 → 로봇별 계획 경로(mm). 바뀐 로봇만 Amr3D 에 반영."""
+        graph = self._get_map_graph()
+        if not len(graph):
+            return
+
+        plans = {}
+        for it in items or []:
+            v = (it.get("Value") or {}) if "Key" in it else it
+            rids = v.get("robotIds")
+            if isinstance(rids, (str, int)):
+                rids = [str(rids)]
+            rids = [str(r) for r in (rids or []) if r is not None]
+            if len(rids) != 1:
+                continue
+            raw = v.get("missionData")
+            try:
+                steps = json.loads(raw) if isinstance(raw, str) else (raw or [])
+            except Exception:
+                continue
+            pts = []
+            for st in steps if isinstance(steps, list) else []:
+                p = graph.position((st or {}).get("position"))
+                if p is not None and (not pts or pts[-1] != p):
+                    pts.append(p)
+            if pts:
+                plans[rids[0]] = pts
+
+        prev = getattr(self, "_plans_prev", {})
+        changed = {rid: pts for rid, pts in plans.items() if prev.get(rid) != pts}
+        changed.update({rid: None for rid in prev.keys() - plans.keys()})
+        self._plans_prev = plans
+        for rid, pts in changed.items():
+            self._post_to_ui(self._amr3d.set_planned_path, rid, pts)
+
     def _cleanup_finished_missions(self, current_working_items):
         """서버에 존재하지 않는 오래된 Waiting 미션을 제거"""
         try:
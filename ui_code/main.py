@@ -1,3 +1,4 @@
+import os
 import time
 from pathlib import Path
 from typing import Optional, Dict, Any
@@ -8,8 +9,11 @@ import omni.usd
 import carb
 
 from ui_code.ui.utils.common import _fill
-from ui_code.ui.components.amr_card import AmrCard
+from ui_code.ui.utils import binding
 from ui_code.ui.scene.amr_3d import Amr3D
+from ui_code.ui.scene.container_3d import Container3D
+from ui_code.ui.scene.floor_graph import FloorGraph
+from ui_code.ui.scene.live_layer import release_live_layer
 
 from ui_code.Container.container_list_panel import ContainerPanel
 from ui_code.Mission.mission_panel import MissionPanel
@@ -20,6 +24,13 @@ from ui_code.ui.sections.amr_panel import build_amr_panel
 from ui_code.ui.sections.status_panel import build_status_panel
 from ui_code.ui.sections.bottom_bar import build_bottom_bar
 
+# AMR 3D 렌더 모드: "prims"(로봇별 prim) | "instancer"(PointInstancer, 대규모 fleet 용)
+AMR_RENDER_MODE = os.getenv("AMR_RENDER_MODE", "prims")
+# 궤적/계획 경로 표시: "trails", "plans" 를 콤마로(예: AMR_PATHS=trails,plans). 기본 꺼짐
+AMR_PATHS = {p.strip() for p in os.getenv("AMR_PATHS", "").lower().split(",") if p.strip()}
+# 바닥 노드/엣지 오버레이(맵 JSON → 캐시 USD). FLOOR_GRAPH=0 이면 끔
+FLOOR_GRAPH = os.getenv("FLOOR_GRAPH", "1") != "0"
+
 
 class UiLayoutBase:
     # ───────────────────────── helpers ─────────────────────────
@@ -57,6 +68,7 @@ class UiLayoutBase:
     # ───────────────────────── lifecycle ───────────────────────
     def on_startup(self, ext_id):
         print("[Platform.ui.main] UI startup")
+        t0 = time.perf_counter()
 
         # ───────── 상단 Menubar / Viewport Menubar 제거 ─────────
         settings = carb.settings.get_settings()
@@ -99,15 +111,9 @@ class UiLayoutBase:
         self._amr_latest: Dict[str, Dict[str, Any]] = {}
         self._amr_panel.set_data_resolver(lambda rid: self._amr_latest.get(str(rid)))
 
-        # 3D 동기화 엔진
+        # 3D 동기화 엔진(에셋 로드는 패널 구성 뒤 — 그 전에 온 sync 는 Amr3D 가 보관)
         self._amr3d = Amr3D()
-        self._amr3d.init("C:/omniverse_exts/AMR.usd")
-
-        # self._amr3d.set_anchor("/World/t_floor")  # 필요 시 사용
-
-        # 회전/축 보정
-        self._amr3d.set_mode("snap")
-        self._amr3d.set_config(tilt_x=90, yaw_sign=+1, yaw_offset=0)
+        self._amr3d.set_render_mode(AMR_RENDER_MODE)
 
         # 화면 구성
         build_top_bar(self)
@@ -120,6 +126,23 @@ class UiLayoutBase:
         dock_window_in_window("AMR Information", "Viewport", DockPosition.LEFT, 0.09)
         dock_window_in_window("Status Panel", "Viewport", DockPosition.RIGHT, 0.12)
         dock_window_in_window("Bottom Bar", "Viewport", DockPosition.BOTTOM, 0.08)
+        print(f"[Platform.ui.main] time-to-first-panel: {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+        # AMR 에셋: payload 지연 로드(placeholder 로 먼저 표시, 파일은 백그라운드에서 open)
+        self._amr3d.init("C:/omniverse_exts/AMR.usd", deferred=True, t0=t0)
+
+        # self._amr3d.set_anchor("/World/t_floor")  # 필요 시 사용
+
+        # 회전/축 보정(init 이 stage 축 기준 기본값을 잡은 뒤 덮어씀)
+        self._amr3d.set_mode("snap")
+        self._amr3d.set_config(tilt_x=90, yaw_sign=+1, yaw_offset=0)
+        self._amr3d.set_paths(trails="trails" in AMR_PATHS, plans="plans" in AMR_PATHS)
+
+        # 컨테이너 3D(PointInstancer, 좌표/라이브 레이어는 Amr3D 공유)
+        self._container3d = Container3D(self._amr3d)
+
+        # 바닥 그래프(빌드/캐시는 맵 코드가 정해진 뒤 start)
+        self._floor_graph = FloorGraph(self._amr3d) if FLOOR_GRAPH else None
 
     # 상태 줄
     def _draw_status_line(self, label: str, is_connected: bool):
@@ -131,6 +154,19 @@ class UiLayoutBase:
             self._status_bullets[label] = dot
 
     def on_shutdown(self):
+        if getattr(self, "_amr_donut", None):
+            self._amr_donut.destroy()
+            self._amr_donut = None
+        if getattr(self, "_container3d", None):
+            self._container3d.destroy()
+            self._container3d = None
+        if getattr(self, "_floor_graph", None):
+            self._floor_graph.destroy()
+            self._floor_graph = None
+        if getattr(self, "_amr3d", None):
+            self._amr3d.destroy()
+        # 라이브 트윈 레이어(로봇/라인카 transform)는 저장하지 않고 버림
+        release_live_layer()
         for t in ["Meta Factory v3.0", "AMR Information", "Status Panel", "Bottom Bar"]:
             self._kill_window(t)
         print("[Platform.ui.main] UI shutdown")
@@ -153,6 +189,8 @@ class UiLayoutBase:
             if not hasattr(self, "_amr_panel") or self._amr_panel is None:
                 self._amr_panel = AMRPanel()
             self._amr_panel.show(amr_id)   # 전달된 AMR ID 반영
+            if amr_id and getattr(self, "_amr3d", None):
+                self._amr3d.set_selected([amr_id])   # instancer 모드: 선택 로봇만 개별 prim
         except Exception as e:
             print("[Platform.ui.main] AMRPanel.show failed:", e)
 
@@ -160,7 +198,22 @@ class UiLayoutBase:
     def _set_model(self, model_attr: str, value: str):
         m = getattr(self, model_attr, None)
         if m and hasattr(m, "set_value"):
-            m.set_value(value)
+            binding.set_value(m, value)
+        # "Label: N" 형식 카운터는 추세 차트에도 기록
+        if model_attr in getattr(self, "_sparklines", {}):
+            try:
+                self._push_trend(model_attr, float(str(value).split(":")[-1].strip()))
+            except ValueError:
+                pass
+
+    def _push_trend(self, key: str, value: float):
+        sp = getattr(self, "_sparklines", {}).get(key)
+        if sp is None:
+            return
+        if sp.push(value):
+            lbl = self._sparkline_values.get(key)
+            v = float(value)
+            binding.set_text(lbl, str(int(v)) if v.is_integer() else f"{v:.1f}")
 
     def _set_status_dot(self, label: str, is_ok: bool):
         dots = getattr(self, "_status_bullets", None)
@@ -168,9 +221,9 @@ class UiLayoutBase:
             return
         dot = dots.get(label)
         if dot:
-            dot.style = {"color": (0xFF00FF00 if is_ok else 0xFF0000FF)}
+            binding.set_style(dot, {"color": (0xFF00FF00 if is_ok else 0xFF0000FF)})
             try:
-                dot.text = "●" if is_ok else "?"
+                binding.set_text(dot, "●" if is_ok else "?")
             except Exception:
                 pass
 
@@ -227,79 +280,42 @@ class UiLayoutBase:
         )
 
     def _show_placeholder_amr_cards(self, count: int = 4):
-        if not hasattr(self, "_amr_list_stack"):
+        lst = getattr(self, "_amr_list", None)
+        if lst is None:
             return
-        for i in range(count):
-            pid = f"__placeholder_{i+1}"
-            if pid in getattr(self, "_amr_cards", {}):
-                continue
-            card = AmrCard(self._amr_list_stack, amr_id=f"AMR {i+1}", on_plus=self._open_amr_panel)
-            card.update(
-                {"status": None, "liftStatus": None, "containerCode": None, "batteryLevel": 0}
-            )
-            self._amr_cards[pid] = card
+        lst.set_placeholders(count)
 
     def _sync_amr_cards(self, items):
-        if not hasattr(self, "_amr_list_stack"):
+        lst = getattr(self, "_amr_list", None)
+        if lst is None:
             return
 
         arr = items if isinstance(items, list) else []
-        seen = set()
-
-        if not hasattr(self, "_amr_latest"):
-            self._amr_latest = {}
+        if not arr:
+            return
 
+        # 최신 데이터 저장(빠진 AMR 은 자연히 제거)
+        latest: Dict[str, Dict[str, Any]] = {}
         for i, it in enumerate(arr):
             amr_id = self._amr_id_of(it, i)
-            seen.add(amr_id)
-
-            # 최신 데이터 저장
             try:
-                self._amr_latest[amr_id] = dict(it)
+                latest[amr_id] = dict(it)
             except Exception:
-                self._amr_latest[amr_id] = it
+                latest[amr_id] = it
+        self._amr_latest = latest
 
-            card = self._amr_cards.get(amr_id)
-            if card is None:
-                card = AmrCard(self._amr_list_stack, amr_id, on_plus=self._open_amr_panel)
-                self._amr_cards[amr_id] = card
-            card.update(it)
-
-            # Details 패널이 이 AMR을 보고 있으면 즉시 반영
-            try:
-                if getattr(self, "_amr_panel", None) and \
-                        self._amr_panel.get_selected_id() == str(amr_id):
-                    self._amr_panel.update(self._amr_latest[amr_id])
-            except Exception:
-                pass
+        # 목록(정렬 순서 유지) → 보이는 카드만 갱신
+        try:
+            lst.set_ids(latest.keys())
+            lst.update(latest.keys())
+        except Exception as e:
+            print("[AMR] list refresh failed:", e)
 
-        removed_placeholder = False
-        if arr:
-            for key in list(self._amr_cards.keys()):
-                if key.startswith("__placeholder_"):
-                    self._amr_cards[key].destroy()
-                    del self._amr_cards[key]
-                    removed_placeholder = True
-
-        if arr:
-            for amr_id in list(self._amr_cards.keys()):
-                if not amr_id.startswith("__placeholder_") and amr_id not in seen:
-                    self._amr_cards[amr_id].destroy()
-                    del self._amr_cards[amr_id]
-                    try:
-                        del self._amr_latest[amr_id]
-                    except Exception:
-                        pass
-
-        if removed_placeholder:
-            try:
-                if hasattr(self, "_amr_list_stack"):
-                    self._amr_list_stack.clear()
-                    for amr_id, old_card in list(self._amr_cards.items()):
-                        new_card = AmrCard(self._amr_list_stack, amr_id, on_plus=self._open_amr_panel)
-                        new_card.update({})
-                        self._amr_cards[amr_id] = new_card
-                if hasattr(self, "_amr_scroll"):
-                    self._amr_scroll.scroll_y = 0.0
-            except Exception as e:
-                print("[AMR] refresh failed:", e)
+        # Details 패널이 보고 있는 AMR 이면 즉시 반영
+        try:
+            if getattr(self, "_amr_panel", None):
+                sel = self._amr_panel.get_selected_id()
+                if sel in latest:
+                    self._amr_panel.update(latest[sel])
+        except Exception:
+            pass
@@ -1,12 +1,15 @@
 from typing import Callable, Optional, Dict, Any
 import omni.ui as ui
 from ui_code.ui.utils.common import _fill, ASSET_DIR, _fmt_status, _fmt_lift
+from ui_code.ui.utils import binding
 
 
 class AmrCard:
     def __init__(self, parent_vstack: ui.VStack, amr_id: str, on_plus: Optional[Callable] = None):
         self.amr_id = str(amr_id)
         self._on_plus = on_plus
+        self._stale = False
+        self._batt_pct = None
 
         self.m_status = ui.SimpleStringModel("-")
         self.m_lift   = ui.SimpleStringModel("-")
@@ -21,7 +24,7 @@ class AmrCard:
             with ui.VStack(spacing=6, padding=8, width=_fill()):
                 # ── 헤더 ──
                 with ui.HStack(width=_fill(), height=24):
-                    ui.Label(
+                    self._lbl_id = ui.Label(
                         f"AMR ID : {self.amr_id}",
                         style={"font_size": 14, "color": 0xFFFFFFFF},
                         width=_fill()
@@ -92,14 +95,14 @@ class AmrCard:
         elif v >= 0.20: col = 0xFF00AAFF
         else:           col = 0xFF0000FF
 
-        try:
-            self._batt_fill.set_style({"background_color": col})
-        except Exception:
-            self._batt_fill.style = {"background_color": col}
-        try:
-            self._batt_fill.width = ui.Percent(int(v * 100))
-        except Exception:
-            pass
+        binding.set_style(self._batt_fill, {"background_color": col})
+        pct = int(v * 100)
+        if pct != self._batt_pct:
+            self._batt_pct = pct
+            try:
+                self._batt_fill.width = ui.Percent(pct)
+            except Exception:
+                pass
 
     def _sync_batt_text(self):
         try:
@@ -107,7 +110,7 @@ class AmrCard:
         except Exception:
             v = 0.0
         v = max(0.0, min(1.0, v))
-        self._batt_text.text = self._fmt_ratio_int(v)
+        binding.set_text(self._batt_text, self._fmt_ratio_int(v))
 
     def _on_batt_changed(self, *_):
         self._sync_batt_color_and_fill()
@@ -135,13 +138,13 @@ class AmrCard:
                     return src[k]
             return default
 
-        self.m_status.set_value(_fmt_status(g("status", "robotStatus", "state")))
-        self.m_lift.set_value(_fmt_lift(g("liftStatus", "lift_state")))
-        self.m_rack.set_value(str(g("containerCode", "palletCode", "container", "rack") or "-"))
+        binding.set_value(self.m_status, _fmt_status(g("status", "robotStatus", "state")))
+        binding.set_value(self.m_lift, _fmt_lift(g("liftStatus", "lift_state")))
+        binding.set_value(self.m_rack, str(g("containerCode", "palletCode", "container", "rack") or "-"))
         w = g("workingType", "missionType", "mission") or g("missionCode")
         if not w:
             w = "Waiting" if bool(g("isWaiting")) else "-"
-        self.m_wtype.set_value(str(w))
+        binding.set_value(self.m_wtype, str(w))
 
         batt = g("batteryLevel") or 0
         try:
@@ -151,9 +154,36 @@ class AmrCard:
         if batt > 1.0:
             batt /= 100.0
         batt = max(0.0, min(1.0, batt))
-        self.m_batt.set_value(batt)
+        binding.set_value(self.m_batt, batt)
+
+    def bind(self, amr_id: str):
+        """가상 리스트에서 카드 재활용: 표시 대상 AMR 만 교체(위젯 재생성 없음)."""
+        amr_id = str(amr_id)
+        if amr_id == self.amr_id:
+            return
+        self.amr_id = amr_id
+        self._stale = False
+        try:
+            self._lbl_id.text = f"AMR ID : {self.amr_id}"
+            self._lbl_id.style = {"font_size": 14, "color": 0xFFFFFFFF}
+        except Exception:
+            pass
+
+    def set_stale(self, stale: bool):
+        """데이터가 오래되면(SLA 초과) 헤더를 회색 + (stale) 표시."""
+        stale = bool(stale)
+        if stale == self._stale:
+            return
+        self._stale = stale
+        try:
+            self._lbl_id.text = f"AMR ID : {self.amr_id}" + (" (stale)" if stale else "")
+            self._lbl_id.style = {"font_size": 14, "color": (0xFF808080 if stale else 0xFFFFFFFF)}
+        except Exception:
+            pass
 
     def destroy(self):
+        binding.forget(self.m_status, self.m_lift, self.m_rack, self.m_wtype, self.m_batt,
+                       self._batt_fill, self._batt_text)
         try:
             self._root.destroy()
         except Exception:
@@ -0,0 +1,174 @@
+# amr_list.py — 가상화(virtualized) AMR 카드 리스트
+# - 화면에 보이는 행 + 여유(margin)만큼만 AmrCard 를 만들고, 스크롤 시 카드를 재활용(bind)
+# - 위/아래 Spacer 높이로 전체 스크롤 길이를 흉내 냄(행 높이 고정)
+# - 정렬 순서는 숫자 ID 우선의 안정 정렬, 데이터 갱신은 보이는 카드에만 즉시 반영
+#   (화면 밖 카드는 스크롤로 들어올 때 resolver 로 최신값을 받아 갱신)
+
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import omni.ui as ui
+from ui_code.ui.utils.common import _fill
+from ui_code.ui.components.amr_card import AmrCard
+
+_CARD_H = 120           # AmrCard 루트 Frame 높이
+_GAP_H = 8              # 카드 사이 간격
+ROW_H = _CARD_H + _GAP_H
+
+
+def _id_key(s: str):
+    t = str(s).strip()
+    return (0, int(t), "") if t.isdigit() else (1, 0, t)
+
+
+class VirtualAmrList:
+    def __init__(
+        self,
+        scroll: ui.ScrollingFrame,
+        *,
+        on_plus: Optional[Callable] = None,
+        resolver: Optional[Callable[[str], Optional[Dict[str, Any]]]] = None,
+        margin: int = 2,
+    ):
+        self._scroll = scroll
+        self._on_plus = on_plus
+        self._resolver = resolver
+        self._margin = max(0, int(margin))
+
+        self._ids: List[str] = []
+        self._placeholder = False
+        self._stale: set = set()
+
+        self._rows: List[ui.VStack] = []
+        self._slots: List[AmrCard] = []
+        self._slot_ids: List[Optional[str]] = []
+
+        with self._scroll:
+            with ui.VStack(spacing=0, width=_fill()) as v:
+                self.stack = v
+                self._top = ui.Spacer(height=0)
+                self._pool = ui.VStack(spacing=0, width=_fill(), height=0)
+                self._bottom = ui.Spacer(height=0)
+
+        try:
+            self._scroll.set_scroll_y_changed_fn(lambda *_: self.refresh())
+        except Exception:
+            pass
+        try:
+            self._scroll.set_computed_content_size_changed_fn(lambda *_: self.refresh())
+        except Exception:
+            pass
+
+    # ───────────────────────── helpers ─────────────────────────
+    def _view_h(self) -> float:
+        try:
+            h = float(self._scroll.computed_height)
+        except Exception:
+            h = 0.0
+        return h if h > 1.0 else 800.0
+
+    def _scroll_y(self) -> float:
+        try:
+            return max(0.0, float(self._scroll.scroll_y))
+        except Exception:
+            return 0.0
+
+    def _ensure_pool(self, n: int):
+        while len(self._slots) < n:
+            with self._pool:
+                with ui.VStack(height=ROW_H, spacing=0, width=_fill()) as row:
+                    card = AmrCard(row, amr_id="-", on_plus=self._on_plus)
+                    ui.Spacer(height=_GAP_H)
+            self._rows.append(row)
+            self._slots.append(card)
+            self._slot_ids.append(None)
+
+    def _data_of(self, rid: str) -> Dict[str, Any]:
+        if self._placeholder or not self._resolver:
+            return {"status": None, "liftStatus": None, "containerCode": None, "batteryLevel": 0}
+        try:
+            return self._resolver(rid) or {}
+        except Exception:
+            return {}
+
+    @staticmethod
+    def _set_h(widget, h: float):
+        try:
+            widget.height = ui.Pixel(max(0, int(h)))
+        except Exception:
+            pass
+
+    # ───────────────────────── public ──────────────────────────
+    def set_placeholders(self, count: int = 4):
+        """실데이터 전 자리표시 카드(AMR 1..N)."""
+        self._placeholder = True
+        self._ids = [f"AMR {i+1}" for i in range(int(count))]
+        self.refresh()
+
+    def set_ids(self, ids: Iterable[str]):
+        """표시할 AMR 집합 갱신. 집합이 같으면 순서 유지(재정렬/재바인딩 없음)."""
+        new = [str(i) for i in ids]
+        if not self._placeholder and set(new) == set(self._ids):
+            return
+        self._placeholder = False
+        self._ids = sorted(set(new), key=_id_key)
+        self._stale &= set(self._ids)
+        try:
+            if self._scroll_y() > len(self._ids) * ROW_H:
+                self._scroll.scroll_y = 0.0
+        except Exception:
+            pass
+        self.refresh()
+
+    def update(self, ids: Iterable[str]):
+        """갱신된 AMR 중 화면에 보이는 카드만 update."""
+        changed = set(str(i) for i in ids)
+        for card, rid in zip(self._slots, self._slot_ids):
+            if rid is not None and rid in changed:
+                card.update(self._data_of(rid))
+
+    def set_stale(self, rid: str, stale: bool):
+        rid = str(rid)
+        if stale:
+            self._stale.add(rid)
+        else:
+            self._stale.discard(rid)
+        for card, sid in zip(self._slots, self._slot_ids):
+            if sid == rid:
+                card.set_stale(stale)
+
+    def refresh(self):
+        """스크롤 위치 기준으로 보이는 구간을 계산해 카드 풀을 재바인딩."""
+        n = len(self._ids)
+        pool_n = int(math.ceil(self._view_h() / ROW_H)) + 1 + 2 * self._margin
+        self._ensure_pool(min(pool_n, n))
+
+        first = max(0, int(self._scroll_y() // ROW_H) - self._margin)
+        first = min(first, max(0, n - len(self._slots)))
+        shown = self._ids[first:first + len(self._slots)]
+
+        self._set_h(self._top, first * ROW_H)
+        self._set_h(self._pool, len(shown) * ROW_H)
+        self._set_h(self._bottom, (n - first - len(shown)) * ROW_H)
+
+        for i, card in enumerate(self._slots):
+            rid = shown[i] if i < len(shown) else None
+            if rid is None:
+                if self._slot_ids[i] is not None:
+                    self._slot_ids[i] = None
+                    self._rows[i].visible = False
+                continue
+            if self._slot_ids[i] != rid:
+                if self._slot_ids[i] is None:
+                    self._rows[i].visible = True
+                card.bind(rid)
+                card.update(self._data_of(rid))
+                card.set_stale(rid in self._stale)
+                self._slot_ids[i] = rid
+
+    def destroy(self):
+        for card in self._slots:
+            card.destroy()
+        self._rows.clear()
+        self._slots.clear()
+        self._slot_ids.clear()
@@ -0,0 +1,136 @@
+# donut_chart.py — NumPy 벡터화 도넛 렌더러(AMR 상태 차트)
+# - 크기별로 링 마스크/각도 배열을 1회만 계산(클래스 캐시)
+# - 프레임 생성은 boolean 비교 + argmax 로 세그먼트 색 선택(파이썬 픽셀 루프 없음)
+# - 렌더 결과를 비율 튜플 단위로 LRU 캐시
+# - request() 는 값만 기록하고 실제 그리기/업로드는 다음 update tick 에서 1회(코얼레싱)
+
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import omni.ui as ui
+import omni.kit.app as kit_app
+from ui_code.ui.utils import binding
+from ui_code.ui.components.raster_canvas import RasterCanvas
+
+_DEFAULT_COLORS = [
+    (255, 170, 0, 255),   # Working → ORANGE
+    (0, 123, 255, 255),   # Waiting → BLUE
+    (0, 204, 102, 255),   # Charging → GREEN
+]
+_DEFAULT_TRACK = (160, 160, 160, 140)
+
+
+class DonutRenderer:
+    # (size, inner_ratio) → (ring_idx, ring_ang)
+    _masks: Dict[Tuple[int, float], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def __init__(
+        self,
+        provider: ui.ByteImageProvider,
+        *,
+        size: int = 80,
+        inner_ratio: float = 0.75,
+        gap_deg: float = 2.0,
+        colors: Optional[Sequence[Tuple[int, int, int, int]]] = None,
+        track_rgba: Tuple[int, int, int, int] = _DEFAULT_TRACK,
+        center_label: Optional[ui.Label] = None,
+        cache_size: int = 64,
+    ):
+        self._size = int(size)
+        self._canvas = RasterCanvas(self._size, self._size, provider)
+        self._gap = float(gap_deg)
+        self._colors = np.array(colors or _DEFAULT_COLORS, dtype=np.uint8)
+        self._track = np.array(track_rgba, dtype=np.uint8)
+        self._center_label = center_label
+
+        self._ring_idx, self._ring_ang = self._ring(self._size, float(inner_ratio))
+        self._cache: "OrderedDict[Tuple[float, ...], np.ndarray]" = OrderedDict()
+        self._cache_size = int(cache_size)
+
+        self._pending: Optional[Tuple[Tuple[float, ...], Optional[str]]] = None
+        self._shown_key: Optional[Tuple[float, ...]] = None
+        self._sub = kit_app.get_app().get_update_event_stream().create_subscription_to_pop(
+            self._on_tick, name="amr-donut-redraw"
+        )
+
+    # ───────────────────────── masks ─────────────────────────
+    @classmethod
+    def _ring(cls, size: int, inner_ratio: float) -> Tuple[np.ndarray, np.ndarray]:
+        key = (size, inner_ratio)
+        hit = cls._masks.get(key)
+        if hit is not None:
+            return hit
+        c = (size - 1) * 0.5
+        yy, xx = np.mgrid[0:size, 0:size].astype(np.float32)
+        dx, dy = xx - c, yy - c
+        d2 = dx * dx + dy * dy
+        outer = size * 0.5
+        inner = outer * inner_ratio
+        ring = (d2 > inner * inner) & (d2 < outer * outer)
+        ang = np.degrees(np.arctan2(dy, dx)) % 360.0
+        idx = np.flatnonzero(ring)
+        hit = (idx, ang.reshape(-1)[idx].astype(np.float32))
+        cls._masks[key] = hit
+        return hit
+
+    # ───────────────────────── render ────────────────────────
+    def render(self, ratios: Sequence[float]) -> np.ndarray:
+        """ratios(합≈1) → (h, w, 4) uint8 RGBA."""
+        r = np.clip(np.asarray(ratios, dtype=np.float32), 0.0, None)
+        span = 360.0 * r
+        start = np.concatenate(([0.0], np.cumsum(span)[:-1])).astype(np.float32)
+        end = start + np.maximum(0.0, span - self._gap)
+        live = span > 0.0
+
+        ang = self._ring_ang[:, None]
+        inside = (ang >= start[None, :]) & (ang <= end[None, :]) & live[None, :]
+        hit = inside.any(axis=1)
+        seg = inside.argmax(axis=1)
+
+        flat = np.zeros((self._size * self._size, 4), dtype=np.uint8)
+        px = np.broadcast_to(self._track, (len(self._ring_idx), 4)).copy()
+        px[hit] = self._colors[seg[hit] % len(self._colors)]
+        flat[self._ring_idx] = px
+        return flat.reshape(self._size, self._size, 4)
+
+    def _frame_for(self, key: Tuple[float, ...]) -> np.ndarray:
+        img = self._cache.get(key)
+        if img is not None:
+            self._cache.move_to_end(key)
+            return img
+        img = self.render(key)
+        self._cache[key] = img
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return img
+
+    # ───────────────────────── public ────────────────────────
+    def request(self, ratios: Sequence[float], center_text: Optional[str] = None):
+        """다음 프레임에 그리도록 예약(같은 프레임 안의 여러 요청은 마지막 값 1회만 반영)."""
+        key = tuple(round(float(v), 3) for v in ratios)
+        self._pending = (key, center_text)
+
+    def flush(self):
+        if self._pending is None:
+            return
+        key, text = self._pending
+        self._pending = None
+        if text is not None and self._center_label is not None:
+            binding.set_text(self._center_label, text)
+        if key == self._shown_key:
+            return
+        self._canvas.blit(self._frame_for(key))
+        self._canvas.upload()
+        self._shown_key = key
+
+    def _on_tick(self, _e):
+        try:
+            self.flush()
+        except Exception as e:
+            print("[Donut] redraw failed:", e)
+
+    def destroy(self):
+        self._sub = None
+        self._pending = None
+        self._cache.clear()
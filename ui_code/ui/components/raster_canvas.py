@@ -0,0 +1,300 @@
+# raster_canvas.py — ByteImageProvider 용 RGBA 캔버스(사전 할당 버퍼 + dirty rect)
+# - 버퍼는 (h, w, 4) uint8 C-contiguous 로 1회 할당, 그리기는 전부 NumPy 벡터 연산
+# - 그린 영역은 dirty rect 로 누적 → 변경이 없으면 upload() 는 아무것도 하지 않음
+#   (ByteImageProvider 는 부분 업로드가 없으므로 dirty rect 는 "업로드 필요 여부 + clear 범위" 판단용)
+# - 업로드 우선순위: set_raw_bytes_data(포인터, 복사 없음) → set_data_array(ndarray) → set_bytes_data(list)
+
+import ctypes
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import omni.ui as ui
+
+RGBA = Tuple[int, int, int, int]
+
+# PyCapsule(void*) 생성: set_raw_bytes_data 가 받는 포인터 형식
+_capsule_new = ctypes.pythonapi.PyCapsule_New
+_capsule_new.restype = ctypes.py_object
+_capsule_new.argtypes = [ctypes.c_void_p, ctypes.c_char_p, ctypes.c_void_p]
+
+
+def _rgba8_format():
+    for owner in (getattr(ui, "TextureFormat", None), getattr(ui.ByteImageProvider, "Format", None)):
+        fmt = getattr(owner, "RGBA8_UNORM", None) if owner is not None else None
+        if fmt is not None:
+            return fmt
+    return None
+
+
+class RasterCanvas:
+    def __init__(self, width: int, height: int, provider: Optional[ui.ByteImageProvider] = None,
+                 background: RGBA = (0, 0, 0, 0)):
+        self.width = int(width)
+        self.height = int(height)
+        # provider=False: 오프스크린 전용(버퍼만 씀, upload 불가)
+        self.provider = None if provider is False else (provider if provider is not None else ui.ByteImageProvider())
+        self.buf = np.zeros((self.height, self.width, 4), dtype=np.uint8)
+        self._bg = np.array(background, dtype=np.uint8)
+        self.buf[:] = self._bg
+
+        # 픽셀 좌표 그리드(원/호 마스크용) — 처음 쓸 때 1회 생성(큰 오프스크린 캔버스는 안 만들 수도 있음)
+        self._yy: Optional[np.ndarray] = None
+        self._xx: Optional[np.ndarray] = None
+
+        self._dirty: Optional[Tuple[int, int, int, int]] = (0, 0, self.width, self.height)
+        self._upload_path: Optional[str] = None  # 성공한 업로드 경로 기억
+
+    # ───────────────────────── dirty rect ─────────────────────────
+    def _clip(self, x0, y0, x1, y1) -> Optional[Tuple[int, int, int, int]]:
+        x0 = max(0, int(np.floor(x0))); y0 = max(0, int(np.floor(y0)))
+        x1 = min(self.width, int(np.ceil(x1))); y1 = min(self.height, int(np.ceil(y1)))
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def _mark(self, r: Optional[Tuple[int, int, int, int]]):
+        if r is None:
+            return
+        if self._dirty is None:
+            self._dirty = r
+        else:
+            d = self._dirty
+            self._dirty = (min(d[0], r[0]), min(d[1], r[1]), max(d[2], r[2]), max(d[3], r[3]))
+
+    @property
+    def dirty(self) -> Optional[Tuple[int, int, int, int]]:
+        return self._dirty
+
+    def _grid(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._yy is None:
+            self._yy, self._xx = np.mgrid[0:self.height, 0:self.width].astype(np.float32)
+        return self._yy, self._xx
+
+    # ───────────────────────── primitives ─────────────────────────
+    def clear(self, rgba: Optional[RGBA] = None):
+        """전체를 배경색으로. (이미 dirty 인 부분만이 아니라 전체 — 안전한 기본 동작)"""
+        col = self._bg if rgba is None else np.array(rgba, dtype=np.uint8)
+        self.buf[:] = col
+        self._mark((0, 0, self.width, self.height))
+
+    def fill_rect(self, x0: float, y0: float, x1: float, y1: float, rgba: RGBA):
+        r = self._clip(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        if r is None:
+            return
+        self.buf[r[1]:r[3], r[0]:r[2]] = rgba
+        self._mark(r)
+
+    def rect(self, x0: float, y0: float, x1: float, y1: float, rgba: RGBA, thickness: int = 1):
+        t = max(1, int(thickness))
+        self.fill_rect(x0, y0, x1, y0 + t, rgba)
+        self.fill_rect(x0, y1 - t, x1, y1, rgba)
+        self.fill_rect(x0, y0, x0 + t, y1, rgba)
+        self.fill_rect(x1 - t, y0, x1, y1, rgba)
+
+    def fill_circle(self, cx: float, cy: float, radius: float, rgba: RGBA):
+        r = self._clip(cx - radius, cy - radius, cx + radius + 1, cy + radius + 1)
+        if r is None:
+            return
+        x0, y0, x1, y1 = r
+        yy, xx = self._grid()
+        dx = xx[y0:y1, x0:x1] - cx
+        dy = yy[y0:y1, x0:x1] - cy
+        m = (dx * dx + dy * dy) <= radius * radius
+        self.buf[y0:y1, x0:x1][m] = rgba
+        self._mark(r)
+
+    def fill_circles(self, xs: Sequence[float], ys: Sequence[float], radius: float, rgba: RGBA):
+        """같은 반지름/색 점 여러 개 — 스탬프 오프셋을 한 번에 scatter."""
+        xs = np.asarray(xs, dtype=np.float32)
+        ys = np.asarray(ys, dtype=np.float32)
+        if xs.size == 0:
+            return
+        rr = int(np.ceil(radius))
+        oy, ox = np.mgrid[-rr:rr + 1, -rr:rr + 1]
+        keep = (ox * ox + oy * oy) <= radius * radius
+        ox, oy = ox[keep], oy[keep]
+        px = (np.rint(xs)[:, None] + ox[None, :]).astype(np.int64).ravel()
+        py = (np.rint(ys)[:, None] + oy[None, :]).astype(np.int64).ravel()
+        ok = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+        if not ok.any():
+            return
+        px, py = px[ok], py[ok]
+        self.buf[py, px] = rgba
+        self._mark((int(px.min()), int(py.min()), int(px.max()) + 1, int(py.max()) + 1))
+
+    def arc(self, cx: float, cy: float, r_outer: float, r_inner: float,
+            a0_deg: float, a1_deg: float, rgba: RGBA):
+        """링 조각(시계방향 기준 각도, 0°=+x). r_inner=0 이면 부채꼴."""
+        r = self._clip(cx - r_outer, cy - r_outer, cx + r_outer + 1, cy + r_outer + 1)
+        if r is None:
+            return
+        x0, y0, x1, y1 = r
+        yy, xx = self._grid()
+        dx = xx[y0:y1, x0:x1] - cx
+        dy = yy[y0:y1, x0:x1] - cy
+        d2 = dx * dx + dy * dy
+        m = (d2 < r_outer * r_outer) & (d2 > r_inner * r_inner)
+        if a1_deg - a0_deg < 360.0:
+            ang = np.degrees(np.arctan2(dy, dx)) % 360.0
+            a0 = a0_deg % 360.0
+            a1 = a0 + (a1_deg - a0_deg)
+            m &= ((ang >= a0) & (ang <= a1)) | ((ang + 360.0 >= a0) & (ang + 360.0 <= a1))
+        self.buf[y0:y1, x0:x1][m] = rgba
+        self._mark(r)
+
+    def polyline(self, xs: Sequence[float], ys: Sequence[float], rgba: RGBA, thickness: int = 1):
+        """연속 점열 → 선분들. 각 선분을 길이만큼 샘플링해 한 번에 scatter."""
+        xs = np.asarray(xs, dtype=np.float32)
+        ys = np.asarray(ys, dtype=np.float32)
+        if xs.size < 2:
+            return
+        self.lines(xs[:-1], ys[:-1], xs[1:], ys[1:], rgba, thickness)
+
+    def line(self, x0: float, y0: float, x1: float, y1: float, rgba: RGBA, thickness: int = 1):
+        self.lines([x0], [y0], [x1], [y1], rgba, thickness)
+
+    def lines(self, x0s, y0s, x1s, y1s, rgba: RGBA, thickness: int = 1):
+        """독립 선분 N개(엣지 목록 등)를 한 번에. 캔버스(+두께) 밖 부분은 샘플링 전에 잘라냄."""
+        th = max(1, int(thickness))
+        x0s, y0s, x1s, y1s = self._clip_segments(x0s, y0s, x1s, y1s, th)
+        if x0s.size == 0:
+            return
+        n = np.maximum(np.abs(x1s - x0s), np.abs(y1s - y0s)).astype(np.int64) + 1
+        seg = np.repeat(np.arange(x0s.size), n)
+        start = np.cumsum(n) - n
+        t = (np.arange(int(n.sum())) - np.repeat(start, n)) / np.maximum(np.repeat(n - 1, n), 1)
+        px = np.rint(x0s[seg] + (x1s[seg] - x0s[seg]) * t).astype(np.int64)
+        py = np.rint(y0s[seg] + (y1s[seg] - y0s[seg]) * t).astype(np.int64)
+
+        if th > 1:
+            o = np.arange(th) - th // 2
+            oy, ox = np.meshgrid(o, o, indexing="ij")
+            px = (px[:, None] + ox.ravel()[None, :]).ravel()
+            py = (py[:, None] + oy.ravel()[None, :]).ravel()
+
+        ok = (px >= 0) & (px < self.width) & (py >= 0) & (py < self.height)
+        if not ok.any():
+            return
+        px, py = px[ok], py[ok]
+        self.buf[py, px] = rgba
+        self._mark((int(px.min()), int(py.min()), int(px.max()) + 1, int(py.max()) + 1))
+
+    def _clip_segments(self, x0s, y0s, x1s, y1s, pad: int):
+        """
+        Liang–Barsky(벡터화): [-pad, W+pad]×[-pad, H+pad] 로 선분을 자름.
+        비유한(NaN/inf) 좌표 선분과 완전히 밖인 선분은 버림 → 샘플 수가 캔버스 크기로 제한됨.
+        """
+        x0 = np.asarray(x0s, dtype=np.float64).ravel(); y0 = np.asarray(y0s, dtype=np.float64).ravel()
+        x1 = np.asarray(x1s, dtype=np.float64).ravel(); y1 = np.asarray(y1s, dtype=np.float64).ravel()
+        dx, dy = x1 - x0, y1 - y0
+        d = np.stack([-dx, dx, -dy, dy])
+        q = np.stack([x0 + pad, self.width + pad - x0, y0 + pad, self.height + pad - y0])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = q / d
+        t0 = np.max(np.where(d < 0, r, 0.0), axis=0)
+        t1 = np.min(np.where(d > 0, r, 1.0), axis=0)
+        keep = (np.isfinite(x0) & np.isfinite(y0) & np.isfinite(x1) & np.isfinite(y1)
+                & (t0 <= t1) & ~np.any((d == 0) & (q < 0), axis=0))
+        x0, y0, dx, dy, t0, t1 = x0[keep], y0[keep], dx[keep], dy[keep], t0[keep], t1[keep]
+        return ((x0 + t0 * dx).astype(np.float32), (y0 + t0 * dy).astype(np.float32),
+                (x0 + t1 * dx).astype(np.float32), (y0 + t1 * dy).astype(np.float32))
+
+    def legend(self, x: float, y: float, colors: Sequence[RGBA], swatch: int = 8, gap: int = 4,
+               vertical: bool = True):
+        """텍스트 없는 범례: 색 견본 사각형만(라벨은 omni.ui Label 로 옆에 배치)."""
+        for i, col in enumerate(colors):
+            off = i * (swatch + gap)
+            sx, sy = (x, y + off) if vertical else (x + off, y)
+            self.fill_rect(sx, sy, sx + swatch, sy + swatch, col)
+
+    def blit(self, img: np.ndarray, x: int = 0, y: int = 0):
+        """미리 렌더된 RGBA 배열 복사(캐시된 프레임 재사용)."""
+        h, w = img.shape[:2]
+        r = self._clip(x, y, x + w, y + h)
+        if r is None:
+            return
+        x0, y0, x1, y1 = r
+        self.buf[y0:y1, x0:x1] = img[y0 - y:y1 - y, x0 - x:x1 - x]
+        self._mark(r)
+
+    # ───────────────────────── upload ─────────────────────────
+    def upload(self, force: bool = False) -> bool:
+        """변경이 있을 때만 provider 로 전송. 전송했으면 True."""
+        if self._dirty is None and not force:
+            return False
+        if self.provider is None:
+            return False
+        ok = upload_rgba(self.provider, self.buf, prefer=self._upload_path)
+        if ok:
+            self._upload_path = ok
+            self._dirty = None
+        return bool(ok)
+
+
+def upload_rgba(provider: ui.ByteImageProvider, buf: np.ndarray, prefer: Optional[str] = None) -> Optional[str]:
+    """(h, w, 4) uint8 배열을 provider 로. 성공한 경로 이름("raw"/"array"/"list") 반환."""
+    if not buf.flags["C_CONTIGUOUS"]:
+        buf = np.ascontiguousarray(buf)
+    h, w = buf.shape[:2]
+    size = [w, h]
+    fmt = _rgba8_format()
+
+    def _raw():
+        ptr = _capsule_new(buf.ctypes.data, None, None)
+        provider.set_raw_bytes_data(ptr, size, fmt)
+
+    def _array():
+        provider.set_data_array(buf, size)
+
+    def _list():
+        if fmt is not None:
+            provider.set_bytes_data(buf.reshape(-1).tolist(), size, fmt)
+        else:
+            provider.set_bytes_data(buf.reshape(-1).tolist(), size)
+
+    paths = [("raw", _raw), ("array", _array), ("list", _list)]
+    if prefer:
+        paths.sort(key=lambda p: p[0] != prefer)
+    for name, fn in paths:
+        try:
+            fn()
+            return name
+        except Exception:
+            continue
+    print("[RasterCanvas] upload failed (no usable ByteImageProvider path)")
+    return None
+
+
+def benchmark(sizes: Sequence[int] = (256, 1024), repeat: int = 20) -> Dict[int, Dict[str, float]]:
+    """
+    Kit 안(Script Editor)에서 실행: 크기별 그리기/업로드 비용(ms, 평균).
+        from ui_code.ui.components.raster_canvas import benchmark; benchmark()
+    upload_list 는 기존 tolist() 경로 비교용.
+    """
+    out: Dict[int, Dict[str, float]] = {}
+    for n in sizes:
+        cv = RasterCanvas(n, n)
+        rng = np.random.default_rng(0)
+        xs = rng.uniform(0, n, 256); ys = rng.uniform(0, n, 256)
+
+        def _t(fn) -> float:
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                fn()
+            return (time.perf_counter() - t0) * 1000.0 / repeat
+
+        res = {
+            "clear": _t(lambda: cv.clear()),
+            "lines_256": _t(lambda: cv.lines(xs[:-1], ys[:-1], xs[1:], ys[1:], (255, 255, 255, 255))),
+            "polyline_256": _t(lambda: cv.polyline(xs, ys, (255, 0, 0, 255), thickness=2)),
+            "circles_256": _t(lambda: cv.fill_circles(xs, ys, 3.0, (0, 255, 0, 255))),
+            "arc": _t(lambda: cv.arc(n / 2, n / 2, n / 2, n / 3, 30, 200, (0, 0, 255, 255))),
+            "upload": _t(lambda: cv.upload(force=True)),
+            "upload_list": _t(lambda: upload_rgba(cv.provider, cv.buf, prefer="list")),
+        }
+        res["upload_path"] = cv._upload_path or "-"
+        out[n] = res
+        print(f"[RasterCanvas][bench] {n}x{n} " + " ".join(
+            f"{k}={v:.3f}ms" if isinstance(v, float) else f"{k}={v}" for k, v in res.items()))
+    return out
@@ -0,0 +1,120 @@
+# sparkline.py — 고정 크기 링버퍼 + RasterCanvas 기반 미니 추세 차트
+# - RingSeries: NumPy 링버퍼(용량 고정) → 세션이 길어져도 메모리 일정
+# - Sparkline: 새 샘플이 들어올 때만 다시 그림(그리기 비용은 용량·픽셀 수로 상한)
+
+import math
+import time
+from typing import Optional, Tuple
+
+import numpy as np
+import omni.ui as ui
+from ui_code.ui.components.raster_canvas import RasterCanvas
+
+RGBA = Tuple[int, int, int, int]
+
+
+class RingSeries:
+    """(t, v) 고정 용량 링버퍼. 오래된 샘플은 덮어씀."""
+
+    def __init__(self, capacity: int):
+        self.capacity = max(2, int(capacity))
+        self._t = np.zeros(self.capacity, dtype=np.float64)
+        self._v = np.zeros(self.capacity, dtype=np.float32)
+        self._head = 0      # 다음에 쓸 위치
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    def append(self, t: float, v: float):
+        self._t[self._head] = t
+        self._v[self._head] = v
+        self._head = (self._head + 1) % self.capacity
+        self._n = min(self._n + 1, self.capacity)
+
+    def replace_last(self, t: float, v: float):
+        i = (self._head - 1) % self.capacity
+        self._t[i] = t
+        self._v[i] = v
+
+    def last(self) -> Optional[Tuple[float, float]]:
+        if self._n == 0:
+            return None
+        i = (self._head - 1) % self.capacity
+        return float(self._t[i]), float(self._v[i])
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """시간 순서(오래된 → 최신) 배열."""
+        if self._n < self.capacity:
+            return self._t[:self._n], self._v[:self._n]
+        h = self._head
+        return np.concatenate((self._t[h:], self._t[:h])), np.concatenate((self._v[h:], self._v[:h]))
+
+
+class Sparkline:
+    """
+    window_s 구간을 resolution_s 간격 슬롯으로 보관(같은 슬롯 안 샘플은 마지막 값으로 덮어씀).
+    용량 = ceil(window_s / resolution_s).
+    """
+
+    def __init__(
+        self,
+        *,
+        width: int = 120,
+        height: int = 18,
+        window_s: float = 600.0,
+        resolution_s: float = 2.0,
+        color: RGBA = (255, 255, 255, 255),
+        background: RGBA = (255, 255, 255, 18),
+        y_min: Optional[float] = 0.0,
+    ):
+        self.window_s = float(window_s)
+        self.resolution_s = max(0.1, float(resolution_s))
+        self.series = RingSeries(int(math.ceil(self.window_s / self.resolution_s)))
+        self._color = color
+        self._y_min = y_min
+
+        self._canvas = RasterCanvas(int(width), int(height), background=background)
+        self.widget = ui.ImageWithProvider(self._canvas.provider, width=int(width), height=int(height))
+        self._canvas.upload(force=True)
+
+    def push(self, value: float, t: Optional[float] = None) -> bool:
+        """샘플 추가. 그래프가 바뀌었으면 즉시 다시 그리고 True."""
+        try:
+            v = float(value)
+        except Exception:
+            return False
+        if not math.isfinite(v):
+            return False
+        t = time.time() if t is None else float(t)
+
+        last = self.series.last()
+        if last is not None and (t - last[0]) < self.resolution_s:
+            if last[1] == v:
+                return False
+            self.series.replace_last(last[0], v)
+        else:
+            self.series.append(t, v)
+        self.render(t)
+        return True
+
+    def render(self, now: Optional[float] = None):
+        ts, vs = self.series.arrays()
+        cv = self._canvas
+        cv.clear()
+        if len(ts) >= 1:
+            now = time.time() if now is None else now
+            w, h = cv.width, cv.height
+            lo = float(vs.min()) if self._y_min is None else min(self._y_min, float(vs.min()))
+            hi = float(vs.max())
+            if hi - lo < 1e-6:
+                hi = lo + 1.0
+            xs = (ts - (now - self.window_s)) / self.window_s * (w - 1)
+            ys = (h - 2) - (vs - lo) / (hi - lo) * (h - 3)
+            keep = xs >= 0
+            xs, ys = xs[keep], ys[keep]
+            if len(xs) == 1:
+                cv.fill_circle(xs[0], ys[0], 1.0, self._color)
+            elif len(xs) > 1:
+                cv.polyline(xs, ys, self._color)
+        cv.upload()
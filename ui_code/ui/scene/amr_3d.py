@@ -2,13 +2,24 @@
 
 from pathlib import Path
 from typing import Optional, Dict, Tuple
-import math, time, re
+import math, time, re, threading
+import numpy as np
 from pxr import Sdf
 from pxr import UsdGeom, Gf
 from pxr import Usd
 import omni.usd
 import omni.kit.app as kit_app
-from ui_code.ui.utils.common import _file_uri
+from ui_code.ui.utils.common import _file_uri, _fmt_status
+from ui_code.ui.scene.xform_batch import XformBatch
+from ui_code.ui.scene.amr_instancer import AmrInstancer
+from ui_code.ui.scene.fleet_state import FleetState
+from ui_code.ui.scene.live_layer import get_live_layer, live_edit
+from ui_code.ui.scene.path_curves import PathCurves
+from ui_code.ui.scene.spawn_queue import SpawnQueue
+
+
+# 상태 색 구간(FleetState.bucket 값) — 우선순위: stale > 예외 > 오프라인 > 충전 > 저배터리 > 작업/대기
+_B_DEFAULT, _B_IDLE, _B_INTASK, _B_CHARGING, _B_LOW_BATTERY, _B_EXCEPTION, _B_OFFLINE, _B_STALE = range(8)
 
 
 class Amr3D:
@@ -19,6 +30,14 @@ class Amr3D:
         # 그룹 경로
         self._group_path = "/World/AMRs"
 
+        # 렌더 모드: "prims"(로봇마다 Xform prim) | "instancer"(PointInstancer 1개, 선택 로봇만 prim)
+        self._render_mode = "prims"
+        self._instancer_path = "/World/AMRFleet"
+        self._instancer: Optional[AmrInstancer] = None
+        self._selected: set = set()
+        self._stage = None
+        self._live = None   # 라이브 session sublayer — 로봇 prim/transform 은 모두 여기에 기록
+
         # 좌표/축 보정
         self._TILT_X_DEG = 0.0
         self._YAW_SIGN   = +1.0
@@ -28,19 +47,40 @@ class Amr3D:
         self._OFFSET_U   = 0.0
         self._OFFSET_V   = 0.0
 
-        # 모션 파라미터
-        self._MOVE_SPEED_MM_S = 300    # mm/s
-        self._YAW_SPEED_DPS   = 360   # deg/s
+        # 모션 파라미터(예측 모델: 샘플 간 속도로 외삽 + 제한된 보정)
+        self._MOVE_SPEED_MM_S = 300    # mm/s, 예측 위치로 끌어당기는 보정 최대 속도
+        self._YAW_SPEED_DPS   = 360   # deg/s, yaw 보정 최대 속도
         self._YAW_EPS_DEG     = 0.5
         self._POS_EPS_UNITS   = 0.01
+        self._HORIZON_S       = 2.5    # 마지막 샘플 이후 외삽 최대 시간
+        self._CORR_TAU_S      = 0.3    # 보정 시정수
+        self._SNAP_MM         = 2000.0 # 오차가 이보다 크면 즉시 이동
+        self._SNAP_DEG        = 90.0
+        self._MAX_SPEED_MM_S  = 3000.0 # 이보다 빠른 변위는 순간이동으로 보고 속도 0
+        self._VEL_ALPHA       = 0.85   # 속도 EMA 가중치(새 샘플)
 
         self._last_tick = time.perf_counter()
 
-        # 캐시
+        # 캐시 / 인덱스: robotId ↔ prim 경로 ↔ op 핸들 (경로 정제는 로봇당 1회)
         self._ops_cache: Dict[str, Tuple] = {}  # rid -> (t_op, rxyz_op, s_op)
-        self._pos_cache: Dict[str, Tuple[float, float]] = {}
-        self._yaw_cache: Dict[str, float] = {}
-        self._targets:   Dict[str, Tuple[float, float, float]] = {}
+        self._path_of: Dict[str, str] = {}      # rid -> prim 경로
+        self._rid_of_path: Dict[str, str] = {}  # prim 경로 -> rid
+        self._swept = False                     # 첫 sync 때 이전 세션 잔여 prim 정리
+
+        # 새 로봇 prim 생성은 프레임 예산 안에서 나눠 처리(대량 추가 시 프레임 끊김 방지)
+        self._spawn_queue = SpawnQueue(self._spawn_robot, budget_ms=4.0, name="Amr3D")
+
+        # 보간 상태(현재/목표 위치·yaw) — NumPy 배열, 좌표는 스테이지 단위
+        self._fleet = FleetState()
+
+        # 맵(mm) → 스테이지 변환: [x_mm, y_mm, 1] @ _affine → translate (x, y, z)
+        self._is_z_up = True
+        self._mm_to_units = 1.0
+        self._affine = np.eye(3)
+        self._yaw_axis = 2
+
+        # 프레임당 transform 일괄 기록(Sdf.ChangeBlock 1회)
+        self._xbatch: Optional[XformBatch] = None
 
         self._AMR_SCALE = 0.3
         self._update_sub = None
@@ -49,8 +89,56 @@ class Amr3D:
         self._dbg_last_log = 0.0
         self._dbg_log_interval = 2.0  # 초
 
+        # 프로토 지연 로드: "none" → "proxy"(placeholder 표시, 에셋은 백그라운드에서 open) → "ready" | "failed"
+        self._proto_state = "none"
+        self._proto_layer = None      # 백그라운드에서 연 에셋 레이어(레지스트리에 살려 두는 참조)
+        self._proto_thread = None
+        self._pending_sync = None     # init 전에 들어온 마지막 (items, t)
+        self._t_start = None          # time-to-first-robot 기준 시각(perf_counter)
+        self._first_robot_logged = False
+
+        # 궤적/계획 경로(BasisCurves 1개, 기본 꺼짐)
+        self._paths: Optional[PathCurves] = None
+        self._paths_path = "/World/AMRPaths"
+        self._trails_on = False
+        self._plans_on = False
+        self._TRAIL_LEN = 64          # 로봇당 trail 점 수(ring buffer)
+        self._TRAIL_STEP_MM = 100.0   # 이보다 적게 움직이면 trail 점 추가 안 함
+        self._PLAN_LEN = 32           # 로봇당 계획 경로 최대 점 수
+        self._PATH_WIDTH_MM = 40.0
+        self._PATH_LIFT_MM = 20.0     # 바닥과 z-fighting 방지
+        self._PATH_FLUSH_S = 0.1      # 곡선 기록 최소 간격(장식용이라 10Hz 로 충분, 대규모 fleet 비용 상한)
+        self._paths_last_flush = 0.0
+        self._plans_mm: Dict[str, list] = {}   # rid -> [(x_mm, y_mm), ...]
+
+        # 상태/배터리 색(displayColor primvar, 구간이 바뀐 로봇만 기록)
+        self._colors_on = True
+        self._colors_dirty = False
+        self._LOW_BATTERY_PCT = 20.0
+        self._palette = np.array([
+            (0.80, 0.80, 0.80),   # default
+            (0.55, 0.75, 1.00),   # IDLE
+            (0.20, 0.85, 0.30),   # INTASK
+            (1.00, 0.85, 0.10),   # CHARGING
+            (1.00, 0.50, 0.00),   # 저배터리
+            (0.95, 0.15, 0.15),   # EXCEPTION
+            (0.30, 0.30, 0.30),   # OFFLINE / EXIT
+            (0.55, 0.55, 0.55),   # stale(데이터 끊김)
+        ], dtype=np.float32)
+
+        # 데이터 신선도(USD 기록 시각) 추적
+        self._freshness = None
+        self._usd_pending: set = set()
+        self._stale: set = set()
+
     # ───────────────── lifecycle ─────────────────
-    def init(self, amr_usd_path: str):
+    def init(self, amr_usd_path: str, *, deferred: bool = False, t0: Optional[float] = None):
+        """
+        deferred=True: 에셋은 payload 로 걸어 두고 로드를 미룬다. 로봇은 우선 placeholder 박스로 표시되고,
+        백그라운드 스레드가 에셋 레이어를 연 뒤 다음 프레임에 payload 를 한 번에 로드한다.
+        t0: time-to-first-robot 측정 기준(perf_counter). 없으면 호출 시각.
+        """
+        self._t_start = time.perf_counter() if t0 is None else float(t0)
         self._ctx   = omni.usd.get_context()
         self._stage = self._ctx.get_stage()
 
@@ -66,34 +154,6 @@ class Amr3D:
             world = self._stage.DefinePrim("/World", "Xform")
             self._stage.SetDefaultPrim(world)
 
-        # 그룹 보장
-        self._group = self._stage.DefinePrim(self._group_path, "Xform")
-
-        # 프로토타입 로드
-        self._asset_uri  = _file_uri(Path(amr_usd_path))
-        self._proto_path = "/World/_AMR_proto"
-        proto = self._stage.GetPrimAtPath(self._proto_path)
-        if not proto:
-            proto = self._stage.DefinePrim(self._proto_path, "Xform")
-            proto.GetReferences().AddReference(self._asset_uri)
-            proto.Load()
-        self._proto = proto
-
-        try:
-            xf = UsdGeom.Xformable(self._proto)
-            s_op = None
-            for op in xf.GetOrderedXformOps():
-                if op.GetOpName() == "xformOp:scale":
-                    s_op = op
-                    break
-            if s_op is None:
-                s_op = xf.AddScaleOp()
-            s_op.Set(Gf.Vec3d(0.1, 0.1, 0.1))
-            print("[Amr3D] _AMR_proto scaled down (0.1x)")
-        except Exception as e:
-            print("[Amr3D] failed to scale proto:", e)
-
-
         # Stage 설정
         up = UsdGeom.GetStageUpAxis(self._stage)
         self._is_z_up = (up == UsdGeom.Tokens.z)
@@ -103,6 +163,59 @@ class Amr3D:
         self._mm_to_units = units_per_meter / 1000.0   # mm → stage units
         self._POS_EPS_UNITS = 10.0 * self._mm_to_units
         self._TILT_X_DEG = (90.0 if self._is_z_up else 0.0)
+        self._rebuild_affine()
+
+        # 이하 그룹/프로토/로봇은 라이브 레이어에만 authored(공장 씬 레이어는 건드리지 않음)
+        self._live = get_live_layer(self._stage)
+        self._asset_uri  = _file_uri(Path(amr_usd_path))
+        self._proto_path = "/World/_AMR_proto"
+        proto = self._stage.GetPrimAtPath(self._proto_path)
+        # 예전 버전이 씬에 저장한 프로토(에셋 직접 reference)는 그대로 사용
+        legacy = bool(proto) and proto.HasAuthoredReferences()
+        if deferred and not legacy:
+            self._set_payload_rule(Usd.StageLoadRules.NoneRule)
+        with live_edit(self._live):
+            # 그룹 보장
+            self._group = self._stage.DefinePrim(self._group_path, "Xform")
+
+            # 프로토타입: 에셋은 <proto>/Asset 의 payload(로드 시점 제어 가능)
+            if not proto:
+                proto = self._stage.DefinePrim(self._proto_path, "Xform")
+            if not legacy:
+                asset = self._stage.DefinePrim(f"{self._proto_path}/Asset")   # 타입은 payload 가 결정
+                if not asset.HasAuthoredPayloads():
+                    asset.GetPayloads().AddPayload(self._asset_uri)
+                if deferred:
+                    self._define_proxy()
+            self._proto = proto
+
+            try:
+                xf = UsdGeom.Xformable(self._proto)
+                s_op = None
+                for op in xf.GetOrderedXformOps():
+                    if op.GetOpName() == "xformOp:scale":
+                        s_op = op
+                        break
+                if s_op is None:
+                    s_op = xf.AddScaleOp()
+                s_op.Set(Gf.Vec3d(0.1, 0.1, 0.1))
+                print("[Amr3D] _AMR_proto scaled down (0.1x)")
+            except Exception as e:
+                print("[Amr3D] failed to scale proto:", e)
+
+        # 0.1mm / 0.01° 미만 변화는 기록 생략
+        self._xbatch = XformBatch(self._stage, pos_eps=0.1 * self._mm_to_units, rot_eps_deg=0.01,
+                                  edit_target=self._live.edit_target)
+
+        if self._render_mode == "instancer":
+            with live_edit(self._live):
+                self._instancer = AmrInstancer(self._stage, self._instancer_path, self._asset_uri,
+                                               scale=self._AMR_SCALE, proto_ref=self._proto_path)
+
+        if deferred and not legacy:
+            self._start_proto_load()
+        else:
+            self._proto_state = "ready"
 
         # per-frame 업데이트 구독
         if not self._update_sub:
@@ -111,6 +224,95 @@ class Amr3D:
                 lambda e: self.update()
             )
 
+        if self._trails_on or self._plans_on:
+            self._ensure_paths()
+
+        # init 전에 들어온 데이터 반영
+        if self._pending_sync is not None:
+            items, t = self._pending_sync
+            self._pending_sync = None
+            self.sync(items, t)
+
+    # ───────────────── deferred proto ─────────────────
+    def _payload_roots(self):
+        """payload 로드 규칙을 걸 경로: 프로토 에셋 + 그 프로토를 참조하는 로봇/instancer 서브트리."""
+        return [f"{self._proto_path}/Asset", self._group_path, self._instancer_path]
+
+    def _set_payload_rule(self, rule):
+        rules = self._stage.GetLoadRules()
+        for p in self._payload_roots():
+            rules.AddRule(Sdf.Path(p), rule)
+        self._stage.SetLoadRules(rules)   # 재구성 1회
+
+    def _define_proxy(self):
+        """로드 전까지 보일 placeholder 박스(로봇 스케일 적용 후 약 0.9 × 0.7 × 0.3 m)."""
+        cube = UsdGeom.Cube.Define(self._stage, f"{self._proto_path}/Proxy")
+        cube.CreateSizeAttr(1.0)
+        cube.CreateDisplayColorAttr([Gf.Vec3f(1.0, 0.55, 0.1)])
+        # 로봇 prim 의 scale op(_AMR_SCALE)가 프로토 scale 을 덮어쓰므로 _AMR_SCALE 만 보정, 틸트 후 로컬 Y 가 up
+        k = self._mm_to_units * 1000.0 / max(self._AMR_SCALE, 1e-6)
+        xf = UsdGeom.Xformable(cube)
+        xf.AddTranslateOp().Set(Gf.Vec3d(0.0, 0.15 * k, 0.0))
+        xf.AddScaleOp().Set(Gf.Vec3f(0.9 * k, 0.3 * k, 0.7 * k))
+
+    def _start_proto_load(self):
+        """에셋 레이어 open(파일 I/O + 파싱)은 백그라운드 — 완료되면 update() 가 payload 를 로드."""
+        self._proto_state = "proxy"
+        uri = self._asset_uri
+        t_req = time.perf_counter()
+
+        def _open():
+            try:
+                self._proto_layer = Sdf.Layer.FindOrOpen(uri)
+            except Exception as e:
+                print("[Amr3D] asset open failed:", e)
+                self._proto_layer = None
+            print(f"[Amr3D] asset layer opened in {(time.perf_counter() - t_req) * 1000:.0f} ms")
+
+        self._proto_thread = threading.Thread(target=_open, daemon=True)
+        self._proto_thread.start()
+
+    def _poll_proto(self):
+        thr = self._proto_thread
+        if thr is None or thr.is_alive():
+            return
+        self._proto_thread = None
+        if self._proto_layer is None:
+            self._proto_state = "failed"
+            print("[Amr3D] AMR asset unavailable — keeping placeholder:", self._asset_uri)
+            return
+        t = time.perf_counter()
+        # 레이어는 이미 열려 있으므로 여기선 합성만(메인 스레드)
+        self._set_payload_rule(Usd.StageLoadRules.AllRule)
+        with live_edit(self._live):
+            self._stage.RemovePrim(f"{self._proto_path}/Proxy")
+        self._proto_state = "ready"
+        print(f"[Amr3D] proto ready: load {(time.perf_counter() - t) * 1000:.0f} ms, "
+              f"{(time.perf_counter() - self._t_start) * 1000:.0f} ms after startup")
+        self._log_first_robot()
+
+    def _log_first_robot(self):
+        if self._first_robot_logged or self._proto_state != "ready" or not len(self._fleet):
+            return
+        self._first_robot_logged = True
+        if self._t_start is not None:
+            print(f"[Amr3D] time-to-first-robot: {(time.perf_counter() - self._t_start) * 1000:.0f} ms")
+
+    def destroy(self):
+        """구독 해제 + 핸들 정리. 로봇 prim 은 라이브 레이어와 함께 버려지므로 따로 지우지 않는다."""
+        self._update_sub = None
+        self._proto_thread = None
+        self._proto_layer = None
+        self._spawn_queue.clear()
+        self._ops_cache.clear()
+        if self._xbatch is not None:
+            self._xbatch.clear()
+            self._xbatch = None
+        self._instancer = None
+        self._paths = None
+        self._live = None
+        self._stage = None
+
     # ───────────────── config ─────────────────
     def set_config(self, *, tilt_x=None, yaw_sign=None, yaw_offset=None,
                    sign_v=None, scale_corr=None, offset_u=None, offset_v=None, amr_scale=None):
@@ -121,14 +323,229 @@ class Amr3D:
         if scale_corr is not None: self._SCALE_CORR = float(scale_corr)
         if offset_u   is not None: self._OFFSET_U   = float(offset_u)
         if offset_v   is not None: self._OFFSET_V   = float(offset_v)
-        if amr_scale  is not None: self._AMR_SCALE  = float(amr_scale)
+        self._rebuild_affine()
+        if amr_scale  is not None:
+            self._AMR_SCALE = float(amr_scale)
+            if self._instancer is not None:
+                self._instancer.set_scale(self._AMR_SCALE)
+
+    def set_render_mode(self, mode: str = "prims"):
+        """"prims" | "instancer". init 이후 호출하면 현재 로봇들을 새 방식으로 다시 만든다."""
+        mode = "instancer" if str(mode).lower() == "instancer" else "prims"
+        if mode == self._render_mode:
+            return
+        self._render_mode = mode
+        if self._stage is None or self._xbatch is None:
+            return  # init() 에서 적용
+
+        with live_edit(self._live):
+            for rid in list(self._ops_cache.keys()):
+                self._drop_robot_prim(rid)
+            if self._instancer is not None:
+                self._instancer.destroy()
+                self._instancer = None
+            if mode == "instancer":
+                self._instancer = AmrInstancer(self._stage, self._instancer_path, self._asset_uri,
+                                               scale=self._AMR_SCALE, proto_ref=self._proto_path)
+        self._fleet.inst[:] = -1
+        self._fleet.shown[:] = -1
+        self._colors_dirty = True
+        self._spawn_queue.clear()
+        for rid in self._fleet.index:
+            self._queue_spawn(rid)
+        self._fleet.touch()   # 새 표현에 현재 위치를 한 번 기록
+        print(f"[Amr3D] render mode → {mode}")
+
+    def set_selected(self, rids):
+        """instancer 모드: 선택된 로봇만 개별 prim 으로 꺼내고(인스턴스는 숨김) 해제되면 되돌린다."""
+        new = {str(r) for r in (rids or []) if r not in (None, "", "-")}
+        if new == self._selected:
+            return
+        old, self._selected = self._selected, new
+        inst = self._instancer
+        if inst is None:
+            return  # prims 모드는 모든 로봇이 이미 prim
+        with live_edit(self._live):
+            for rid in old - new:
+                self._drop_robot_prim(rid)
+                inst.hide(rid, False)
+        for rid in new - old:
+            if rid in inst:
+                self._spawn_queue.push(rid, front=True)   # 선택은 다음 프레임 맨 먼저
+
+    def set_paths(self, *, trails: Optional[bool] = None, plans: Optional[bool] = None,
+                  trail_len: Optional[int] = None, trail_step_mm: Optional[float] = None):
+        """궤적(trail)/계획 경로 표시 on/off. 둘 다 꺼지면 curves prim 제거."""
+        if trails is not None: self._trails_on = bool(trails)
+        if plans  is not None: self._plans_on  = bool(plans)
+        if trail_step_mm is not None: self._TRAIL_STEP_MM = float(trail_step_mm)
+        rebuild = trail_len is not None and int(trail_len) != self._TRAIL_LEN
+        if trail_len is not None: self._TRAIL_LEN = max(2, int(trail_len))
+        if self._stage is None or self._xbatch is None:
+            return  # init() 에서 적용
+        if self._paths is not None and (rebuild or not (self._trails_on or self._plans_on)):
+            with live_edit(self._live):
+                self._paths.destroy()
+            self._paths = None
+        if self._trails_on or self._plans_on:
+            self._ensure_paths()
+
+    def set_planned_path(self, rid: str, pts_mm):
+        """계획 경로(맵 좌표 mm 의 (x, y) 목록). 비거나 None 이면 제거."""
+        rid = str(rid)
+        pts = [tuple(p[:2]) for p in (pts_mm or [])]
+        if pts:
+            self._plans_mm[rid] = pts
+        elif self._plans_mm.pop(rid, None) is None:
+            return
+        self._apply_plan(rid)
+
+    def _ensure_paths(self):
+        if self._paths is None:
+            with live_edit(self._live):
+                self._paths = PathCurves(
+                    self._stage, self._paths_path,
+                    trail_len=self._TRAIL_LEN, plan_len=self._PLAN_LEN,
+                    min_step=self._TRAIL_STEP_MM * self._mm_to_units,
+                    width=self._PATH_WIDTH_MM * self._mm_to_units,
+                )
+            for rid in self._plans_mm:
+                self._apply_plan(rid)
+        self._paths.min_step = self._TRAIL_STEP_MM * self._mm_to_units
+        self._paths.set_visible(self._trails_on, self._plans_on)
+
+    def _path_lift(self) -> np.ndarray:
+        up = np.zeros(3)
+        up[2 if self._is_z_up else 1] = self._PATH_LIFT_MM * self._mm_to_units
+        return up
+
+    def _apply_plan(self, rid: str):
+        paths = self._paths
+        row = self._fleet.index.get(rid)
+        if paths is None or row is None:
+            return
+        pts = self._plans_mm.get(rid)
+        if not pts:
+            paths.set_plan(row, np.zeros((0, 3)))
+            return
+        xy1 = np.array([(x, y, 1.0) for x, y in pts], dtype=np.float64)
+        lift = self._path_lift()
+        # 로봇 현재 위치 → 경유 노드 순(설정 시점 위치 기준)
+        paths.set_plan(row, np.vstack([self._fleet.cur[row] + lift, xy1 @ self._affine + lift]))
+
+    def set_status_colors(self, enabled: bool = True, *, low_battery_pct: Optional[float] = None,
+                          colors: Optional[Dict[str, Tuple[float, float, float]]] = None):
+        """
+        상태/배터리 색 on/off 와 설정. colors 키: default, idle, intask, charging, low_battery,
+        exception, offline, stale. 바꾸면 전체 로봇을 한 번 다시 기록.
+        """
+        self._colors_on = bool(enabled)
+        if low_battery_pct is not None:
+            self._LOW_BATTERY_PCT = float(low_battery_pct)
+        keys = ("default", "idle", "intask", "charging", "low_battery", "exception", "offline", "stale")
+        for k, rgb in (colors or {}).items():
+            if k in keys:
+                self._palette[keys.index(k)] = rgb
+        self._fleet.shown[:] = -1
+        self._colors_dirty = True
+
+    def _bucket_of(self, it: dict) -> int:
+        st = _fmt_status(it.get("status"))
+        if st == "EXCEPTION":
+            return _B_EXCEPTION
+        if st in ("OFFLINE", "EXIT"):
+            return _B_OFFLINE
+        if st == "CHARGING":
+            return _B_CHARGING
+        b = it.get("batteryLevel")
+        if b is not None:
+            try:
+                b = float(b)
+                if (b if b > 1.0 else b * 100.0) < self._LOW_BATTERY_PCT:
+                    return _B_LOW_BATTERY
+            except Exception:
+                pass
+        if st in ("INTASK", "RUNNING", "WORKING"):
+            return _B_INTASK
+        if st == "IDLE":
+            return _B_IDLE
+        return _B_DEFAULT
+
+    def _apply_colors(self):
+        """표시 구간(stale 우선)이 기록된 값과 다른 행만 displayColor 기록."""
+        self._colors_dirty = False
+        if not self._colors_on:
+            return
+        fleet = self._fleet
+        n = fleet.n
+        if not n:
+            return
+        eff = np.where(fleet.used[:n], fleet.bucket[:n], -1).astype(np.int8)
+        for rid in self._stale:
+            j = fleet.index.get(rid)
+            if j is not None:
+                eff[j] = _B_STALE
+        rows = np.flatnonzero(eff != fleet.shown[:n])
+        if not len(rows):
+            return
+        fleet.shown[rows] = eff[rows]
+        rows = rows[eff[rows] >= 0]
+
+        inst = self._instancer
+        if inst is not None:
+            slots = fleet.inst[rows]
+            ok = slots >= 0
+            inst.set_colors(slots[ok], self._palette[eff[rows[ok]]])
+        if self._ops_cache:
+            with live_edit(self._live):
+                for i in rows.tolist():
+                    ops = self._ops_cache.get(fleet.ids[i])
+                    if ops is None:
+                        continue
+                    try:
+                        pv = UsdGeom.PrimvarsAPI(ops[0].GetAttr().GetPrim()).CreatePrimvar(
+                            "displayColor", Sdf.ValueTypeNames.Color3fArray, UsdGeom.Tokens.constant)
+                        pv.Set([Gf.Vec3f(*self._palette[eff[i]].tolist())])
+                    except Exception as e:
+                        print("[Amr3D] color write failed:", e)
+
+    def set_freshness(self, tracker):
+        """FreshnessTracker 연결: 새 목표가 USD 에 처음 기록된 시각을 알린다."""
+        self._freshness = tracker
+
+    def set_stale(self, rid: str, stale: bool):
+        """로봇 prim 에 twin:stale 플래그 기록(값이 바뀔 때만)."""
+        rid = str(rid)
+        if (rid in self._stale) == bool(stale):
+            return
+        if stale:
+            self._stale.add(rid)
+        else:
+            self._stale.discard(rid)
+        self._colors_dirty = True
+        try:
+            path = self._path_of.get(rid)
+            prim = self._stage.GetPrimAtPath(path) if path else None
+            if prim:
+                with live_edit(self._live):
+                    attr = prim.CreateAttribute("twin:stale", Sdf.ValueTypeNames.Bool, custom=True)
+                    attr.Set(bool(stale))
+        except Exception as e:
+            print("[Amr3D] set_stale failed:", e)
 
     def set_motion(self, *, move_speed_mm_s=None, yaw_speed_dps=None,
-                   yaw_eps_deg=None, pos_eps_mm=None):
+                   yaw_eps_deg=None, pos_eps_mm=None, horizon_s=None, corr_tau_s=None,
+                   snap_mm=None, snap_deg=None, max_speed_mm_s=None, vel_alpha=None):
         if move_speed_mm_s is not None: self._MOVE_SPEED_MM_S = float(move_speed_mm_s)
         if yaw_speed_dps   is not None: self._YAW_SPEED_DPS   = float(yaw_speed_dps)
         if yaw_eps_deg     is not None: self._YAW_EPS_DEG     = float(yaw_eps_deg)
         if pos_eps_mm      is not None: self._POS_EPS_UNITS   = float(pos_eps_mm) * self._mm_to_units
+        if horizon_s       is not None: self._HORIZON_S       = float(horizon_s)
+        if corr_tau_s      is not None: self._CORR_TAU_S      = float(corr_tau_s)
+        if snap_mm         is not None: self._SNAP_MM         = float(snap_mm)
+        if snap_deg        is not None: self._SNAP_DEG        = float(snap_deg)
+        if max_speed_mm_s  is not None: self._MAX_SPEED_MM_S  = float(max_speed_mm_s)
+        if vel_alpha       is not None: self._VEL_ALPHA       = float(vel_alpha)
 
     # ───────────────── helpers ─────────────────
     @staticmethod
@@ -206,6 +623,116 @@ class Amr3D:
 
         return t_op, r_op, s_op
 
+    def _path_for(self, rid: str) -> str:
+        """rid → prim 경로(최초 1회 정제 후 캐시). 정제 결과가 겹치면 접미사로 구분."""
+        path = self._path_of.get(rid)
+        if path is None:
+            path = base = self._amr_path(rid)
+            k = 2
+            while path in self._rid_of_path:
+                path = f"{base}_{k}"
+                k += 1
+            self._path_of[rid] = path
+            self._rid_of_path[path] = rid
+        return path
+
+    def _queue_spawn(self, rid: str):
+        """새 로봇 표현 준비. instancer 슬롯은 즉시, prim 생성은 spawn 큐로."""
+        inst = self._instancer
+        if inst is not None:
+            self._fleet.inst[self._fleet.index[rid]] = inst.ensure(rid)
+            if rid not in self._selected:
+                return
+        self._spawn_queue.push(rid)
+
+    def _drain_spawns(self):
+        """spawn 큐를 프레임 예산(ms) 안에서 처리."""
+        if self._spawn_queue:
+            with live_edit(self._live):
+                self._spawn_queue.drain()
+
+    def _spawn_robot(self, rid: str):
+        if rid in self._fleet.index:   # 큐에 있는 동안 빠진 로봇은 건너뜀
+            self._ensure_robot(rid)
+
+    @property
+    def spawn_progress(self) -> Tuple[int, int]:
+        """prim 생성 진행률 (처리 수, 전체 수). 대기 중인 게 없으면 (0, 0)."""
+        return self._spawn_queue.progress
+
+    def _ensure_robot(self, rid: str):
+        """개별 prim + op 캐시 보장(prims 모드 전체 / instancer 모드의 선택 로봇)."""
+        inst = self._instancer
+        if inst is not None and rid not in self._selected:
+            return
+        if rid in self._ops_cache:
+            return
+
+        stage = self._stage
+        path = self._path_for(rid)
+        prim = stage.GetPrimAtPath(Sdf.Path(path))
+        if not prim:
+            prim = stage.DefinePrim(path, "Xform")
+            prim.GetReferences().AddReference("", self._proto_path)
+            if self._proto_state == "ready":   # 지연 로드 중엔 load 규칙이 payload 를 막고 있어야 함
+                prim.Load()
+
+        t_op, rxyz_op, s_op = self._ensure_ops(prim)
+        self._ops_cache[rid] = (t_op, rxyz_op, s_op)
+        if self._xbatch is not None:
+            self._xbatch.bind(rid, t_op, rxyz_op)
+        if inst is not None:
+            inst.hide(rid, True)
+        idx = self._fleet.index.get(rid)
+        if idx is not None:
+            self._fleet.touch(idx)   # 새 prim 에 현재 위치 기록
+            self._fleet.shown[idx] = -1
+            self._colors_dirty = True
+        if rid in self._stale:
+            self._stale.discard(rid)
+            self.set_stale(rid, True)
+
+    def _drop_robot_prim(self, rid: str):
+        self._ops_cache.pop(rid, None)
+        if self._xbatch is not None:
+            self._xbatch.unbind(rid)
+        path = self._path_of.get(rid)
+        if not path:
+            return
+        try:
+            if self._stage.GetPrimAtPath(path):
+                self._stage.RemovePrim(path)
+        except Exception as e:
+            print("[Amr3D] remove prim failed:", e)
+
+    def _remove_robot(self, rid: str):
+        if self._instancer is not None:
+            self._instancer.release(rid)
+        if self._paths is not None and rid in self._fleet.index:
+            self._paths.clear_row(self._fleet.index[rid])   # 행 재사용 시 이전 궤적이 이어지지 않도록
+        with live_edit(self._live):
+            self._drop_robot_prim(rid)
+        self._fleet.remove(rid)
+        self._usd_pending.discard(rid)
+        self._stale.discard(rid)
+        path = self._path_of.pop(rid, None)
+        if path is not None:
+            self._rid_of_path.pop(path, None)
+
+    def _sweep_orphans(self):
+        """
+        그룹 아래에서 인덱스에 없는 prim 제거. 첫 sync 때 1회.
+        라이브 레이어는 세션마다 새로 만들어지므로, 남아 있는 건 예전 버전이 씬 레이어에 저장한 잔여물
+        → 현재 edit target(씬 레이어)에서 지운다.
+        """
+        parent = self._group or self._stage.GetPrimAtPath(Sdf.Path(self._group_path))
+        if not parent:
+            return
+        for child in list(parent.GetChildren()):
+            path = child.GetPath().pathString
+            if path not in self._rid_of_path:
+                self._stage.RemovePrim(path)
+
     def _map_to_units(self, it: dict):
         # 다양한 키 지원 (서버/버전별 호환)
         x_mm = self._getf(it, "x", "posX", "mapX", "positionX", "x_mm", "X", default=0.0)
@@ -215,54 +742,127 @@ class Amr3D:
         v = v * self._SIGN_V + self._OFFSET_V
         return u, v
 
+    def _rebuild_affine(self):
+        """SCALE_CORR / OFFSET / SIGN_V / up-axis 를 3x3 행렬 하나로 접어 둔다."""
+        k = self._mm_to_units * self._SCALE_CORR
+        v_axis = 1 if self._is_z_up else 2
+        a = np.zeros((3, 3), dtype=np.float64)
+        a[0, 0] = k
+        a[2, 0] = self._OFFSET_U
+        a[1, v_axis] = self._SIGN_V * k
+        a[2, v_axis] = self._OFFSET_V
+        self._affine = a
+        self._yaw_axis = 2 if self._is_z_up else 1
+
+    def _rotations(self, yaw: np.ndarray) -> np.ndarray:
+        """yaw(도) 배열 → rotateXYZ 배열 (N, 3): 틸트는 X, yaw 는 up 축."""
+        r = np.zeros((len(yaw), 3), dtype=np.float64)
+        r[:, 0] = self._TILT_X_DEG
+        r[:, self._yaw_axis] = yaw
+        return r
+
+    # ───────────────── public: 다른 scene 레이어(컨테이너 등)용 ─────────────────
+    @property
+    def stage(self):
+        return self._stage
+
+    @property
+    def live_layer(self):
+        return self._live
+
+    @property
+    def mm_to_units(self) -> float:
+        return self._mm_to_units
+
+    @property
+    def up_axis(self) -> int:
+        return 2 if self._is_z_up else 1
+
+    def map_to_stage(self, xy_mm: np.ndarray) -> np.ndarray:
+        """맵 좌표 (N, 2) mm → 스테이지 (N, 3). 로봇과 같은 보정(SCALE_CORR/OFFSET/SIGN_V) 적용."""
+        xy_mm = np.asarray(xy_mm, dtype=np.float64).reshape(-1, 2)
+        return np.hstack([xy_mm, np.ones((len(xy_mm), 1))]) @ self._affine
+
+    def robot_poses(self, rids):
+        """robotId 목록 → (있는지 mask, 현재 표시 위치 (N,3), yaw (N,))."""
+        index = self._fleet.index
+        rows = np.fromiter((index.get(str(r), -1) for r in rids), dtype=np.int64, count=len(rids))
+        ok = rows >= 0
+        safe = np.where(ok, rows, 0)
+        return ok, self._fleet.cur[safe].copy(), self._fleet.yaw[safe].copy()
+
     @staticmethod
     def _norm_deg(deg: float) -> float:
         return ((deg + 180.0) % 360.0) - 180.0
 
-    def _compose_euler(self, yaw_deg: float) -> Gf.Vec3d:
-        if self._is_z_up:
-            return Gf.Vec3d(self._TILT_X_DEG, 0.0, yaw_deg)
-        else:
-            return Gf.Vec3d(self._TILT_X_DEG, yaw_deg, 0.0)
-
     # ───────────────── data → targets ─────────────────
-    def sync(self, items):
-        stage = self._stage
+    def sync(self, items, t: Optional[float] = None):
+        """t: 응답 수신 시각(epoch 초). 아이템에 서버 시각이 있으면 그 값을 로컬 시계로 환산해 사용."""
+        recv = time.time() if t is None else float(t)
+        if self._xbatch is None:
+            # init 전(스테이지/프로토 준비 전): 마지막 스냅샷만 보관했다가 init 끝에서 반영
+            self._pending_sync = (items, recv)
+            return
+        fr = self._freshness
         items = items or []
-        seen = set()
+        fleet = self._fleet
 
+        # 원시 좌표(mm)/yaw 수집 → 변환은 행렬곱 1회
+        n = len(items)
+        rids, rows, yaw_l, ts_l, b_l = [], [], [], [], []
+        getf = self._getf
+        bucket_of = self._bucket_of if self._colors_on else None
         for i, it in enumerate(items):
-            rid  = it.get("robotId") or it.get("amrId") or it.get("id") or f"{i+1}"
-            path = self._amr_path(rid)
-
-            prim = stage.GetPrimAtPath(Sdf.Path(path))
-            if not prim:
-                prim = stage.DefinePrim(path, "Xform")
-                prim.GetReferences().AddReference("", self._proto_path)
-                prim.Load()
-
-            t_op, rxyz_op, s_op = self._ops_cache.get(rid, (None, None, None))
-            if t_op is None:
-                t_op, rxyz_op, s_op = self._ensure_ops(prim)
-                self._ops_cache[rid] = (t_op, rxyz_op, s_op)
-
-            u, v = self._map_to_units(it)
-            yaw = self._get_yaw_deg(it)
-
-            # 목표만 갱신
-            self._targets[rid] = (u, v, yaw)
-            seen.add(path)
-
-        # 누락된 로봇 제거
-        parent = self._group or stage.GetPrimAtPath(Sdf.Path(self._group_path))
-        for child in list(parent.GetChildren()):
-            if child.GetPath().pathString not in seen:
-                stage.RemovePrim(child.GetPath())
-                rid = child.GetName()[4:]
-                self._ops_cache.pop(rid, None)
-                self._pos_cache.pop(rid, None)
-                self._yaw_cache.pop(rid, None)
-                self._targets.pop(rid, None)
+            rids.append(str(it.get("robotId") or it.get("amrId") or it.get("id") or f"{i+1}"))
+            rows.append((getf(it, "x", "posX", "mapX", "positionX", "x_mm", "X", default=0.0),
+                         getf(it, "y", "posY", "mapY", "positionY", "y_mm", "Y", default=0.0), 1.0))
+            yaw_l.append(self._get_yaw_deg(it))
+            ts_l.append(fr.sample_time(it, recv) if fr is not None else recv)
+            if bucket_of is not None:
+                b_l.append(bucket_of(it))
+        pos = np.array(rows, dtype=np.float64).reshape(n, 3) @ self._affine
+        yaws = np.array(yaw_l, dtype=np.float64)
+        ts = np.array(ts_l, dtype=np.float64)
+
+        # 추가/삭제는 집합 차이로만 — USD 작업은 바뀐 로봇 수에 비례
+        index = fleet.index
+        added = []
+        idx = np.empty(n, dtype=np.int64)
+        for i, rid in enumerate(rids):
+            j = index.get(rid)
+            if j is None:
+                j = fleet.add(rid, pos[i], yaws[i], ts[i])
+                added.append(rid)
+            idx[i] = j
+        current = set(rids)
+        for rid in index.keys() - current:
+            self._remove_robot(rid)
+        for rid in added:
+            self._path_for(rid)
+            self._queue_spawn(rid)
+            if rid in self._plans_mm:
+                self._apply_plan(rid)
+        self._usd_pending |= current
+
+        # 샘플 반영 + 속도 추정(현재 자세와 다르거나 움직이는 로봇만 active 로)
+        fleet.set_targets(
+            idx, pos, yaws, ts,
+            alpha=self._VEL_ALPHA,
+            max_speed=self._MAX_SPEED_MM_S * self._mm_to_units,
+            min_speed=self._POS_EPS_UNITS,          # 초당 eps 미만 이동은 정지로 봄
+            min_yaw_rate=self._YAW_EPS_DEG,
+            pos_eps=self._POS_EPS_UNITS, yaw_eps=self._YAW_EPS_DEG,
+        )
+
+        if b_l:
+            b = np.array(b_l, dtype=np.int8)
+            if added or not np.array_equal(fleet.bucket[idx], b):
+                fleet.bucket[idx] = b
+                self._colors_dirty = True
+
+        if not self._swept and n:
+            self._sweep_orphans()
+            self._swept = True
 
         # ── Debug: 주기적으로 1개 샘플 로그
         if items and (time.perf_counter() - self._dbg_last_log) > self._dbg_log_interval:
@@ -280,8 +880,23 @@ class Amr3D:
 
     # ───────────────── per-frame update ─────────────────
     def update(self, dt: Optional[float] = None):
-        if not self._targets:
+        if self._stage is None:
+            return
+        fleet = self._fleet
+        inst  = self._instancer
+        if self._proto_thread is not None:
+            self._poll_proto()
+        self._drain_spawns()
+        if self._colors_dirty:
+            self._apply_colors()
+        paths = self._paths
+        if (not fleet.has_work() and not (inst is not None and inst.dirty)
+                and not (paths is not None and paths.dirty)):
+            # 움직이는 로봇 없음: 쓸 것이 없으므로 신선도만 정리하고 즉시 반환
             self._last_tick = time.perf_counter()
+            if self._freshness and self._usd_pending:
+                self._freshness.mark_usd_written(self._usd_pending)
+                self._usd_pending.clear()
             return
 
         now = time.perf_counter()
@@ -289,41 +904,71 @@ class Amr3D:
             dt = max(0.0, min(0.1, now - self._last_tick))
         self._last_tick = now
 
-        step_u   = (self._MOVE_SPEED_MM_S * self._mm_to_units) * dt
-        step_yaw = self._YAW_SPEED_DPS * dt
-
-        for rid, (tu, tv, tyaw) in list(self._targets.items()):
-            t_op, rxyz_op, s_op = self._ops_cache.get(rid, (None, None, None))
-            if not t_op:
-                continue
-
-            cu, cv = self._pos_cache.get(rid, (tu, tv))
-            cyaw   = self._yaw_cache.get(rid, tyaw)
-
-            # 위치 보간
-            du, dv = (tu - cu), (tv - cv)
-            dist = math.hypot(du, dv)
-            if dist > self._POS_EPS_UNITS:
-                angle = math.atan2(dv, du)
-                cu += math.cos(angle) * min(step_u, dist)
-                cv += math.sin(angle) * min(step_u, dist)
-            else:
-                cu, cv = tu, tv
-
-            # 회전 보간
-            diff = ((tyaw - cyaw + 180.0) % 360.0) - 180.0
-            if abs(diff) > self._YAW_EPS_DEG:
-                cyaw += max(-step_yaw, min(step_yaw, diff))
-            else:
-                cyaw = tyaw
-
-            # 적용
-            rxyz_op.Set(self._compose_euler(cyaw))
-            vec = Gf.Vec3d(cu, 0.0, cv) if not self._is_z_up else Gf.Vec3d(cu, cv, 0.0)
-            t_op.Set(vec)
-
-            self._pos_cache[rid] = (cu, cv)
-            self._yaw_cache[rid] = cyaw
+        batch    = self._xbatch
+
+        # 예측 + 보정(벡터 연산) → 값이 바뀐 행만
+        moved = fleet.step(
+            time.time(), dt,
+            horizon_s=self._HORIZON_S, tau_s=self._CORR_TAU_S,
+            corr_speed=self._MOVE_SPEED_MM_S * self._mm_to_units,
+            corr_yaw_speed=self._YAW_SPEED_DPS,
+            snap_dist=self._SNAP_MM * self._mm_to_units, snap_yaw=self._SNAP_DEG,
+            pos_eps=self._POS_EPS_UNITS, yaw_eps=self._YAW_EPS_DEG,
+        )
+
+        if len(moved) and paths is not None and self._trails_on:
+            paths.push(moved, fleet.cur[moved] + self._path_lift())
+
+        if len(moved):
+            # instancer: 슬롯 배열에 일괄 반영
+            if inst is not None:
+                slots = fleet.inst[moved]
+                ok = slots >= 0
+                rows = moved[ok]
+                inst.set_poses(slots[ok], fleet.cur[rows], self._rotations(fleet.yaw[rows]))
+
+            # 개별 prim(prims 모드 전체 / instancer 모드의 선택 로봇)
+            if self._ops_cache:
+                if inst is None:
+                    rows = moved.tolist()
+                else:
+                    hit = np.zeros(fleet.n, dtype=bool)
+                    hit[moved] = True
+                    rows = [i for i in (fleet.index.get(rid) for rid in self._ops_cache)
+                            if i is not None and hit[i]]
+                cur, yaw, ids = fleet.cur, fleet.yaw, fleet.ids
+                tilt, ax = self._TILT_X_DEG, self._yaw_axis
+                for i in rows:
+                    rid = ids[i]
+                    ops = self._ops_cache.get(rid)
+                    if ops is None:
+                        continue
+                    t = tuple(cur[i].tolist())
+                    r = [tilt, 0.0, 0.0]
+                    r[ax] = float(yaw[i])
+                    r = tuple(r)
+                    if batch is not None and rid in batch:
+                        batch.put(rid, t, r)
+                    else:
+                        with live_edit(self._live):
+                            ops[1].Set(Gf.Vec3d(*r))
+                            ops[0].Set(Gf.Vec3d(*t))
+
+        if batch is not None:
+            batch.flush()
+        if inst is not None and inst.dirty:
+            with live_edit(self._live):
+                inst.flush()
+        if paths is not None and paths.dirty and now - self._paths_last_flush >= self._PATH_FLUSH_S:
+            self._paths_last_flush = now
+            with live_edit(self._live):
+                paths.flush()
+
+        if self._freshness and self._usd_pending:
+            self._freshness.mark_usd_written(self._usd_pending)
+            self._usd_pending.clear()
+        if not self._first_robot_logged and len(moved):
+            self._log_first_robot()
 
     def set_mode(self, mode: str = "smooth"):
         self._mode = "smooth"
@@ -0,0 +1,188 @@
+# amr_instancer.py — AMR 전체를 UsdGeom.PointInstancer 1개로 렌더링(pxr + NumPy, omni 의존 없음)
+# - robotId → 인스턴스 슬롯(index) 고정 매핑. 제거된 슬롯은 free list 로 재사용하고 invisibleIds 로 숨김
+#   → 추가/삭제 시 배열 재구성 없음
+# - set_pose() 는 NumPy 버퍼만 갱신, flush() 가 positions/orientations 를 Vt 배열로 프레임당 1회 기록
+# - 선택 로봇은 Amr3D 가 별도 prim 을 만들고 여기서는 hide() 로 인스턴스만 숨김
+# - set_colors() 는 인스턴스별 primvars:displayColor(vertex = 인스턴스당 1개) — 바뀔 때만 기록
+
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from pxr import Gf, Sdf, Usd, UsdGeom, Vt
+
+
+def euler_xyz_to_quat(rx_deg, ry_deg, rz_deg) -> np.ndarray:
+    """rotateXYZ(도) → 쿼터니언 (N, 4) [i, j, k, real]  (Gf.Quat 메모리 배치와 동일)."""
+    hx = np.radians(np.asarray(rx_deg, dtype=np.float64)) * 0.5
+    hy = np.radians(np.asarray(ry_deg, dtype=np.float64)) * 0.5
+    hz = np.radians(np.asarray(rz_deg, dtype=np.float64)) * 0.5
+    cx, sx = np.cos(hx), np.sin(hx)
+    cy, sy = np.cos(hy), np.sin(hy)
+    cz, sz = np.cos(hz), np.sin(hz)
+    # q = qz * qy * qx  (X 먼저 적용)
+    w = cz * cy * cx + sz * sy * sx
+    x = cz * cy * sx - sz * sy * cx
+    y = cz * sy * cx + sz * cy * sx
+    z = sz * cy * cx - cz * sy * sx
+    return np.stack(np.broadcast_arrays(x, y, z, w), axis=-1)
+
+
+class AmrInstancer:
+    def __init__(self, stage: Usd.Stage, path: str, asset_uri: str, *, scale: float = 0.3,
+                 capacity: int = 64, proto_ref: Optional[str] = None):
+        self._stage = stage
+        self.path = path
+        self._scale = float(scale)
+
+        self._inst = UsdGeom.PointInstancer.Define(stage, path)
+        proto_path = f"{path}/Prototypes/AMR"
+        proto = stage.DefinePrim(proto_path, "Xform")
+        if not proto.HasAuthoredReferences():
+            if proto_ref:
+                # 스테이지 내부 프로토(placeholder/지연 로드 포함)를 공유 — 프로토 자체 xform 은 무시
+                proto.GetReferences().AddInternalReference(proto_ref)
+                UsdGeom.Xformable(proto).ClearXformOpOrder()
+            else:
+                proto.GetReferences().AddReference(asset_uri)
+        self._inst.CreatePrototypesRel().SetTargets([Sdf.Path(proto_path)])
+
+        # 슬롯 상태
+        self._slot: Dict[str, int] = {}
+        self._rid_of: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._hidden: Set[int] = set()
+
+        cap = max(1, int(capacity))
+        self._pos = np.zeros((cap, 3), dtype=np.float32)
+        self._rot = np.zeros((cap, 4), dtype=np.float16)
+        self._rot[:, 3] = 1.0
+        self._col = np.ones((cap, 3), dtype=np.float32)
+        self._has_color = False
+        self._n = 0                 # 사용한 최대 슬롯 수(배열 길이)
+
+        self._dirty_pose = True
+        self._dirty_layout = True   # 길이/ids/scales/invisibleIds
+        self._dirty_color = False
+
+    # ───────────────────────── slots ─────────────────────────
+    def __contains__(self, rid: str) -> bool:
+        return rid in self._slot
+
+    def ids(self) -> Iterable[str]:
+        return self._slot.keys()
+
+    def slot_of(self, rid: str) -> Optional[int]:
+        return self._slot.get(rid)
+
+    def _grow(self, need: int):
+        cap = len(self._pos)
+        if need <= cap:
+            return
+        new = max(need, cap * 2)
+        pos = np.zeros((new, 3), dtype=np.float32); pos[:cap] = self._pos
+        rot = np.zeros((new, 4), dtype=np.float16); rot[:, 3] = 1.0; rot[:cap] = self._rot
+        col = np.ones((new, 3), dtype=np.float32); col[:cap] = self._col
+        self._pos, self._rot, self._col = pos, rot, col
+
+    def ensure(self, rid: str) -> int:
+        """robotId 의 슬롯(없으면 free list → 끝에 추가)."""
+        idx = self._slot.get(rid)
+        if idx is not None:
+            return idx
+        if self._free:
+            idx = self._free.pop()
+            self._rid_of[idx] = rid
+            self._hidden.discard(idx)
+        else:
+            idx = self._n
+            self._grow(idx + 1)
+            self._rid_of.append(rid)
+            self._n += 1
+        self._slot[rid] = idx
+        self._dirty_layout = True
+        return idx
+
+    def release(self, rid: str):
+        idx = self._slot.pop(rid, None)
+        if idx is None:
+            return
+        self._rid_of[idx] = None
+        self._free.append(idx)
+        self._hidden.add(idx)
+        self._dirty_layout = True
+
+    def hide(self, rid: str, hidden: bool):
+        idx = self._slot.get(rid)
+        if idx is None or (idx in self._hidden) == bool(hidden):
+            return
+        if hidden:
+            self._hidden.add(idx)
+        else:
+            self._hidden.discard(idx)
+        self._dirty_layout = True
+
+    # ───────────────────────── poses ─────────────────────────
+    def set_pose(self, rid: str, t, r):
+        """t=(x,y,z) 스테이지 단위, r=rotateXYZ(도)."""
+        idx = self._slot.get(rid)
+        if idx is None:
+            return
+        self._pos[idx] = t
+        self._rot[idx] = euler_xyz_to_quat(r[0], r[1], r[2])
+        self._dirty_pose = True
+
+    def set_poses(self, idx: np.ndarray, t: np.ndarray, r: np.ndarray):
+        """벡터화 버전: idx (N,), t (N,3), r (N,3) rotateXYZ 도."""
+        if len(idx) == 0:
+            return
+        self._pos[idx] = t
+        self._rot[idx] = euler_xyz_to_quat(r[:, 0], r[:, 1], r[:, 2])
+        self._dirty_pose = True
+
+    def set_colors(self, idx: np.ndarray, rgb: np.ndarray):
+        """인스턴스별 색: idx (N,), rgb (N,3)."""
+        if len(idx) == 0:
+            return
+        self._col[idx] = rgb
+        self._has_color = True
+        self._dirty_color = True
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty_pose or self._dirty_layout or self._dirty_color
+
+    def flush(self):
+        if not (self._dirty_pose or self._dirty_layout or self._dirty_color):
+            return
+        n = self._n
+        inst = self._inst
+        # 프레임당 배열 2개(레이아웃 변경 시 +4) — 로봇 수와 무관한 Set 횟수
+        if self._dirty_layout:
+            inst.GetProtoIndicesAttr().Set(Vt.IntArray(n, 0))
+            inst.GetIdsAttr().Set(Vt.Int64Array(list(range(n))))
+            inst.GetScalesAttr().Set(Vt.Vec3fArray(n, Gf.Vec3f(self._scale)))
+            inst.GetInvisibleIdsAttr().Set(Vt.Int64Array(sorted(self._hidden)))
+        if self._has_color and (self._dirty_color or self._dirty_layout):
+            pv = UsdGeom.PrimvarsAPI(inst).CreatePrimvar(
+                "displayColor", Sdf.ValueTypeNames.Color3fArray, UsdGeom.Tokens.vertex)
+            pv.Set(Vt.Vec3fArray.FromNumpy(self._col[:n]))
+        if self._dirty_pose or self._dirty_layout:
+            inst.GetPositionsAttr().Set(Vt.Vec3fArray.FromNumpy(self._pos[:n]))
+            inst.GetOrientationsAttr().Set(Vt.QuathArray.FromNumpy(self._rot[:n]))
+        self._dirty_pose = self._dirty_layout = self._dirty_color = False
+
+    def set_scale(self, scale: float):
+        self._scale = float(scale)
+        self._dirty_layout = True
+
+    def destroy(self):
+        try:
+            if self._stage and self._stage.GetPrimAtPath(self.path):
+                self._stage.RemovePrim(self.path)
+        except Exception as e:
+            print("[AmrInstancer] destroy failed:", e)
+        self._slot.clear()
+        self._rid_of.clear()
+        self._free.clear()
+        self._hidden.clear()
+        self._n = 0
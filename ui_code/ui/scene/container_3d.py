@@ -0,0 +1,304 @@
+# container_3d.py — ContainerInfo → UsdGeom.PointInstancer 1개(omni 의존 없음, 좌표/스테이지는 Amr3D 공유)
+# - containerCode → 인스턴스 슬롯 고정 매핑(free list 재사용, 빈 슬롯은 invisibleIds)
+# - containerModelCode 마다 프로토타입 1개(기본: 모델 크기 박스, model_assets 로 USD 지정 가능)
+# - apply() 는 직전 응답과 달라진 컨테이너만 반영하고, flush() 가 바뀐 배열만 프레임당 1회 기록
+# - 운반 중(isCarry) 이고 로봇 id 가 있으면 매 프레임 그 로봇 위치를 따라감(운반 중인 것만 계산)
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pxr import Gf, Sdf, UsdGeom, Vt
+
+from ui_code.ui.scene.amr_instancer import euler_xyz_to_quat
+from ui_code.ui.scene.live_layer import live_edit
+
+# 모델별 크기(mm: 길이, 폭, 높이). 모르는 모델은 _DEFAULT_SIZE
+_MODEL_SIZES_MM: Dict[str, Tuple[float, float, float]] = {}
+_DEFAULT_SIZE_MM = (1200.0, 1000.0, 1500.0)
+_PROTO_COLORS = [
+    (0.55, 0.42, 0.25), (0.25, 0.45, 0.70), (0.35, 0.60, 0.35),
+    (0.70, 0.55, 0.20), (0.50, 0.35, 0.60), (0.45, 0.45, 0.45),
+]
+
+
+# 변화 판단에 쓰는 원본 키(값 해석은 바뀐 컨테이너만)
+_SIG_KEYS = (
+    "containerModelCode", "model", "nodeCode", "position", "x", "posX", "positionX", "y", "posY", "positionY",
+    "containerOrientation", "orientation", "angle", "isCarry", "carryStatus", "carry",
+    "robotId", "amrId", "carrierCode", "robotCode", "inMapStatus", "isOffMap",
+)
+
+
+def _first(d: dict, *names):
+    for n in names:
+        v = d.get(n)
+        if v not in (None, ""):
+            return v
+    return None
+
+
+def _as_bool(v) -> bool:
+    if isinstance(v, bool):
+        return v
+    s = str(v).strip().lower()
+    return s in ("1", "true", "yes", "y", "carry", "carrying", "in_handling", "inhandling")
+
+
+class Container3D:
+    def __init__(self, amr3d, *, path: str = "/World/Containers",
+                 model_sizes_mm: Optional[Dict[str, Tuple[float, float, float]]] = None,
+                 model_assets: Optional[Dict[str, str]] = None, carry_lift_mm: float = 350.0):
+        self._amr3d = amr3d
+        self.path = path
+        self._sizes = dict(_MODEL_SIZES_MM)
+        self._sizes.update(model_sizes_mm or {})
+        self._assets = dict(model_assets or {})
+        self._CARRY_LIFT_MM = float(carry_lift_mm)
+
+        self._stage = None
+        self._inst: Optional[UsdGeom.PointInstancer] = None
+
+        # 프로토타입
+        self._proto_of: Dict[str, int] = {}   # model → proto index
+        self._proto_paths: List[Sdf.Path] = []
+
+        # 슬롯
+        self._slot: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._sig: Dict[str, tuple] = {}      # cid → 마지막 반영 시그니처
+        self._carried: Dict[int, str] = {}    # slot → 운반 로봇 id
+        self._n = 0
+        cap = 64
+        self._pos = np.zeros((cap, 3), dtype=np.float32)
+        self._rot = np.zeros((cap, 4), dtype=np.float16); self._rot[:, 3] = 1.0
+        self._proto = np.zeros(cap, dtype=np.int32)
+        self._hidden = np.ones(cap, dtype=bool)   # 빈 슬롯/위치 모르는 컨테이너
+
+        self._dirty_pose = False
+        self._dirty_layout = False   # 길이/protoIndices/ids/invisibleIds/prototypes
+        self.stats = {"applied": 0, "unchanged": 0}
+
+    # ───────────────────────── setup ─────────────────────────
+    def _ensure_stage(self) -> bool:
+        if self._inst is not None:
+            return True
+        stage = self._amr3d.stage
+        if stage is None:
+            return False
+        self._stage = stage
+        with live_edit(self._amr3d.live_layer):
+            self._inst = UsdGeom.PointInstancer.Define(stage, self.path)
+            stage.DefinePrim(f"{self.path}/Prototypes", "Scope")
+        return True
+
+    def _proto_index(self, model: str) -> int:
+        idx = self._proto_of.get(model)
+        if idx is not None:
+            return idx
+        idx = len(self._proto_paths)
+        name = "".join(c if (c.isalnum() or c == "_") else "_" for c in model) or "unknown"
+        path = Sdf.Path(f"{self.path}/Prototypes/M_{name}_{idx}")
+        stage = self._stage
+        amr = self._amr3d
+        k = amr.mm_to_units
+        up = amr.up_axis
+        with live_edit(amr.live_layer):
+            asset = self._assets.get(model)
+            if asset:
+                prim = stage.DefinePrim(path, "Xform")
+                prim.GetReferences().AddReference(asset)
+            else:
+                # 바닥에 놓인 박스(스테이지 축 기준: 길이=X, 높이=up 축)
+                cube = UsdGeom.Cube.Define(stage, path)
+                cube.CreateSizeAttr(1.0)
+                cube.CreateDisplayColorAttr([Gf.Vec3f(*_PROTO_COLORS[idx % len(_PROTO_COLORS)])])
+                l, w, h = self._sizes.get(model, _DEFAULT_SIZE_MM)
+                scale = [l * k, 0.0, 0.0]
+                scale[up] = h * k
+                scale[3 - up] = w * k          # up=2 → 폭은 Y, up=1 → 폭은 Z
+                lift = [0.0, 0.0, 0.0]
+                lift[up] = 0.5 * h * k
+                xf = UsdGeom.Xformable(cube)
+                xf.AddTranslateOp().Set(Gf.Vec3d(*lift))
+                xf.AddScaleOp().Set(Gf.Vec3f(*scale))
+        self._proto_of[model] = idx
+        self._proto_paths.append(path)
+        self._dirty_layout = True
+        return idx
+
+    def _grow(self, need: int):
+        cap = len(self._pos)
+        if need <= cap:
+            return
+        new = max(need, cap * 2)
+        pos = np.zeros((new, 3), dtype=np.float32); pos[:cap] = self._pos
+        rot = np.zeros((new, 4), dtype=np.float16); rot[:, 3] = 1.0; rot[:cap] = self._rot
+        proto = np.zeros(new, dtype=np.int32); proto[:cap] = self._proto
+        hidden = np.ones(new, dtype=bool); hidden[:cap] = self._hidden
+        self._pos, self._rot, self._proto, self._hidden = pos, rot, proto, hidden
+
+    def _ensure_slot(self, cid: str) -> int:
+        idx = self._slot.get(cid)
+        if idx is None:
+            if self._free:
+                idx = self._free.pop()
+            else:
+                idx = self._n
+                self._grow(idx + 1)
+                self._n += 1
+            self._slot[cid] = idx
+            self._dirty_layout = True
+        return idx
+
+    def _release(self, cid: str):
+        idx = self._slot.pop(cid, None)
+        self._sig.pop(cid, None)
+        if idx is None:
+            return
+        self._carried.pop(idx, None)
+        self._hidden[idx] = True
+        self._free.append(idx)
+        self._dirty_layout = True
+
+    # ───────────────────────── data ─────────────────────────
+    @staticmethod
+    def _parse(c: dict) -> tuple:
+        in_map = c.get("inMapStatus")
+        if in_map is not None:
+            in_map = _as_bool(in_map)          # 0 / "0" / "false" 도 맵 밖
+        elif c.get("isOffMap") is not None:
+            in_map = not _as_bool(c.get("isOffMap"))
+        carry = _first(c, "isCarry", "carryStatus", "carry")
+        return (
+            str(_first(c, "containerModelCode", "model") or "-"),
+            _first(c, "nodeCode", "position"),
+            _first(c, "x", "posX", "positionX"), _first(c, "y", "posY", "positionY"),
+            _first(c, "containerOrientation", "orientation", "angle"),
+            _as_bool(carry) if carry is not None else False,
+            _first(c, "robotId", "amrId", "carrierCode", "robotCode"),
+            in_map,
+        )
+
+    def apply(self, items, graph=None):
+        """ContainerInfo 배열 반영(직전 응답과 달라진 것만). graph: MapGraph(nodeCode → mm)."""
+        if not self._ensure_stage():
+            return
+        amr = self._amr3d
+        seen = set()
+        changed: List[Tuple[int, tuple]] = []
+        for i, c in enumerate(items or []):
+            c = c or {}
+            cid = str(c.get("containerCode") or c.get("id") or c.get("name") or f"C{i+1:03d}")
+            seen.add(cid)
+            sig = tuple(map(c.get, _SIG_KEYS))
+            if self._sig.get(cid) == sig:
+                self.stats["unchanged"] += 1
+                continue
+            self._sig[cid] = sig
+            changed.append((self._ensure_slot(cid), self._parse(c)))
+
+        for cid in [c for c in self._slot if c not in seen]:
+            self._release(cid)
+
+        if changed:
+            up = amr.up_axis
+            slots, xy, yaw = [], [], []
+            for idx, (model, node, x, y, orient, carried, rid, in_map) in changed:
+                self._carried.pop(idx, None)
+                p = None
+                if x is not None and y is not None:
+                    try:
+                        p = (float(x), float(y))
+                    except Exception:
+                        p = None
+                if p is None and graph is not None:
+                    p = graph.position(node)
+                if carried and rid is not None:
+                    self._carried[idx] = str(rid)   # 위치/표시는 update() 에서 로봇 자세가 잡힐 때
+                elif p is None or in_map is False:
+                    if not self._hidden[idx]:
+                        self._hidden[idx] = True
+                        self._dirty_layout = True
+                    continue
+                pi = self._proto_index(model)
+                if self._proto[idx] != pi:
+                    self._proto[idx] = pi
+                    self._dirty_layout = True
+                if idx in self._carried:
+                    continue
+                if self._hidden[idx]:
+                    self._hidden[idx] = False
+                    self._dirty_layout = True
+                try:
+                    a = float(orient) if orient is not None else 0.0
+                except Exception:
+                    a = 0.0
+                slots.append(idx); xy.append(p); yaw.append(a)
+            if slots:
+                slots = np.array(slots, dtype=np.int64)
+                self._pos[slots] = amr.map_to_stage(np.array(xy, dtype=np.float64))
+                r = np.zeros((len(slots), 3))
+                r[:, up] = yaw
+                self._rot[slots] = euler_xyz_to_quat(r[:, 0], r[:, 1], r[:, 2])
+                self._dirty_pose = True
+            self.stats["applied"] += len(changed)
+        self.update()
+
+    def update(self):
+        """운반 중 컨테이너를 로봇 위치(+lift)로. 바뀐 게 있으면 배열 기록."""
+        if self._inst is None:
+            return
+        if self._carried:
+            amr = self._amr3d
+            slots = np.fromiter(self._carried.keys(), dtype=np.int64, count=len(self._carried))
+            ok, pos, yaw = amr.robot_poses(list(self._carried.values()))
+            # 로봇 자세를 모르는 동안은 숨김(원점/이전 슬롯 위치에 보이지 않게), 잡히면 표시
+            flip = self._hidden[slots] == ok
+            if flip.any():
+                self._hidden[slots[flip]] = ~ok[flip]
+                self._dirty_layout = True
+            if ok.any():
+                slots, pos, yaw = slots[ok], pos[ok], yaw[ok]
+                pos[:, amr.up_axis] += self._CARRY_LIFT_MM * amr.mm_to_units
+                pos = pos.astype(np.float32)
+                if not np.array_equal(self._pos[slots], pos):
+                    self._pos[slots] = pos
+                    r = np.zeros((len(slots), 3))
+                    r[:, amr.up_axis] = yaw
+                    self._rot[slots] = euler_xyz_to_quat(r[:, 0], r[:, 1], r[:, 2])
+                    self._dirty_pose = True
+        self.flush()
+
+    def flush(self):
+        if not (self._dirty_pose or self._dirty_layout) or not self._proto_paths:
+            return   # 프로토타입이 생기기 전(전부 숨김)엔 기록할 것 없음
+        n = self._n
+        inst = self._inst
+        with live_edit(self._amr3d.live_layer):
+            if self._dirty_layout:
+                inst.CreatePrototypesRel().SetTargets(self._proto_paths)
+                inst.GetProtoIndicesAttr().Set(Vt.IntArray.FromNumpy(self._proto[:n]))
+                inst.GetIdsAttr().Set(Vt.Int64Array(list(range(n))))
+                inst.GetInvisibleIdsAttr().Set(Vt.Int64Array(np.flatnonzero(self._hidden[:n]).tolist()))
+            inst.GetPositionsAttr().Set(Vt.Vec3fArray.FromNumpy(self._pos[:n]))
+            inst.GetOrientationsAttr().Set(Vt.QuathArray.FromNumpy(self._rot[:n]))
+        self._dirty_pose = self._dirty_layout = False
+
+    def __len__(self) -> int:
+        return len(self._slot)
+
+    def destroy(self):
+        try:
+            if self._stage and self._stage.GetPrimAtPath(self.path):
+                with live_edit(self._amr3d.live_layer):
+                    self._stage.RemovePrim(self.path)
+        except Exception as e:
+            print("[Container3D] destroy failed:", e)
+        self._inst = None
+        self._slot.clear()
+        self._sig.clear()
+        self._carried.clear()
+        self._free.clear()
+        self._proto_of.clear()
+        self._proto_paths.clear()
+        self._n = 0
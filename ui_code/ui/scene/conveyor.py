@@ -0,0 +1,298 @@
+# conveyor.py — 설정 파일(config/Conveyor.json) 기반 다중 레인 라인카 엔진
+# - 레인: 경로 polyline(스테이지 좌표), speed, spacing, count, mode(loop|respawn), prototype
+# - 전체 레인 = PointInstancer 1개(/World/Conveyor). 프로토타입은 (에셋 × 팔레트 색) 조합만 공유
+# - 프레임당 update() 1회: 레인별 시계 → lane_distances(닫힌 식) → polyline 보간, 전부 NumPy
+# - 활성 뷰포트 카메라 frustum 밖 레인은 시계를 멈춤(계산/기록 생략), 다시 보이면 멈춘 자리에서 이어감
+# - 모든 편집은 라이브 레이어에만
+
+import json
+import os
+import random
+import time
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import omni.usd
+from pxr import Gf, Sdf, Usd, UsdGeom, Vt
+
+from ui_code.ui.scene.amr_instancer import euler_xyz_to_quat
+from ui_code.ui.scene.linecar import (
+    _COLOR_CHOICES, _colorize_car, _file_uri, _strip_missing_textures, lane_distances,
+)
+from ui_code.ui.scene.live_layer import get_live_layer, live_edit
+
+_VIEW_CHECK_S = 0.25     # frustum 판정 주기
+
+
+def _proto_cfg(p: Optional[dict]) -> dict:
+    p = p or {}
+    return {
+        "usd": str(p.get("usd") or "C:/BODY.usd"),
+        "scale": float(p.get("scale", 1.0)),
+        "looks": list(p.get("looks") or ["New_Material", "Body", "Door", "Trunk"]),
+        "colorize": bool(p.get("colorize", True)),
+    }
+
+
+def active_camera_frustum(stage: Usd.Stage) -> Optional[Gf.Frustum]:
+    """활성 뷰포트 카메라의 월드 frustum(뷰포트 유틸 없으면 None → 전 레인 활성)."""
+    try:
+        from omni.kit.viewport.utility import get_active_viewport
+        vp = get_active_viewport()
+        cam_path = vp.camera_path if vp else None
+    except Exception:
+        return None
+    if not cam_path:
+        return None
+    prim = stage.GetPrimAtPath(str(cam_path))
+    if not prim or not prim.IsA(UsdGeom.Camera):
+        return None
+    return UsdGeom.Camera(prim).GetCamera(Usd.TimeCode.Default()).frustum
+
+
+class Lane:
+    def __init__(self, cfg: dict, index: int):
+        self.name = str(cfg.get("name") or f"Lane{index + 1}")
+        pts = np.asarray(cfg.get("path") or [], dtype=np.float64).reshape(-1, 3)
+        if len(pts) < 2:
+            raise ValueError(f"lane {self.name}: path needs >= 2 points")
+        self.points = pts
+        self.prototype = str(cfg.get("prototype") or "body")
+        self.speed = float(cfg.get("speed", 50.0))
+        self.spacing = float(cfg.get("spacing", 600.0))
+        self.count = max(1, int(cfg.get("count", 19)))
+        self.mode = str(cfg.get("mode", "loop")).strip().lower()
+        self.respawn_delay = float(cfg.get("respawn_delay", 0.0))
+        self.yaw_offset = float(cfg.get("yaw_offset_deg", 90.0))   # 진행 방향 +x 일 때 차체 yaw 90° (LineCarSpawner 기본값)
+
+        seg = np.diff(pts, axis=0)
+        seg_len = np.linalg.norm(seg, axis=1)
+        keep = seg_len > 1e-9
+        self.seg_p0 = pts[:-1][keep]
+        self.seg_len = seg_len[keep]
+        self.seg_dir = seg[keep] / self.seg_len[:, None]
+        self.seg_s0 = np.concatenate([[0.0], np.cumsum(self.seg_len)[:-1]])
+        self.seg_yaw = np.degrees(np.arctan2(self.seg_dir[:, 1], self.seg_dir[:, 0])) + self.yaw_offset
+        self.length = float(self.seg_len.sum())
+        if self.length <= 0.0:
+            raise ValueError(f"lane {self.name}: zero-length path")
+
+        margin = float(cfg.get("view_margin", self.spacing))
+        self.bounds = Gf.Range3d(Gf.Vec3d(*(pts.min(axis=0) - margin).tolist()),
+                                 Gf.Vec3d(*(pts.max(axis=0) + margin).tolist()))
+
+
+class ConveyorEngine:
+    def __init__(self, config: dict, *, path: str = "/World/Conveyor"):
+        self.path = path
+        self._protos: Dict[str, dict] = {}
+        for name, p in ((config or {}).get("prototypes") or {}).items():
+            self._protos[str(name)] = _proto_cfg(p)
+        self.lanes: List[Lane] = []
+        for i, c in enumerate((config or {}).get("lanes") or []):
+            try:
+                lane = Lane(c, i)
+            except Exception as e:
+                print(f"[Conveyor] skip lane #{i}: {e}")
+                continue
+            if lane.prototype not in self._protos:
+                self._protos[lane.prototype] = _proto_cfg(None)
+            self.lanes.append(lane)
+
+        self._stage: Optional[Usd.Stage] = None
+        self._live = None
+        self._inst: Optional[UsdGeom.PointInstancer] = None
+        self._view_fn: Optional[Callable[[Usd.Stage], Optional[Gf.Frustum]]] = active_camera_frustum
+        self._next_view_check = 0.0
+        self._last_time = time.perf_counter()
+
+        # 차량별 배열(레인 순서대로 이어 붙임) — start() 에서 채움
+        self._lane_of = np.zeros(0, dtype=np.int64)
+        self._s0 = np.zeros(0, dtype=np.float64)
+        self._clock = np.zeros(len(self.lanes), dtype=np.float64)     # 레인별 시계
+        self._active = np.ones(len(self.lanes), dtype=bool)
+        self._pos = np.zeros((0, 3), dtype=np.float32)
+        self._rot = np.zeros((0, 4), dtype=np.float16)
+        self._rot_dirty = False   # 직선 레인은 방향이 안 바뀜 → orientations 는 바뀔 때만 기록
+
+    @classmethod
+    def from_config(cls, path: str) -> Optional["ConveyorEngine"]:
+        """설정 파일이 없거나 enabled=false 면 None."""
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cfg = json.load(f)
+        except Exception as e:
+            print(f"[Conveyor] config load failed: {e}")
+            return None
+        if not cfg.get("enabled", True):
+            print(f"[Conveyor] disabled in {os.path.basename(path)}")
+            return None
+        eng = cls(cfg)
+        print(f"[Conveyor] {len(eng.lanes)} lanes / {len(eng._protos)} prototypes from {os.path.basename(path)}")
+        return eng
+
+    def set_view_provider(self, fn: Optional[Callable[[Usd.Stage], Optional[Gf.Frustum]]]):
+        """frustum 공급 함수(None → 항상 전 레인 활성)."""
+        self._view_fn = fn
+        self._next_view_check = 0.0
+
+    # ───────────────────────── build ─────────────────────────
+    def start(self):
+        ctx = omni.usd.get_context()
+        stage = ctx.get_stage()
+        if stage is None or not self.lanes:
+            return
+        self._stage = stage
+        self._live = get_live_layer(stage)
+        t0 = time.perf_counter()
+        with live_edit(self._live):
+            if stage.GetPrimAtPath(self.path):
+                stage.RemovePrim(self.path)
+            self._build(stage)
+        print(f"[Conveyor] spawned {len(self._s0)} cars on {len(self.lanes)} lanes "
+              f"in {(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    def _build(self, stage: Usd.Stage):
+        inst = UsdGeom.PointInstancer.Define(stage, self.path)
+
+        # 프로토타입: 에셋 × 팔레트 색. 에셋은 레이어 1번만 열리고, 텍스처 검사는 캐시/메모 공유
+        targets: List[Sdf.Path] = []
+        first_of: Dict[str, int] = {}
+        n_colors: Dict[str, int] = {}
+        for name, p in self._protos.items():
+            if not any(l.prototype == name for l in self.lanes):
+                continue
+            palette = list(_COLOR_CHOICES) if p["colorize"] else [None]
+            first_of[name], n_colors[name] = len(targets), len(palette)
+            for k, rgb in enumerate(palette):
+                proto_path = f"{self.path}/Prototypes/{name}_{k}"
+                proto = stage.DefinePrim(proto_path, "Xform")
+                proto.GetReferences().AddReference(_file_uri(p["usd"]))
+                UsdGeom.Xformable(proto).ClearXformOpOrder()
+                _strip_missing_textures(stage, proto_path, asset_path=p["usd"])
+                if rgb is not None:
+                    _colorize_car(stage, proto_path, p["looks"], rgb=rgb)
+                targets.append(Sdf.Path(proto_path))
+        inst.CreatePrototypesRel().SetTargets(targets)
+
+        lane_of, s0, proto_idx, scales = [], [], [], []
+        for li, lane in enumerate(self.lanes):
+            # 첫 차가 끝점, 뒤로 spacing 씩(LineCarSpawner 와 같은 배치)
+            lane_of.append(np.full(lane.count, li, dtype=np.int64))
+            s0.append(lane.length - lane.spacing * np.arange(lane.count, dtype=np.float64))
+            base, nc = first_of[lane.prototype], n_colors[lane.prototype]
+            proto_idx.extend(base + random.randrange(nc) for _ in range(lane.count))
+            scales.extend([self._protos[lane.prototype]["scale"]] * lane.count)
+        self._lane_of = np.concatenate(lane_of)
+        self._s0 = np.concatenate(s0)
+        self._clock = np.zeros(len(self.lanes), dtype=np.float64)
+        self._active = np.ones(len(self.lanes), dtype=bool)
+
+        # 레인 파라미터를 차량별로 펼쳐 둠(매 프레임 인덱싱 생략)
+        L = self.lanes
+        self._c_speed = np.array([l.speed for l in L])[self._lane_of]
+        self._c_length = np.array([l.length for l in L])[self._lane_of]
+        self._c_spacing = np.array([l.spacing for l in L])[self._lane_of]
+        self._c_delay = np.array([l.respawn_delay for l in L])[self._lane_of]
+        self._c_loop = np.array([l.mode == "loop" for l in L])[self._lane_of]
+
+        # 전 레인 구간을 한 배열로: 키 = 레인 오프셋 + 레인 내 거리 → searchsorted 1회로 전 차량 구간 조회
+        off = np.concatenate([[0.0], np.cumsum([l.length + 1.0 for l in L])[:-1]])
+        n_seg = np.array([len(l.seg_s0) for l in L])
+        self._seg_key = np.concatenate([o + l.seg_s0 for o, l in zip(off, L)])
+        self._seg_s0 = np.concatenate([l.seg_s0 for l in L])
+        self._seg_p0 = np.concatenate([l.seg_p0 for l in L])
+        self._seg_dir = np.concatenate([l.seg_dir for l in L])
+        self._seg_quat = euler_xyz_to_quat(0.0, 0.0, np.concatenate([l.seg_yaw for l in L])).astype(np.float16)
+        seg_lo = np.concatenate([[0], np.cumsum(n_seg)[:-1]])
+        self._c_off = off[self._lane_of]
+        self._c_seg_lo = seg_lo[self._lane_of]
+        self._c_seg_hi = (seg_lo + n_seg - 1)[self._lane_of]
+
+        n = len(self._s0)
+        self._pos = np.zeros((n, 3), dtype=np.float32)
+        self._rot = np.zeros((n, 4), dtype=np.float16)
+        self._seg_of = np.full(n, -1, dtype=np.int64)
+        self._place(np.arange(n))
+
+        inst.CreateProtoIndicesAttr(Vt.IntArray(proto_idx))
+        inst.CreateIdsAttr(Vt.Int64Array(list(range(n))))
+        inst.CreateScalesAttr(Vt.Vec3fArray([Gf.Vec3f(s) for s in scales]))
+        inst.CreatePositionsAttr(Vt.Vec3fArray.FromNumpy(self._pos))
+        inst.CreateOrientationsAttr(Vt.QuathArray.FromNumpy(self._rot))
+        rgb = np.ones((n, 3), dtype=np.float32)
+        colors = np.array(_COLOR_CHOICES, dtype=np.float32)
+        for i, pi in enumerate(proto_idx):
+            name = self.lanes[self._lane_of[i]].prototype
+            if self._protos[name]["colorize"]:
+                rgb[i] = colors[pi - first_of[name]]
+        UsdGeom.PrimvarsAPI(inst).CreatePrimvar(
+            "displayColor", Sdf.ValueTypeNames.Color3fArray, UsdGeom.Tokens.vertex
+        ).Set(Vt.Vec3fArray.FromNumpy(rgb))
+        self._inst = inst
+
+    # ───────────────────────── motion ─────────────────────────
+    def _place(self, idx: np.ndarray):
+        """idx 차량들의 위치/방향을 레인 시계로 계산해 _pos/_rot 에 기록(레인 수와 무관하게 벡터 연산 1벌)."""
+        s = lane_distances(self._s0[idx], self._clock[self._lane_of[idx]], self._c_speed[idx], self._c_length[idx],
+                           self._c_spacing[idx], self._c_delay[idx], self._c_loop[idx])
+        # s<0(시작 뒤 대기) 는 첫 구간 연장선, s>=L 은 마지막 구간
+        key = self._c_off[idx] + np.clip(s, 0.0, self._c_length[idx])
+        seg = np.clip(np.searchsorted(self._seg_key, key, side="right") - 1, self._c_seg_lo[idx], self._c_seg_hi[idx])
+        self._pos[idx] = self._seg_p0[seg] + self._seg_dir[seg] * (s - self._seg_s0[seg])[:, None]
+        # 방향은 구간이 바뀐 차량만(코너 통과 / wrap)
+        turned = seg != self._seg_of[idx]
+        if turned.any():
+            rows = idx[turned]
+            self._seg_of[rows] = seg[turned]
+            self._rot[rows] = self._seg_quat[seg[turned]]
+            self._rot_dirty = True
+
+    def _check_view(self):
+        fr = None
+        if self._view_fn is not None:
+            try:
+                fr = self._view_fn(self._stage)
+            except Exception:
+                fr = None
+        if fr is None:
+            active = np.ones(len(self.lanes), dtype=bool)
+        else:
+            active = np.array([fr.Intersects(Gf.BBox3d(l.bounds)) for l in self.lanes], dtype=bool)
+        if not np.array_equal(active, self._active):
+            print(f"[Conveyor] active lanes {int(active.sum())}/{len(active)}")
+            self._active = active
+
+    def update(self):
+        if self._inst is None:
+            return
+        now = time.perf_counter()
+        dt = min(max(now - self._last_time, 0.0), 0.1)
+        self._last_time = now
+
+        if now >= self._next_view_check:
+            self._next_view_check = now + _VIEW_CHECK_S
+            self._check_view()
+        if not self._active.any():
+            return
+        self._clock[self._active] += dt
+        idx = np.flatnonzero(self._active[self._lane_of])
+        self._place(idx)
+        with live_edit(self._live):
+            self._inst.GetPositionsAttr().Set(Vt.Vec3fArray.FromNumpy(self._pos))
+            if self._rot_dirty:
+                self._inst.GetOrientationsAttr().Set(Vt.QuathArray.FromNumpy(self._rot))
+                self._rot_dirty = False
+
+    def destroy(self):
+        stage = self._stage
+        try:
+            if stage is not None and stage.GetPrimAtPath(self.path):
+                with live_edit(self._live):
+                    stage.RemovePrim(self.path)
+        except Exception as e:
+            print("[Conveyor] destroy failed:", e)
+        self._inst = None
+        self._stage = None
@@ -0,0 +1,226 @@
+# fleet_state.py — AMR 보간 상태를 연속 NumPy 배열로 보관(omni/pxr 의존 없음)
+# - 로봇마다 고정 행(index). 제거된 행은 free list 로 재사용
+# - 위치는 스테이지 좌표(3D), yaw 는 도 단위
+# - step() 은 활성 행 전체를 벡터 연산 1회로 보간 → 로봇 수가 늘어도 파이썬 루프 없음
+# - active: 목표가 현재 자세와 다를 때만 켜지고 수렴하면 꺼짐 → 정지/충전 중 로봇은 비용 0
+# - 예측 모델: 연속 샘플(위치, 시각)로 속도/yaw rate 를 추정해 샘플 사이를 외삽(horizon 까지)하고,
+#   표시 위치는 예측 위치로 제한된 속도로 보정, 오차가 snap 임계 이상이면 바로 이동
+# - bucket/shown: 상태 색 구간(데이터 기준 / 마지막으로 USD 에 기록한 값) → 다를 때만 색 기록
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+class FleetState:
+    def __init__(self, capacity: int = 64):
+        cap = max(1, int(capacity))
+        self.index: Dict[str, int] = {}
+        self.ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        self.n = 0                      # 사용한 최대 행 수
+
+        self.cur    = np.zeros((cap, 3), dtype=np.float64)
+        self.tgt    = np.zeros((cap, 3), dtype=np.float64)   # 마지막 샘플 위치
+        self.yaw    = np.zeros(cap, dtype=np.float64)
+        self.tyaw   = np.zeros(cap, dtype=np.float64)        # 마지막 샘플 yaw
+        self.t_s    = np.zeros(cap, dtype=np.float64)        # 마지막 샘플 시각(로컬 epoch 초)
+        self.vel    = np.zeros((cap, 3), dtype=np.float64)   # 단위/초
+        self.yrate  = np.zeros(cap, dtype=np.float64)        # 도/초
+        self.used   = np.zeros(cap, dtype=bool)
+        self.active = np.zeros(cap, dtype=bool)
+        self.dirty  = np.zeros(cap, dtype=bool)     # 값 변화 없어도 다음 step 에서 내보낼 행
+        self.inst   = np.full(cap, -1, dtype=np.int64)   # PointInstancer 슬롯(-1: 없음)
+        self.bucket = np.zeros(cap, dtype=np.int8)       # 상태 색 구간
+        self.shown  = np.full(cap, -1, dtype=np.int8)    # 기록된 색 구간(-1: 미기록)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, rid: str) -> bool:
+        return rid in self.index
+
+    # ───────────────────────── rows ─────────────────────────
+    def _grow(self, need: int):
+        cap = len(self.cur)
+        if need <= cap:
+            return
+        new = max(need, cap * 2)
+
+        def _ext(a: np.ndarray, fill=0):
+            b = np.full((new,) + a.shape[1:], fill, dtype=a.dtype)
+            b[:cap] = a
+            return b
+
+        self.cur, self.tgt = _ext(self.cur), _ext(self.tgt)
+        self.yaw, self.tyaw = _ext(self.yaw), _ext(self.tyaw)
+        self.t_s, self.vel, self.yrate = _ext(self.t_s), _ext(self.vel), _ext(self.yrate)
+        self.used, self.active = _ext(self.used, False), _ext(self.active, False)
+        self.dirty = _ext(self.dirty, False)
+        self.inst = _ext(self.inst, -1)
+        self.bucket, self.shown = _ext(self.bucket), _ext(self.shown, -1)
+
+    def add(self, rid: str, pos, yaw: float, t: float = 0.0) -> int:
+        """새 로봇: 현재 = 목표(첫 등장은 보간 없이 그 자리에)."""
+        idx = self.index.get(rid)
+        if idx is not None:
+            return idx
+        if self._free:
+            idx = self._free.pop()
+            self.ids[idx] = rid
+        else:
+            idx = self.n
+            self._grow(idx + 1)
+            self.ids.append(rid)
+            self.n += 1
+        self.index[rid] = idx
+        self.cur[idx] = self.tgt[idx] = pos
+        self.yaw[idx] = self.tyaw[idx] = yaw
+        self.t_s[idx] = t
+        self.vel[idx] = 0.0
+        self.yrate[idx] = 0.0
+        self.used[idx] = True
+        self.active[idx] = True
+        self.dirty[idx] = True
+        self.inst[idx] = -1
+        self.bucket[idx] = 0
+        self.shown[idx] = -1
+        return idx
+
+    def remove(self, rid: str) -> Optional[int]:
+        idx = self.index.pop(rid, None)
+        if idx is None:
+            return None
+        self.ids[idx] = None
+        self.used[idx] = False
+        self.active[idx] = False
+        self.dirty[idx] = False
+        self.inst[idx] = -1
+        self._free.append(idx)
+        return idx
+
+    def clear(self):
+        self.index.clear()
+        self.ids.clear()
+        self._free.clear()
+        self.n = 0
+        self.used[:] = False
+        self.active[:] = False
+        self.dirty[:] = False
+        self.inst[:] = -1
+        self.shown[:] = -1
+
+    # ───────────────────────── samples ─────────────────────────
+    def set_targets(self, idx: np.ndarray, pos: np.ndarray, yaw: np.ndarray, t: np.ndarray, *,
+                    alpha: float = 0.6, max_speed: float = np.inf, min_speed: float = 0.0,
+                    min_yaw_rate: float = 0.0, max_gap_s: float = 5.0,
+                    pos_eps: float = 0.0, yaw_eps: float = 0.0):
+        """
+        새 샘플 반영 + 속도 추정(EMA). 이전 샘플보다 오래되었거나 같은 시각의 샘플은 무시.
+        샘플 간격이 max_gap_s 를 넘으면 속도 0 으로 초기화(오래 끊긴 뒤 튀는 외삽 방지).
+        """
+        if len(idx) == 0:
+            return
+        t = np.asarray(t, dtype=np.float64)
+        dt = t - self.t_s[idx]
+        new = dt > 0.0
+        if not new.any():
+            return
+        idx, pos, yaw, dt = idx[new], pos[new], yaw[new], dt[new]
+
+        ok = dt <= max_gap_s
+        inv = np.where(ok, 1.0 / np.maximum(dt, 1e-3), 0.0)
+        v = (pos - self.tgt[idx]) * inv[:, None]
+        w = (((yaw - self.tyaw[idx] + 180.0) % 360.0) - 180.0) * inv
+        # 순간이동(재배치/맵 전환)은 속도로 보지 않음
+        speed = np.sqrt(np.einsum("ij,ij->i", v, v))
+        v[speed > max_speed] = 0.0
+
+        a = np.where(ok, alpha, 1.0)
+        vel = a[:, None] * v + (1.0 - a)[:, None] * self.vel[idx]
+        yr = a * w + (1.0 - a) * self.yrate[idx]
+        # 정지 판정(EMA 꼬리가 0 에 수렴하지 않고 남는 것 방지)
+        vel[np.einsum("ij,ij->i", vel, vel) < min_speed * min_speed] = 0.0
+        yr[np.abs(yr) < min_yaw_rate] = 0.0
+        self.vel[idx] = vel
+        self.yrate[idx] = yr
+        self.tgt[idx] = pos
+        self.tyaw[idx] = yaw
+        self.t_s[idx] = t[new]
+
+        d = pos - self.cur[idx]
+        far = np.einsum("ij,ij->i", d, d) > pos_eps * pos_eps
+        turn = np.abs(((yaw - self.yaw[idx] + 180.0) % 360.0) - 180.0) > yaw_eps
+        moving = np.any(self.vel[idx] != 0.0, axis=1) | (self.yrate[idx] != 0.0)
+        self.active[idx[far | turn | moving]] = True
+
+    def has_work(self) -> bool:
+        n = self.n
+        return bool(self.active[:n].any() or self.dirty[:n].any())
+
+    def active_count(self) -> int:
+        return int(np.count_nonzero(self.active[:self.n]))
+
+    def touch(self, idx=None):
+        """표현이 새로 생겼을 때 등: 다음 step 에서 변화가 없어도 현재 값을 내보내도록 표시."""
+        if idx is None:
+            self.dirty[:self.n] = self.used[:self.n]
+        else:
+            self.dirty[idx] = True
+
+    # ───────────────────────── step ─────────────────────────
+    def step(self, now: float, dt: float, *, horizon_s: float, tau_s: float,
+             corr_speed: float, corr_yaw_speed: float, snap_dist: float, snap_yaw: float,
+             pos_eps: float, yaw_eps: float) -> np.ndarray:
+        """
+        활성 행을 한 프레임 진행. 값이 바뀐 행(+ touch 된 행) index 배열 반환.
+          예측 = 샘플 + 속도 × min(now - 샘플시각, horizon)
+          표시 = 표시 + 속도 × dt(외삽 중일 때) + 보정(오차 × (1 - e^(-dt/tau)), 최대 max(corr_speed, |속도|) × dt)
+        """
+        n = self.n
+        sel = np.flatnonzero(self.active[:n] | self.dirty[:n])
+        if len(sel) == 0:
+            return sel
+
+        el = now - self.t_s[sel]
+        extrap = el < horizon_s                       # horizon 이후엔 예측 위치 고정
+        el = np.clip(el, 0.0, horizon_s)
+        vel = self.vel[sel] * extrap[:, None]
+        yr = self.yrate[sel] * extrap
+        gain = 1.0 - np.exp(-max(dt, 0.0) / max(tau_s, 1e-3))
+
+        # 위치
+        cur = self.cur[sel]
+        pred = self.tgt[sel] + self.vel[sel] * el[:, None]
+        base = cur + vel * dt
+        err = pred - base
+        en = np.sqrt(np.einsum("ij,ij->i", err, err))
+        # 보정 속도 상한: 설정값과 현재 추정 속도 중 큰 값(빠른 로봇일수록 빨리 따라잡음)
+        cap = np.maximum(corr_speed, np.sqrt(np.einsum("ij,ij->i", vel, vel))) * dt
+        corr_n = en * gain
+        k = np.where(corr_n > cap, cap / np.maximum(corr_n, 1e-12), 1.0) * gain
+        new_pos = base + err * k[:, None]
+        snap = (en > snap_dist) | (en <= pos_eps)
+        new_pos[snap] = pred[snap]
+
+        # yaw
+        yaw = self.yaw[sel]
+        ypred = self.tyaw[sel] + self.yrate[sel] * el
+        ybase = yaw + yr * dt
+        yerr = ((ypred - ybase + 180.0) % 360.0) - 180.0
+        ycorr = np.clip(yerr * gain, -corr_yaw_speed * dt, corr_yaw_speed * dt)
+        ysnap = (np.abs(yerr) > snap_yaw) | (np.abs(yerr) <= yaw_eps)
+        new_yaw = np.where(ysnap, ybase + yerr, ybase + ycorr)
+        new_yaw = ((new_yaw + 180.0) % 360.0) - 180.0
+
+        moved = np.einsum("ij,ij->i", new_pos - cur, new_pos - cur) > 0.0
+        turned = new_yaw != yaw
+        changed = moved | turned | self.dirty[sel]
+        # 외삽이 끝났고(속도 0 또는 horizon 경과) 예측 위치에 도달하면 비활성
+        still = ~np.any(vel != 0.0, axis=1) & (yr == 0.0)
+        done = still & (en <= pos_eps) & (np.abs(yerr) <= yaw_eps)
+        self.dirty[sel] = False
+        self.active[sel[done]] = False
+        self.cur[sel] = new_pos
+        self.yaw[sel] = new_yaw
+        return sel[changed]
@@ -0,0 +1,154 @@
+# floor_graph.py — 맵 JSON(노드/엣지)을 바닥 오버레이로(pxr + NumPy, omni 의존 없음)
+# - 엣지 전체 = BasisCurves 1개(선분마다 2점), 노드 전체 = Points 1개 → 노드/엣지 수와 무관하게 prim 2개
+# - 좌표는 Amr3D 의 맵(mm) → 스테이지 변환 그대로
+# - 빌드(JSON 파싱 + 배열 구성 + .usdc 저장)는 백그라운드 스레드, 결과는 캐시 파일로 남김
+#   키 = 맵 파일 내용 + 변환 + 빌드 파라미터 해시 → 다음 시작부터는 캐시 파일을 reference 만
+# - 스테이지 반영(reference 추가)은 update() 에서 메인 스레드로, 라이브 레이어에만
+
+import os
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from pxr import Gf, Sdf, Usd, UsdGeom, Vt
+
+from ui_code.ui.scene.live_layer import live_edit
+from ui_code.ui.utils.cache import cache_dir, file_digest
+from ui_code.ui.utils.map_graph import MapGraph
+
+_BUILD_VERSION = 1   # 산출물 구조가 바뀌면 올려서 캐시 무효화
+
+
+def build_floor_graph(graph: MapGraph, to_stage, out_path: str, *, up_axis: int, lift: float,
+                      edge_width: float, node_size: float,
+                      edge_color=(0.35, 0.75, 0.95), node_color=(0.95, 0.95, 0.95)) -> str:
+    """
+    graph 를 out_path(.usdc) 로 저장. to_stage: (N,2) mm → (N,3) 스테이지 좌표 함수.
+    defaultPrim=/FloorGraph, 하위 Edges(BasisCurves) / Nodes(Points).
+    """
+    labels = list(graph.nodes.keys())
+    row = {k: i for i, k in enumerate(labels)}
+    xy = np.array([graph.nodes[k] for k in labels], dtype=np.float64).reshape(-1, 2)
+    pts = to_stage(xy) if len(xy) else np.zeros((0, 3))
+    pts[:, up_axis] += lift
+
+    pairs = [(row[a], row[b]) for a, b in graph.edges if a in row and b in row]
+    # 양방향 엣지는 한 번만
+    pairs = list({(min(a, b), max(a, b)) for a, b in pairs if a != b})
+    seg = pts[np.array(pairs, dtype=np.int64).reshape(-1, 2)].reshape(-1, 3) if pairs else np.zeros((0, 3))
+
+    layer = Sdf.Layer.CreateNew(out_path)
+    stage = Usd.Stage.Open(layer)
+    if up_axis == 2:
+        UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.z)
+    else:
+        UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.y)
+    root = UsdGeom.Xform.Define(stage, "/FloorGraph")
+    stage.SetDefaultPrim(root.GetPrim())
+
+    def _extent(p: np.ndarray, pad: float):
+        if not len(p):
+            return Vt.Vec3fArray([Gf.Vec3f(0.0), Gf.Vec3f(0.0)])
+        lo, hi = p.min(axis=0) - pad, p.max(axis=0) + pad
+        return Vt.Vec3fArray([Gf.Vec3f(*lo.tolist()), Gf.Vec3f(*hi.tolist())])
+
+    edges = UsdGeom.BasisCurves.Define(stage, "/FloorGraph/Edges")
+    edges.CreateTypeAttr(UsdGeom.Tokens.linear)
+    edges.CreateWrapAttr(UsdGeom.Tokens.nonperiodic)
+    edges.CreatePointsAttr(Vt.Vec3fArray.FromNumpy(seg.astype(np.float32)))
+    edges.CreateCurveVertexCountsAttr(Vt.IntArray(len(pairs), 2))
+    edges.CreateWidthsAttr(Vt.FloatArray([float(edge_width)]))
+    edges.SetWidthsInterpolation(UsdGeom.Tokens.constant)
+    edges.CreateDisplayColorAttr([Gf.Vec3f(*edge_color)])
+    edges.CreateExtentAttr(_extent(seg, edge_width))
+
+    nodes = UsdGeom.Points.Define(stage, "/FloorGraph/Nodes")
+    nodes.CreatePointsAttr(Vt.Vec3fArray.FromNumpy(pts.astype(np.float32)))
+    nodes.CreateWidthsAttr(Vt.FloatArray([float(node_size)]))
+    nodes.SetWidthsInterpolation(UsdGeom.Tokens.constant)
+    nodes.CreateDisplayColorAttr([Gf.Vec3f(*node_color)])
+    nodes.CreateExtentAttr(_extent(pts, node_size))
+
+    layer.Save()
+    return out_path
+
+
+class FloorGraph:
+    def __init__(self, amr3d, *, path: str = "/World/FloorGraph", edge_width_mm: float = 40.0,
+                 node_size_mm: float = 150.0, lift_mm: float = 5.0):
+        self._amr3d = amr3d
+        self.path = path
+        self._EDGE_WIDTH_MM = float(edge_width_mm)
+        self._NODE_SIZE_MM = float(node_size_mm)
+        self._LIFT_MM = float(lift_mm)
+
+        self._thread: Optional[threading.Thread] = None
+        self._result: Optional[str] = None     # 빌드/캐시 파일 경로(스레드가 채움)
+        self._attached: Optional[str] = None
+
+    def start(self, map_path: str):
+        """캐시 확인 → 없으면 백그라운드 빌드. 반영은 update() 에서."""
+        amr = self._amr3d
+        if amr.stage is None or self._thread is not None:
+            return
+        if not map_path or not os.path.exists(map_path):
+            print(f"[FloorGraph] map not found: {map_path}")
+            return
+        k = amr.mm_to_units
+        up = amr.up_axis
+        # 변환은 세 점으로 완전히 정해짐 → 키에 포함(보정값이 바뀌면 다시 빌드)
+        basis = np.round(amr.map_to_stage(np.array([[0.0, 0.0], [1000.0, 0.0], [0.0, 1000.0]])), 6)
+        to_stage = amr.map_to_stage
+        params = dict(up_axis=up, lift=self._LIFT_MM * k,
+                      edge_width=self._EDGE_WIDTH_MM * k, node_size=self._NODE_SIZE_MM * k)
+
+        def _build():
+            t0 = time.perf_counter()
+            try:
+                key = file_digest(map_path, _BUILD_VERSION, basis.tolist(), sorted(params.items()))
+                out = os.path.join(cache_dir("floor_graph"), f"floor_graph_{key}.usdc")
+                if os.path.exists(out):
+                    print(f"[FloorGraph] cache hit {os.path.basename(out)}")
+                else:
+                    graph = MapGraph.load(map_path)
+                    tmp = out + ".tmp.usdc"
+                    build_floor_graph(graph, to_stage, tmp, **params)
+                    os.replace(tmp, out)   # 빌드 중단 시 반쪽 파일이 캐시로 남지 않게
+                    print(f"[FloorGraph] built {len(graph.nodes)} nodes / {len(graph.edges)} edges "
+                          f"in {(time.perf_counter() - t0) * 1000:.0f} ms → {out}")
+                self._result = out
+            except Exception as e:
+                print("[FloorGraph] build failed:", e)
+
+        self._thread = threading.Thread(target=_build, daemon=True)
+        self._thread.start()
+
+    def update(self):
+        """빌드가 끝났으면 캐시 파일을 라이브 레이어에서 reference(1회)."""
+        thr = self._thread
+        if thr is None or thr.is_alive():
+            return
+        self._thread = None
+        out = self._result
+        stage = self._amr3d.stage
+        if not out or stage is None:
+            return
+        with live_edit(self._amr3d.live_layer):
+            prim = stage.DefinePrim(self.path, "Xform")
+            refs = prim.GetReferences()
+            refs.ClearReferences()
+            refs.AddReference(out)
+        self._attached = out
+        print(f"[FloorGraph] attached {os.path.basename(out)} at {self.path}")
+
+    def destroy(self):
+        self._thread = None
+        stage = self._amr3d.stage
+        try:
+            if stage is not None and stage.GetPrimAtPath(self.path):
+                with live_edit(self._amr3d.live_layer):
+                    stage.RemovePrim(self.path)
+        except Exception as e:
+            print("[FloorGraph] destroy failed:", e)
+        self._attached = None
@@ -1,12 +1,22 @@
 # ui_code/ui/scene/linecar.py
+import hashlib
+import json
+import os
 import time
 import random
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
 import omni.usd
 import omni.kit.app as kit_app
-from pxr import Sdf, Usd, UsdGeom, Gf, UsdShade
+from pxr import Sdf, Usd, UsdGeom, Gf, UsdShade, Vt
+
+from ui_code.ui.scene.amr_instancer import euler_xyz_to_quat
+from ui_code.ui.scene.live_layer import get_live_layer, live_edit
+from ui_code.ui.scene.spawn_queue import SpawnQueue
+from ui_code.ui.scene.xform_batch import XformBatch
+from ui_code.ui.utils.cache import cache_dir
 
 
 # ─────────────────────────────────────────────────────────────
@@ -139,14 +149,15 @@ def _set_albedo_on_look(stage, look_path: str, rgb: tuple) -> bool:
     found.Set(Gf.Vec3f(*rgb))
     return True
 
-def _colorize_car(stage, car_path: str, looks_names: List[str], *, single_color_per_car: bool = True):
-    """car_path/BODY/Body/Body/New_Scene/Looks 하위의 지정 Look들에 색상 적용."""
+def _colorize_car(stage, car_path: str, looks_names: List[str], *, single_color_per_car: bool = True,
+                  rgb: Optional[tuple] = None):
+    """car_path/BODY/Body/Body/New_Scene/Looks 하위의 지정 Look들에 색상 적용(rgb 없으면 랜덤)."""
     looks_root = f"{car_path}/BODY/Body/Body/New_Scene/Looks"  # ← 여기만 수정됨
     if not stage.GetPrimAtPath(looks_root):
         print(f"[Color] Looks folder missing: {looks_root}")
         return
 
-    car_rgb = _random_color()
+    car_rgb = rgb if rgb is not None else _random_color()
 
     for look_name in looks_names:
         look_path = f"{looks_root}/{look_name}"
@@ -166,23 +177,25 @@ _TEX_INPUTS = {
     "file",  # UsdUVTexture 호환
 }
 
-def _strip_missing_textures(stage: Usd.Stage, root_prim_path: str):
-    """root_prim_path 하위 Shader 입력 중 절대경로 텍스처가 존재하지 않으면 비우고 연결도 끊음."""
+def _scan_texture_fixes(stage: Usd.Stage, root_prim_path: str) -> List[dict]:
+    """root 하위 Shader 를 순회해 할 일만 기록(편집 없음). prim 경로는 root 기준 상대경로."""
     root = stage.GetPrimAtPath(root_prim_path)
     if not root or not root.IsValid():
-        return
+        return []
+    root_path = root.GetPath()
+    fixes: List[dict] = []
     for prim in Usd.PrimRange(root):
         if prim.GetTypeName() != "Shader":
             continue
         shader = UsdShade.Shader(prim)
         sid = (shader.GetIdAttr().Get() or "").lower()
+        fix = {"prim": str(prim.GetPath().MakeRelativePath(root_path)), "clear": [], "flags": [], "dc": False}
 
         for inp in shader.GetInputs():
             name = inp.GetBaseName()
             if name not in _TEX_INPUTS:
                 continue
-            attr = inp.GetAttr()
-            val  = attr.Get()
+            val = inp.GetAttr().Get()
 
             # Sdf.AssetPath 또는 string 처리
             path = ""
@@ -194,15 +207,11 @@ def _strip_missing_textures(stage: Usd.Stage, root_prim_path: str):
             # omniverse:// 는 건드리지 않음. 윈도우 절대경로만 체크.
             if path and (":\\" in path or ":/" in path) and not path.startswith("omniverse://"):
                 try:
-                    import os
                     exists = os.path.exists(path)
                 except Exception:
                     exists = False
                 if not exists:
-                    try: attr.Set(Sdf.AssetPath(""))  # 상위 파일값을 오버라이드(빈 경로)
-                    except Exception: pass
-                    try: inp.DisconnectSource()        # 연결도 끊기
-                    except Exception: pass
+                    fix["clear"].append(name)
 
         # OmniPBR일 때 텍스처 플래그도 꺼줌 + 기본 색 보정
         try:
@@ -210,12 +219,126 @@ def _strip_missing_textures(stage: Usd.Stage, root_prim_path: str):
                 for flag in ("enable_opacity_texture", "enable_normalmap"):
                     f = shader.GetInput(flag)
                     if f and f.Get() != 0:
-                        f.Set(0)
+                        fix["flags"].append(flag)
                 dc = shader.GetInput("diffuse_color_constant")
                 if dc and dc.Get() is None:
+                    fix["dc"] = True
+        except Exception:
+            pass
+
+        if fix["clear"] or fix["flags"] or fix["dc"]:
+            fixes.append(fix)
+    return fixes
+
+
+def _apply_texture_fixes(stage: Usd.Stage, root_prim_path: str, fixes: List[dict]) -> int:
+    """기록된 할 일만 적용(순회/파일 확인 없음). 적용한 shader 수 반환."""
+    root = Sdf.Path(root_prim_path)
+    done = 0
+    for fix in fixes:
+        prim = stage.GetPrimAtPath(root.AppendPath(fix["prim"]))
+        if not prim or not prim.IsValid():
+            continue
+        shader = UsdShade.Shader(prim)
+        for name in fix.get("clear", ()):
+            inp = shader.GetInput(name)
+            if not inp:
+                continue
+            try: inp.GetAttr().Set(Sdf.AssetPath(""))  # 상위 파일값을 오버라이드(빈 경로)
+            except Exception: pass
+            try: inp.DisconnectSource()                 # 연결도 끊기
+            except Exception: pass
+        try:
+            for flag in fix.get("flags", ()):
+                f = shader.GetInput(flag)
+                if f:
+                    f.Set(0)
+            if fix.get("dc"):
+                dc = shader.GetInput("diffuse_color_constant")
+                if dc:
                     dc.Set(Gf.Vec3f(0.8, 0.8, 0.8))
         except Exception:
             pass
+        done += 1
+    return done
+
+
+# (asset 경로, mtime) → fixes. 같은 세션의 다른 프로토/스포너는 디스크도 안 읽음
+_TEX_FIX_MEMO: Dict[tuple, List[dict]] = {}
+
+
+def _texture_cache_file(asset_path: str) -> str:
+    key = hashlib.sha1(os.path.abspath(asset_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(cache_dir("texture_check"), f"{key}.json")
+
+
+def _strip_missing_textures(stage: Usd.Stage, root_prim_path: str, asset_path: Optional[str] = None):
+    """
+    root_prim_path 하위 Shader 입력 중 절대경로 텍스처가 존재하지 않으면 비우고 연결도 끊음.
+    asset_path(로컬 파일)를 주면 결과를 (경로, mtime) 키로 디스크에 캐시 → 다음부터는 순회 없이 적용.
+    """
+    mtime = None
+    if asset_path:
+        try:
+            mtime = os.path.getmtime(asset_path)
+        except Exception:
+            mtime = None   # omniverse:// 등 → 캐시 없이 매번 검사
+    if mtime is None:
+        _apply_texture_fixes(stage, root_prim_path, _scan_texture_fixes(stage, root_prim_path))
+        return
+
+    memo_key = (os.path.abspath(asset_path), mtime)
+    fixes = _TEX_FIX_MEMO.get(memo_key)
+    source = "memo"
+    if fixes is None:
+        cache_file = _texture_cache_file(asset_path)
+        try:
+            with open(cache_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("asset") == memo_key[0] and data.get("mtime") == mtime:
+                fixes, source = data.get("fixes") or [], "disk"
+        except Exception:
+            pass
+        if fixes is None:
+            t0 = time.perf_counter()
+            fixes, source = _scan_texture_fixes(stage, root_prim_path), "scan"
+            try:
+                with open(cache_file, "w", encoding="utf-8") as f:
+                    json.dump({"asset": memo_key[0], "mtime": mtime, "fixes": fixes}, f)
+            except Exception as e:
+                print(f"[LineCar] texture cache write failed: {e}")
+            print(f"[LineCar] texture scan {(time.perf_counter() - t0) * 1000:.0f} ms ({len(fixes)} shaders to fix)")
+        _TEX_FIX_MEMO[memo_key] = fixes
+
+    n = _apply_texture_fixes(stage, root_prim_path, fixes)
+    print(f"[LineCar] texture fixes applied: {n} ({source})")
+
+
+# ─────────────────────────────────────────────────────────────
+# 레인 이동(닫힌 식)
+# ─────────────────────────────────────────────────────────────
+
+def lane_distances(s0, t, speed, length, spacing, delay, loop) -> np.ndarray:
+    """
+    시계 t 에서 차량별 진행 거리 s(레인 시작점 기준). 인자는 스칼라 또는 차량별 배열(브로드캐스트).
+    - loop   : 끝점(s=L) 도달 시 시작 뒤 spacing 지점(s=-spacing)으로 → 주기 L+spacing 의 나머지 연산
+    - respawn: 처음 끝점에 닿는 시각까지는 직진, 이후 (대기 delay + 주행 L/v) 주기 반복(대기 중 s=0)
+    끝점을 넘는(wrap) 차량만 np.where 로 분기, 나머지는 s0 + v·t 그대로.
+    """
+    s0 = np.asarray(s0, dtype=np.float64)
+    v = np.abs(np.asarray(speed, dtype=np.float64))
+    s = s0 + v * t
+    wrapped = (s >= length) & (v > 0.0)
+    if not wrapped.any():
+        return s
+    with np.errstate(divide="ignore", invalid="ignore"):
+        period = np.asarray(length + spacing, dtype=np.float64)
+        looped = np.where(period > 0.0, np.mod(s + spacing, np.where(period > 0.0, period, 1.0)) - spacing, 0.0)
+        vv = np.where(v > 0.0, v, 1.0)
+        cycle = delay + length / vv
+        phase = np.mod((s - length) / vv, np.where(cycle > 0.0, cycle, 1.0))   # 첫 도달 이후 경과 시간(주기 내)
+        respawned = np.maximum(phase - delay, 0.0) * v
+    return np.where(wrapped, np.where(loop, looped, respawned), s)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -227,7 +350,12 @@ class LineCarSpawner:
     - 외부 USD(차체)를 /World/_BodyProto 로 1회만 로드하고
     - /World/<parent>/Car_### 들을 내부 레퍼런스로 여러 대 생성
     - 각 차량은 x 방향으로 이동, 끝점 도달 시 loop 또는 respawn
+      위치는 공용 시계(clock)로 닫힌 식 계산(NumPy, 전 차량 한 번에) → XformBatch 로 일괄 기록
+    - prims 모드 차량 prim 생성은 SpawnQueue 로 프레임 예산 안에서 나눠 처리(생성 전 차량은 기록 생략)
     - BODY/Looks/<look_name>의 albedo를 5색 랜덤 적용(기본 _19___Default)
+    - render_mode="instancer": 차량 prim 대신 <parent>/Cars PointInstancer 1개
+      색상별 프로토타입(팔레트 색 수만큼)만 머티리얼 override → 차량별 색은 protoIndices 로 선택,
+      같은 색은 primvars:displayColor(인스턴스당 1개)로도 기록. 차량 수와 무관하게 USD 편집 횟수 고정
     """
     def __init__(
         self,
@@ -251,6 +379,7 @@ class LineCarSpawner:
         colorize: bool = True,
         looks_names: Optional[List[str]] = None,  # 색 적용할 Look 이름들
         single_color_per_car: bool = True,
+        render_mode: str = "prims",      # "prims" | "instancer"
     ):
         self._ctx = omni.usd.get_context()
         self._stage = self._ctx.get_stage()
@@ -281,9 +410,11 @@ class LineCarSpawner:
 
         # 이동 방향(오른쪽 +, 왼쪽 -)
         self._dir = 1.0 if self.end_x >= self.start_x else -1.0
-        self._speed_signed = self.speed * self._dir
 
-        self._cars: Dict[str, Dict] = {}  # name -> {prim, t, r, s, dead_until}
+        # 차량 상태는 배열로만: 이름 목록 + 시계 0 시점의 진행 거리(start_x 기준, 이동 방향 +)
+        self._names: List[str] = []
+        self._s0 = np.zeros(0, dtype=np.float64)
+        self._clock = 0.0                 # 누적 시뮬레이션 시간(프레임 dt 는 0.1s 로 clamp)
         self._sub = None
         self._last_time = time.perf_counter()
 
@@ -292,21 +423,38 @@ class LineCarSpawner:
         self._looks_names = list(looks_names) if looks_names else ["New_Material", "Body", "Door", "Trunk"]
         self._single_color_per_car = bool(single_color_per_car)
 
-        # 부모 그룹 보장
-        self._stage.DefinePrim(self.parent_path, "Xform")
+        # instancer 모드: positions 만 프레임당 1회 Set(나머지 배열은 spawn 때 1회)
+        self._render_mode = "instancer" if str(render_mode).strip().lower() == "instancer" else "prims"
+        self._inst: Optional[UsdGeom.PointInstancer] = None
+        self._inst_path = f"{self.parent_path}/Cars"
+        self._inst_pos = np.zeros((0, 3), dtype=np.float32)
+
+        # 차량/프로토는 라이브 session sublayer 에만 authored(공장 씬 레이어 dirty 방지)
+        self._live = get_live_layer(self._stage)
+        with live_edit(self._live):
+            # 부모 그룹 보장
+            self._stage.DefinePrim(self.parent_path, "Xform")
+
+            # 프로토 타입(외부 USD 한 번만 로드)
+            self._ensure_proto()
 
-        # 프로토 타입(외부 USD 한 번만 로드)
-        self._ensure_proto()
+        # translate 는 Sdf spec 직접 기록(변경 블록 1회), 회전은 고정이라 eps 로 자동 생략
+        self._xbatch = XformBatch(self._stage, pos_eps=1e-3, rot_eps_deg=0.01,
+                                  edit_target=self._live.edit_target if self._live else None)
+        self._spawn_queue = SpawnQueue(self._spawn_car, budget_ms=4.0, name=f"LineCar {self.parent_path}")
 
         print(f"[LineCar] init parent={self.parent_path} proto={self.proto_path} usd={self.usd_path}")
 
     # ───────── helpers
     def _ensure_proto(self):
         proto = self._stage.GetPrimAtPath(self.proto_path)
-        if not proto or not proto.IsValid():
-            proto = self._stage.DefinePrim(self.proto_path, "Xform")
-            proto.GetReferences().AddReference(_file_uri(self.usd_path))
-            proto.Load()
+        if proto and proto.IsValid():
+            # 다른 스포너가 이미 만든 프로토 — 스케일/텍스처 정리도 이미 됨
+            self._proto = proto
+            return
+        proto = self._stage.DefinePrim(self.proto_path, "Xform")
+        proto.GetReferences().AddReference(_file_uri(self.usd_path))
+        proto.Load()
 
         # 프로토 전체 스케일 축소(원본이 너무 클 때)
         try:
@@ -318,7 +466,7 @@ class LineCarSpawner:
             print(f"[LineCar] proto scale set failed:", e)
 
         # ★ 누락 텍스처 비활성화(에러 로그 방지)
-        _strip_missing_textures(self._stage, self.proto_path)
+        _strip_missing_textures(self._stage, self.proto_path, asset_path=self.usd_path)
 
         self._proto = proto
 
@@ -367,7 +515,7 @@ class LineCarSpawner:
         start_pos = Gf.Vec3d(x0, self.lane_y, self.lane_z)
         t_op.Set(start_pos)
 
-        self._cars[name] = {"prim": prim, "t": t_op, "r": r_op, "s": s_op, "dead_until": 0.0}
+        self._xbatch.bind(name, t_op, r_op)
 
         # 색상 적용
         if self._colorize:
@@ -390,66 +538,97 @@ class LineCarSpawner:
             for ch in list(parent.GetChildren()):
                 self._stage.RemovePrim(ch.GetPath())
 
-        self._cars.clear()
-
-        # count 대를 spacing 간격으로 배치
-        offset = self._dir * self.spacing  # 이동 방향 기준 spacing
-        for i in range(self.count):
-            x0 = self.end_x - offset * i
-            self._spawn_one(f"Car_{i+1:03d}", x0)
+        self._xbatch.clear()
+        self._spawn_queue.clear()
+        self._inst = None
+
+        # count 대를 spacing 간격으로 배치(첫 차가 끝점, 뒤로 spacing 씩)
+        length = abs(self.end_x - self.start_x)
+        self._names = [f"Car_{i+1:03d}" for i in range(self.count)]
+        self._s0 = length - self.spacing * np.arange(self.count, dtype=np.float64)
+        self._clock = 0.0
+        if self._render_mode == "instancer":
+            self._spawn_instanced(self.start_x + self._dir * self._s0)
+        else:
+            self._spawn_queue.extend(range(self.count))   # 실제 생성은 _on_update 에서 프레임마다 나눠서
+
+        verb = "queued" if self._spawn_queue else "spawned"
+        print(f"[LineCar] {verb} {self.count} cars (mode={self.mode}, spacing={self.spacing}) under {self.parent_path}")
+
+    def _spawn_instanced(self, x0: np.ndarray):
+        """PointInstancer 1개 + 색상별 프로토타입. 편집 횟수 = 팔레트 색 수 × Look 수(차량 수 무관)."""
+        n = len(x0)
+        palette = list(_COLOR_CHOICES) if self._colorize else [None]
+
+        inst = UsdGeom.PointInstancer.Define(self._stage, self._inst_path)
+        targets = []
+        for k, rgb in enumerate(palette):
+            proto_path = f"{self._inst_path}/Prototypes/Body_{k}"
+            proto = self._stage.DefinePrim(proto_path, "Xform")
+            proto.GetReferences().AddInternalReference(self.proto_path)
+            # 프로토 자체 xform 은 무시(prims 모드의 _ensure_ops 와 같은 결과) — 스케일은 인스턴스 scales 로
+            UsdGeom.Xformable(proto).ClearXformOpOrder()
+            if rgb is not None:
+                _colorize_car(self._stage, proto_path, self._looks_names, rgb=rgb)
+            targets.append(Sdf.Path(proto_path))
+        inst.CreatePrototypesRel().SetTargets(targets)
+
+        pick = np.array([random.randrange(len(palette)) for _ in range(n)], dtype=np.int32)
+        pos = np.zeros((n, 3), dtype=np.float32)
+        pos[:, 0] = x0
+        pos[:, 1] = self.lane_y
+        pos[:, 2] = self.lane_z
+        quat = euler_xyz_to_quat(self._rot[0], self._rot[1], self._rot[2]).astype(np.float16)
+
+        inst.CreateProtoIndicesAttr(Vt.IntArray.FromNumpy(pick))
+        inst.CreateIdsAttr(Vt.Int64Array(list(range(n))))
+        inst.CreatePositionsAttr(Vt.Vec3fArray.FromNumpy(pos))
+        inst.CreateOrientationsAttr(Vt.QuathArray.FromNumpy(np.tile(quat, (n, 1))))
+        inst.CreateScalesAttr(Vt.Vec3fArray(n, Gf.Vec3f(self._scale)))
+        if self._colorize:
+            rgb = np.array(palette, dtype=np.float32)[pick]
+            UsdGeom.PrimvarsAPI(inst).CreatePrimvar(
+                "displayColor", Sdf.ValueTypeNames.Color3fArray, UsdGeom.Tokens.vertex
+            ).Set(Vt.Vec3fArray.FromNumpy(rgb))
 
+        self._inst = inst
+        self._inst_pos = pos
 
-        print(f"[LineCar] spawned {self.count} cars (mode={self.mode}, spacing={self.spacing}) under {self.parent_path}")
+    def _spawn_car(self, i: int):
+        """i 번째 차량 prim 생성(큐에서 호출). 현재 시계 위치에서 바로 시작."""
+        x = self.start_x + self._dir * float(self._distances(self._clock)[i])
+        self._spawn_one(self._names[i], x)
 
     # ───────── runtime
-    def _step_car(self, name: str, dt: float, now: float):
-        car = self._cars.get(name)
-        if not car:
-            return
+    def _distances(self, t: float) -> np.ndarray:
+        """시계 t 에서 각 차량의 진행 거리 s(start_x 기준, 이동 방향 +)."""
+        return lane_distances(self._s0, t, abs(self.speed), abs(self.end_x - self.start_x),
+                              self.spacing, self.respawn_delay, self.mode == "loop")
 
-        # respawn 모드에서 대기 중이면 skip
-        if self.mode == "respawn" and now < car.get("dead_until", 0.0):
+    def _update(self, dt: float):
+        self._clock += dt
+        if self._spawn_queue:
+            with live_edit(self._live):
+                self._spawn_queue.drain()
+        if not self._names:
             return
-
-        t_op = car.get("t")
-        if not t_op:
+        x = self.start_x + self._dir * self._distances(self._clock)
+        if self._inst is not None:
+            self._inst_pos[:, 0] = x
+            with live_edit(self._live):
+                self._inst.GetPositionsAttr().Set(Vt.Vec3fArray.FromNumpy(self._inst_pos))
             return
-
-        # 안전하게 get/set
-        try:
-            pos = t_op.Get()
-        except Exception:
-            # prim 이 무효해졌으면 제거
-            print(f"[LineCar] remove invalid car: {name}")
-            self._cars.pop(name, None)
-            return
-
-        if pos is None:
-            pos = Gf.Vec3d(self.start_x, self.lane_y, self.lane_z)
-
-        pos[0] += self._speed_signed * dt
-        t_op.Set(pos)
-
-        # 끝점 체크
-        reached = (pos[0] >= self.end_x) if self._dir > 0 else (pos[0] <= self.end_x)
-        if reached:
-            if self.mode == "loop":
-                # 시작점 뒤쪽으로 보냄(간격 유지)
-                pos[0] = self.start_x - self._dir * self.spacing
-                t_op.Set(pos)
-            else:  # respawn
-                if self.respawn_delay > 0:
-                    car["dead_until"] = now + self.respawn_delay
-                t_op.Set(Gf.Vec3d(self.start_x, self.lane_y, self.lane_z))
-
-    def _update(self, dt: float):
-        now = time.perf_counter()
-        for name in list(self._cars.keys()):
-            self._step_car(name, dt, now)
+        y, z, rot = self.lane_y, self.lane_z, self._rot
+        put = self._xbatch.put
+        for name, xi in zip(self._names, x.tolist()):
+            put(name, (xi, y, z), rot)
+        with live_edit(self._live):
+            self._xbatch.flush()
 
     # ───────── start/stop
     def start(self):
-        self.spawn_many()
+        with live_edit(self._live):
+            self.spawn_many()
         app = kit_app.get_app()
         stream = app.get_update_event_stream()
         self._sub = stream.create_subscription_to_pop(self._on_update, name=f"linecar_update_{self.parent_path}")
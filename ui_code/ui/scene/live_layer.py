@@ -0,0 +1,75 @@
+# live_layer.py — 라이브 트윈 기록 전용 익명 session sublayer(pxr 전용, omni 의존 없음)
+# - 확장 시작 시 Sdf.Layer.CreateAnonymous 로 만들어 stage 의 session layer 맨 앞 sublayer 로 끼움
+# - AMR/라인카 transform 처럼 매 프레임 바뀌는 값은 edit() 컨텍스트 안에서 이 레이어에만 기록
+#   → 루트(공장 씬) 레이어는 dirty 되지 않고, 변경 알림/undo 추적도 작은 레이어 하나로 한정
+# - 종료 시 release_live_layer() 로 sublayer 목록에서 빼고 내용 비움(저장되지 않음)
+
+import contextlib
+from typing import Optional
+
+from pxr import Sdf, Usd
+
+
+class LiveLayer:
+    def __init__(self, stage: Usd.Stage, tag: str = "live_twin"):
+        self._stage = stage
+        self.layer = Sdf.Layer.CreateAnonymous(tag)
+        session = stage.GetSessionLayer()
+        # session sublayer 중 가장 강하게(앞쪽) — 다른 session 편집보다 라이브 값이 우선
+        session.subLayerPaths.insert(0, self.layer.identifier)
+        self.edit_target = stage.GetEditTargetForLocalLayer(self.layer)
+        print(f"[LiveLayer] attached {self.layer.identifier}")
+
+    @property
+    def stage(self) -> Usd.Stage:
+        return self._stage
+
+    def edit(self) -> Usd.EditContext:
+        """with live.edit(): ... — 블록 안의 Usd API 기록을 라이브 레이어로."""
+        return Usd.EditContext(self._stage, self.edit_target)
+
+    def destroy(self):
+        layer, self.layer = self.layer, None
+        if layer is None:
+            return
+        try:
+            session = self._stage.GetSessionLayer() if self._stage else None
+            if session is not None:
+                paths = session.subLayerPaths
+                if layer.identifier in paths:
+                    paths.remove(layer.identifier)
+        except Exception as e:
+            print("[LiveLayer] detach failed:", e)
+        try:
+            layer.Clear()
+        except Exception:
+            pass
+        self._stage = None
+        print("[LiveLayer] released")
+
+
+# ───────────────────────── shared instance ─────────────────────────
+_live: Optional[LiveLayer] = None
+
+
+def get_live_layer(stage: Usd.Stage) -> LiveLayer:
+    """stage 당 하나의 라이브 레이어(없거나 stage 가 바뀌었으면 새로 만든다)."""
+    global _live
+    if _live is not None and (_live.layer is None or _live.stage != stage):
+        _live.destroy()
+        _live = None
+    if _live is None:
+        _live = LiveLayer(stage)
+    return _live
+
+
+def release_live_layer():
+    global _live
+    if _live is not None:
+        _live.destroy()
+        _live = None
+
+
+def live_edit(live: Optional[LiveLayer]):
+    """live 가 없으면(초기화 전 등) 현재 edit target 그대로."""
+    return live.edit() if live is not None and live.layer is not None else contextlib.nullcontext()
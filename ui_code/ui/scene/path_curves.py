@@ -0,0 +1,190 @@
+# path_curves.py — 로봇 궤적(trail) + 계획 경로를 UsdGeom.BasisCurves 1개로 렌더링(pxr + NumPy, omni 의존 없음)
+# - 행(row) 번호는 호출 측(FleetState) 행을 그대로 사용
+# - trail: 행마다 고정 길이 ring buffer(최근 trail_len 점), 계획 경로: 행마다 최대 plan_len 점
+#   → 메모리 상한 = 행 수 × (trail_len + plan_len) × 3 float32
+# - flush() 는 바뀐 게 있을 때만 points/curveVertexCounts/extent(+색) 를 Sdf.ChangeBlock 1회로 기록
+#   (spec 은 생성 시점 edit target 레이어에서 1회 조회 — 라이브 레이어 안에서 만들 것)
+
+from typing import Optional, Tuple
+
+import numpy as np
+from pxr import Gf, Sdf, Usd, UsdGeom, Vt
+
+Color = Tuple[float, float, float]
+
+
+class PathCurves:
+    def __init__(self, stage: Usd.Stage, path: str, *, trail_len: int = 64, plan_len: int = 32,
+                 min_step: float = 0.0, width: float = 1.0,
+                 trail_color: Color = (0.2, 0.8, 1.0), plan_color: Color = (1.0, 0.75, 0.1),
+                 capacity: int = 64):
+        self._stage = stage
+        self.path = path
+        self.trail_len = max(2, int(trail_len))
+        self.plan_len = max(2, int(plan_len))
+        self.min_step = float(min_step)
+        self._trail_color = Gf.Vec3f(*trail_color)
+        self._plan_color = Gf.Vec3f(*plan_color)
+
+        curves = UsdGeom.BasisCurves.Define(stage, path)
+        curves.CreateTypeAttr(UsdGeom.Tokens.linear)
+        curves.CreateWrapAttr(UsdGeom.Tokens.nonperiodic)
+        curves.CreateWidthsAttr(Vt.FloatArray([float(width)]))
+        curves.SetWidthsInterpolation(UsdGeom.Tokens.constant)
+        attrs = (
+            curves.CreatePointsAttr(Vt.Vec3fArray()),
+            curves.CreateCurveVertexCountsAttr(Vt.IntArray()),
+            curves.CreateExtentAttr(Vt.Vec3fArray([Gf.Vec3f(0.0), Gf.Vec3f(0.0)])),
+            curves.CreateDisplayColorPrimvar(UsdGeom.Tokens.uniform).GetAttr(),
+        )
+        attrs[3].Set(Vt.Vec3fArray())
+        self._curves = curves
+        self._attrs = attrs
+        et = stage.GetEditTarget()
+        layer = et.GetLayer()
+        specs = [layer.GetAttributeAtPath(et.MapToSpecPath(a.GetPath())) for a in attrs]
+        self._specs = None if any(s is None for s in specs) else specs
+
+        cap = max(1, int(capacity))
+        self._tr = np.zeros((cap, self.trail_len, 3), dtype=np.float32)
+        self._head = np.zeros(cap, dtype=np.int64)
+        self._cnt = np.zeros(cap, dtype=np.int64)
+        self._pl = np.zeros((cap, self.plan_len, 3), dtype=np.float32)
+        self._pn = np.zeros(cap, dtype=np.int64)
+
+        self.show_trails = True
+        self.show_plans = True
+        self._layout: Optional[Tuple[int, int]] = None   # 마지막으로 기록한 (trail 수, plan 수) → 색 배열 재기록 판단
+        self._dirty = False
+
+    # ───────────────────────── rows ─────────────────────────
+    def _grow(self, need: int):
+        cap = len(self._head)
+        if need <= cap:
+            return
+        new = max(need, cap * 2)
+
+        def _ext(a: np.ndarray):
+            b = np.zeros((new,) + a.shape[1:], dtype=a.dtype)
+            b[:cap] = a
+            return b
+
+        self._tr, self._head, self._cnt = _ext(self._tr), _ext(self._head), _ext(self._cnt)
+        self._pl, self._pn = _ext(self._pl), _ext(self._pn)
+
+    def clear_row(self, row: int):
+        if row < len(self._head) and (self._cnt[row] or self._pn[row]):
+            self._cnt[row] = self._head[row] = self._pn[row] = 0
+            self._dirty = True
+
+    def clear(self):
+        self._cnt[:] = self._head[:] = self._pn[:] = 0
+        self._dirty = True
+
+    def set_visible(self, trails: bool, plans: bool):
+        if (bool(trails), bool(plans)) != (self.show_trails, self.show_plans):
+            self.show_trails, self.show_plans = bool(trails), bool(plans)
+            self._dirty = True
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    # ───────────────────────── data ─────────────────────────
+    def push(self, rows: np.ndarray, pts: np.ndarray):
+        """trail 에 현재 위치 추가(벡터화). 마지막 점과 min_step 이내면 건너뜀."""
+        if len(rows) == 0:
+            return
+        self._grow(int(rows.max()) + 1)
+        n = self.trail_len
+        last = self._tr[rows, (self._head[rows] - 1) % n]
+        d = pts - last
+        far = (np.einsum("ij,ij->i", d, d) > self.min_step * self.min_step) | (self._cnt[rows] == 0)
+        if not far.any():
+            return
+        rows, pts = rows[far], pts[far]
+        h = self._head[rows]
+        self._tr[rows, h] = pts
+        self._head[rows] = (h + 1) % n
+        self._cnt[rows] = np.minimum(self._cnt[rows] + 1, n)
+        if self.show_trails:
+            self._dirty = True
+
+    def set_plan(self, row: int, pts: np.ndarray):
+        """계획 경로(스테이지 좌표 (K,3)). plan_len 초과분은 잘라냄."""
+        self._grow(row + 1)
+        k = min(len(pts), self.plan_len)
+        if k:
+            self._pl[row, :k] = pts[:k]
+        self._pn[row] = k
+        self._dirty = True
+
+    # ───────────────────────── write ─────────────────────────
+    def _gather_trails(self):
+        rows = np.flatnonzero(self._cnt >= 2)
+        if len(rows) == 0:
+            return None, None
+        n = self.trail_len
+        cnt = self._cnt[rows]
+        k = np.arange(n)
+        # 오래된 점부터: (head - cnt + k) % n, k < cnt
+        order = (self._head[rows, None] - cnt[:, None] + k) % n + rows[:, None] * n
+        flat = order[k < cnt[:, None]]
+        return self._tr.reshape(-1, 3)[flat], cnt
+
+    def _gather_plans(self):
+        rows = np.flatnonzero(self._pn >= 2)
+        if len(rows) == 0:
+            return None, None
+        pn = self._pn[rows]
+        m = self.plan_len
+        k = np.arange(m)
+        flat = (rows[:, None] * m + k)[k < pn[:, None]]
+        return self._pl.reshape(-1, 3)[flat], pn
+
+    def flush(self):
+        if not self._dirty:
+            return
+        self._dirty = False
+        parts, counts = [], []
+        n_tr = n_pl = 0
+        if self.show_trails:
+            p, c = self._gather_trails()
+            if p is not None:
+                parts.append(p); counts.append(c); n_tr = len(c)
+        if self.show_plans:
+            p, c = self._gather_plans()
+            if p is not None:
+                parts.append(p); counts.append(c); n_pl = len(c)
+
+        pts = np.concatenate(parts).astype(np.float32, copy=False) if parts else np.zeros((0, 3), np.float32)
+        cnts = np.concatenate(counts).astype(np.int32) if counts else np.zeros(0, np.int32)
+        if len(pts):
+            ext = Vt.Vec3fArray([Gf.Vec3f(*pts.min(axis=0).tolist()), Gf.Vec3f(*pts.max(axis=0).tolist())])
+        else:
+            ext = Vt.Vec3fArray([Gf.Vec3f(0.0), Gf.Vec3f(0.0)])
+        values = [Vt.Vec3fArray.FromNumpy(pts), Vt.IntArray.FromNumpy(cnts), ext]
+        layout = (n_tr, n_pl)
+        if layout != self._layout:
+            values.append(Vt.Vec3fArray([self._trail_color] * n_tr + [self._plan_color] * n_pl))
+            self._layout = layout
+
+        specs = self._specs
+        if specs is not None:
+            try:
+                with Sdf.ChangeBlock():
+                    for spec, v in zip(specs, values):
+                        spec.default = v
+                return
+            except Exception:   # 만료된 spec(레이어 정리 등) → Usd API 경로
+                self._specs = None
+        for attr, v in zip(self._attrs, values):
+            attr.Set(v)
+
+    def destroy(self):
+        try:
+            if self._stage and self._stage.GetPrimAtPath(self.path):
+                self._stage.RemovePrim(self.path)
+        except Exception as e:
+            print("[PathCurves] destroy failed:", e)
+        self._specs = None
@@ -0,0 +1,95 @@
+# spawn_queue.py — prim 생성/레퍼런스 로드를 프레임 예산 안에서 나눠 처리(omni/pxr 의존 없음)
+# - push() 로 키를 쌓고, 매 프레임 drain() 이 budget_ms 안에서 spawn_fn(key) 호출(최소 1개는 처리)
+# - 비었다가 다시 쌓이기 시작한 묶음 단위로 진행률(done/total) 집계 → progress / on_progress
+# - spawn_fn 은 같은 키가 두 번 와도 안전해야 함(중복 제거 안 함: 선택 로봇 앞당기기 등)
+# - 편집 대상(라이브 레이어 등)은 호출 측이 drain() 을 감싸서 지정
+
+import time
+from collections import deque
+from typing import Callable, Hashable, Iterable, Optional, Tuple
+
+_PROGRESS_LOG_S = 1.0   # 진행 로그 간격
+
+
+class SpawnQueue:
+    def __init__(self, spawn_fn: Callable[[Hashable], None], *, budget_ms: float = 4.0, name: str = "Spawn",
+                 log_min: int = 20, on_progress: Optional[Callable[[int, int], None]] = None):
+        self._spawn_fn = spawn_fn
+        self.budget_ms = float(budget_ms)
+        self.name = name
+        self.log_min = int(log_min)          # 이 개수 이상인 묶음만 진행/완료 로그
+        self.on_progress = on_progress       # (done, total) — drain 후 바뀌었을 때만
+
+        self._q: deque = deque()
+        self._done = 0
+        self._total = 0
+        self._frames = 0
+        self._t0 = 0.0
+        self._next_log = 0.0
+
+    # ───────────────────────── queue ─────────────────────────
+    def push(self, key: Hashable, *, front: bool = False):
+        if not self._q and self._done >= self._total:
+            self._done = self._total = self._frames = 0
+            self._t0 = time.perf_counter()
+            self._next_log = self._t0 + _PROGRESS_LOG_S
+        if front:
+            self._q.appendleft(key)
+        else:
+            self._q.append(key)
+        self._total += 1
+
+    def extend(self, keys: Iterable[Hashable]):
+        for k in keys:
+            self.push(k)
+
+    def clear(self):
+        self._q.clear()
+        self._done = self._total = self._frames = 0
+
+    def __len__(self) -> int:
+        return len(self._q)
+
+    def __bool__(self) -> bool:
+        return bool(self._q)
+
+    @property
+    def progress(self) -> Tuple[int, int]:
+        """현재 묶음 (처리 수, 전체 수). 대기 중인 게 없으면 (0, 0)."""
+        return (self._done, self._total) if self._q else (0, 0)
+
+    # ───────────────────────── drain ─────────────────────────
+    def drain(self) -> int:
+        """budget_ms 안에서 처리. 이번 프레임 처리 개수 반환."""
+        q = self._q
+        if not q:
+            return 0
+        now = time.perf_counter()
+        deadline = now + self.budget_ms / 1000.0
+        n = 0
+        while q:
+            key = q.popleft()
+            try:
+                self._spawn_fn(key)
+            except Exception as e:
+                print(f"[{self.name}] spawn failed for {key}: {e}")
+            n += 1
+            if time.perf_counter() >= deadline:
+                break
+        self._done += n
+        self._frames += 1
+
+        if self.on_progress is not None:
+            try:
+                self.on_progress(*self.progress)
+            except Exception as e:
+                print(f"[{self.name}] progress callback failed: {e}")
+        if self._total >= self.log_min:
+            now = time.perf_counter()
+            if not q:
+                print(f"[{self.name}] spawned {self._total} in {(now - self._t0) * 1000:.0f} ms "
+                      f"over {self._frames} frames")
+            elif now >= self._next_log:
+                self._next_log = now + _PROGRESS_LOG_S
+                print(f"[{self.name}] spawning {self._done}/{self._total}")
+        return n
@@ -0,0 +1,176 @@
+# xform_batch.py — 프레임 단위 xformOp 일괄 기록(pxr 전용, omni 의존 없음)
+# - put() 은 값만 모으고, flush() 가 편집 레이어의 attribute spec 에 Sdf.ChangeBlock 1회로 기록
+#   (op.Set 마다 나가던 개별 변경 알림/Usd 값 해석 경로 제거, spec 핸들은 bind 시 1회 조회)
+# - 마지막으로 기록한 값과 eps 이내면 큐에 넣지 않음 → 정지한 로봇은 비용 0
+# - edit_target 을 주면(라이브 session sublayer 등) spec 조회/대체 기록 모두 그 레이어로
+# - 헤드리스 벤치마크:  python ui_code/ui/scene/xform_batch.py [N ...]
+
+import contextlib
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pxr import Gf, Sdf, Usd, UsdGeom
+
+Vec3 = Tuple[float, float, float]
+
+
+class XformBatch:
+    def __init__(self, stage: Usd.Stage, *, pos_eps: float = 1e-4, rot_eps_deg: float = 1e-3,
+                 edit_target: Optional[Usd.EditTarget] = None):
+        self._stage = stage
+        self._edit_target = edit_target
+        self.pos_eps = float(pos_eps)
+        self.rot_eps = float(rot_eps_deg)
+
+        # key -> (t_op, r_op, t_spec, r_spec)   spec 이 없으면 None → Usd API 경로
+        self._ops: Dict[str, Tuple] = {}
+        self._written: Dict[str, Tuple[Vec3, Vec3]] = {}
+        self._queue: Dict[str, Tuple[Vec3, Vec3]] = {}
+        self.stats = {"written": 0, "skipped": 0, "fallback": 0}
+
+    # ───────────────────────── binding ─────────────────────────
+    def bind(self, key: str, t_op: UsdGeom.XformOp, r_op: UsdGeom.XformOp):
+        et = self._edit_target or self._stage.GetEditTarget()
+        layer = et.GetLayer()
+        t_spec = layer.GetAttributeAtPath(et.MapToSpecPath(t_op.GetAttr().GetPath()))
+        r_spec = layer.GetAttributeAtPath(et.MapToSpecPath(r_op.GetAttr().GetPath()))
+        if t_spec is None or r_spec is None:
+            t_spec = r_spec = None
+        self._ops[key] = (t_op, r_op, t_spec, r_spec)
+        self._written.pop(key, None)
+
+    def unbind(self, key: str):
+        self._ops.pop(key, None)
+        self._written.pop(key, None)
+        self._queue.pop(key, None)
+
+    def clear(self):
+        self._ops.clear()
+        self._written.clear()
+        self._queue.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._ops
+
+    # ───────────────────────── staging ─────────────────────────
+    def put(self, key: str, t: Vec3, r: Vec3) -> bool:
+        """이번 프레임 값 예약. 마지막 기록값과 eps 이내면 False(건너뜀)."""
+        if key not in self._ops:
+            return False
+        prev = self._written.get(key)
+        if prev is not None:
+            pt, pr = prev
+            pe, re_ = self.pos_eps, self.rot_eps
+            if (abs(t[0] - pt[0]) <= pe and abs(t[1] - pt[1]) <= pe and abs(t[2] - pt[2]) <= pe
+                    and abs(r[0] - pr[0]) <= re_ and abs(r[1] - pr[1]) <= re_ and abs(r[2] - pr[2]) <= re_):
+                self.stats["skipped"] += 1
+                return False
+        self._queue[key] = (t, r)
+        return True
+
+    def flush(self) -> int:
+        """예약된 값을 한 번의 변경 블록으로 기록. 기록한 개수 반환."""
+        if not self._queue:
+            return 0
+        queue, self._queue = self._queue, {}
+        missing: List[str] = []
+        Vec3d = Gf.Vec3d
+
+        with Sdf.ChangeBlock():
+            for key, (t, r) in queue.items():
+                _, _, t_spec, r_spec = self._ops[key]
+                if t_spec is None:
+                    missing.append(key)
+                    continue
+                try:
+                    t_spec.default = Vec3d(t[0], t[1], t[2])
+                    r_spec.default = Vec3d(r[0], r[1], r[2])
+                except Exception:   # 만료된 spec(prim 재생성 등)
+                    missing.append(key)
+                    continue
+                self._written[key] = (t, r)
+
+        # spec 이 편집 레이어에 없으면(다른 레이어에서 authored 등) Usd API 로 기록 — ChangeBlock 밖에서
+        if missing:
+            ctx = (Usd.EditContext(self._stage, self._edit_target) if self._edit_target
+                   else contextlib.nullcontext())
+            with ctx:
+                for key in missing:
+                    t_op, r_op, _, _ = self._ops[key]
+                    t, r = queue[key]
+                    t_op.Set(Gf.Vec3d(*t))
+                    r_op.Set(Gf.Vec3d(*r))
+                    self._written[key] = (t, r)
+        self.stats["fallback"] += len(missing)
+        self.stats["written"] += len(queue)
+        return len(queue)
+
+
+# ───────────────────────── benchmark ─────────────────────────
+def _make_stage(n: int):
+    stage = Usd.Stage.CreateInMemory()
+    UsdGeom.SetStageUpAxis(stage, UsdGeom.Tokens.z)
+    ops = []
+    with Sdf.ChangeBlock():
+        for i in range(n):
+            Sdf.CreatePrimInLayer(stage.GetRootLayer(), f"/World/AMRs/AMR_{i}").specifier = Sdf.SpecifierDef
+    for i in range(n):
+        xf = UsdGeom.Xformable(stage.GetPrimAtPath(f"/World/AMRs/AMR_{i}"))
+        t_op, r_op = xf.AddTranslateOp(), xf.AddRotateXYZOp()
+        t_op.Set(Gf.Vec3d(0.0, 0.0, 0.0))
+        r_op.Set(Gf.Vec3d(90.0, 0.0, 0.0))
+        ops.append((t_op, r_op))
+    return stage, ops
+
+
+def benchmark(sizes: Iterable[int] = (100, 1000, 5000), frames: int = 30,
+              moving_ratio: float = 1.0) -> Dict[int, Dict[str, float]]:
+    """
+    In-memory stage 에서 프레임당 비용(ms) 비교.
+      per_op   : 기존 방식(op.Set ×2, 로봇마다 Gf.Vec3d 생성)
+      batched  : XformBatch.put + flush
+      idle     : 모든 로봇 정지(eps 스킵 경로)
+    """
+    out: Dict[int, Dict[str, float]] = {}
+    for n in sizes:
+        moving = max(1, int(n * moving_ratio))
+
+        stage, ops = _make_stage(n)
+        t0 = time.perf_counter()
+        for f in range(frames):
+            for i in range(moving):
+                t_op, r_op = ops[i]
+                r_op.Set(Gf.Vec3d(90.0, 0.0, float(f)))
+                t_op.Set(Gf.Vec3d(i + f * 0.01, f * 0.01, 0.0))
+        per_op = (time.perf_counter() - t0) * 1000.0 / frames
+
+        stage, ops = _make_stage(n)
+        batch = XformBatch(stage)
+        for i, (t_op, r_op) in enumerate(ops):
+            batch.bind(str(i), t_op, r_op)
+        t0 = time.perf_counter()
+        for f in range(frames):
+            for i in range(moving):
+                batch.put(str(i), (i + f * 0.01, f * 0.01, 0.0), (90.0, 0.0, float(f)))
+            batch.flush()
+        batched = (time.perf_counter() - t0) * 1000.0 / frames
+
+        t0 = time.perf_counter()
+        for _ in range(frames):
+            for i in range(n):
+                batch.put(str(i), (i + (frames - 1) * 0.01, (frames - 1) * 0.01, 0.0), (90.0, 0.0, float(frames - 1)))
+            batch.flush()
+        idle = (time.perf_counter() - t0) * 1000.0 / frames
+
+        res = {"per_op": per_op, "batched": batched, "idle": idle,
+               "speedup": per_op / batched if batched > 0 else float("inf")}
+        out[n] = res
+        print(f"[XformBatch][bench] n={n} moving={moving} "
+              + " ".join(f"{k}={v:.2f}{'x' if k == 'speedup' else 'ms'}" for k, v in res.items()))
+    return out
+
+
+if __name__ == "__main__":
+    import sys
+    _sizes = [int(a) for a in sys.argv[1:]] or [100, 1000, 5000]
+    benchmark(_sizes)
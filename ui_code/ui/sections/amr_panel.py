@@ -1,6 +1,7 @@
 # amr_panel.py
 import omni.ui as ui
 from ui_code.ui.utils.common import _fill
+from ui_code.ui.components.amr_list import VirtualAmrList
 
 
 def build_amr_panel(self):
@@ -10,7 +11,6 @@ def build_amr_panel(self):
         flags=ui.WINDOW_FLAGS_NO_RESIZE | ui.WINDOW_FLAGS_NO_MOVE | ui.WINDOW_FLAGS_NO_COLLAPSE
     )
 
-    self._amr_cards = {}
 
     with self._amr_win.frame:
         # 전체를 HStack으로 깔고 왼쪽만 고정 폭
@@ -22,8 +22,13 @@ def build_amr_panel(self):
                     width=_fill()
                 ) as sf:
                     self._amr_scroll = sf
-                    with ui.VStack(spacing=8, width=_fill()) as v:
-                        self._amr_list_stack = v
+                    # 보이는 행만 카드 생성 + 스크롤 시 재활용
+                    self._amr_list = VirtualAmrList(
+                        sf,
+                        on_plus=self._open_amr_panel,
+                        resolver=lambda rid: self._amr_latest.get(str(rid)),
+                    )
+                    self._amr_list_stack = self._amr_list.stack
 
             # 오른쪽은 Spacer로 채워서 폭 고정
             ui.Spacer(width=_fill())
@@ -81,7 +81,14 @@ def build_bottom_bar(self):
 
             return pts
 
+        def _on_node_picked(label: str):
+            # 미니맵에서 노드 클릭 → AMR Control 이 열려 있으면 Target Node 채움
+            panel = getattr(self, "_amr_control_panel", None)
+            if panel is not None:
+                panel.set_target_node(label)
+
         self._pathfinder_panel.set_robot_resolver(_resolve_from_cache)
+        self._pathfinder_panel.set_node_pick_handler(_on_node_picked)
         self._pathfinder_panel.show()
 
     def _open_bodydata_panel():
@@ -1,7 +1,7 @@
-import math
-import numpy as np
 import omni.ui as ui
 from ui_code.ui.utils.common import _fill
+from ui_code.ui.components.donut_chart import DonutRenderer
+from ui_code.ui.components.sparkline import Sparkline
 
 _FIELD_STYLE = {
     "color": 0xFFFFFFFF,
@@ -21,6 +21,26 @@ _COLORS       = [
 ]
 _TRACK_RGBA   = (160, 160, 160, 140)  # 회색 트랙
 
+# 추세 차트(최근 10분, 2초 슬롯) — (키, 표시 이름, RGBA)
+_TREND_WINDOW_S = 600.0
+_TREND_RES_S    = 2.0
+_TRENDS = [
+    ("m_amr_total",         "AMR Total",     (255, 255, 255, 255)),
+    ("m_amr_working",       "Working",       (255, 170, 0, 255)),
+    ("m_amr_waiting",       "Waiting",       (0, 123, 255, 255)),
+    ("m_amr_charging",      "Charging",      (0, 204, 102, 255)),
+    ("amr_battery_avg",     "Battery Avg %", (120, 220, 120, 255)),
+    ("m_pallet_total",      "Pallet Total",  (255, 255, 255, 255)),
+    ("m_pallet_offmap",     "Off Map",       (204, 204, 204, 255)),
+    ("m_pallet_stationary", "Stationary",    (255, 170, 0, 255)),
+    ("m_pallet_inhandling", "In Handling",   (0, 123, 255, 255)),
+    ("m_mission_total",     "Mission Total", (255, 255, 255, 255)),
+    ("m_mission_working",   "M. Working",    (255, 170, 0, 255)),
+    ("m_mission_waiting",   "M. Waiting",    (0, 123, 255, 255)),
+    ("m_mission_reserved",  "Reserved",      (0, 204, 102, 255)),
+    ("mission_throughput",  "Done / h",      (255, 120, 200, 255)),
+]
+
 def build_status_panel(self):
     self._status_win = ui.Window(
         "Status Panel",
@@ -41,6 +61,9 @@ def build_status_panel(self):
 
                     ui.Label("AMR Status", style={"font_size": 14, "color": 0xFFFFFFFF},
                              word_wrap=True, width=_fill())
+                    # 대량 spawn 진행률(끝나면 숨김, __init__._update_spawn_progress 가 갱신)
+                    self._amr_spawn_label = ui.Label("", visible=False, width=_fill(),
+                                                     style={"font_size": 12, "color": 0xFFAAAAAA})
 
                     with ui.HStack(spacing=8, width=_fill()):
                         with ui.ZStack(width=_DONUT_SIZE, height=_DONUT_SIZE):
@@ -72,78 +95,25 @@ def build_status_panel(self):
                         except Exception:
                             return 0
 
-                    def _upload(provider: ui.ByteImageProvider, img: np.ndarray, w: int, h: int):
-                        arr = np.ascontiguousarray(img, dtype=np.uint8).reshape(-1)
-                        size = [w, h]
-                        try:
-                            fmt = ui.ByteImageProvider.Format.RGBA8_UNORM
-                            provider.set_bytes_data(arr.tolist(), size, fmt)
-                        except Exception:
-                            try:
-                                provider.set_bytes_data(arr.tolist(), size)
-                            except Exception as e:
-                                print("[Donut] set_bytes_data failed:", e)
-
-                    def _draw_donut(total: int, working: int, waiting: int, charging: int):
-                        if self._amr_donut_center_label:
-                            self._amr_donut_center_label.text = str(int(waiting)+int(charging)+int(working))
-
-                        s = max(working, 0) + max(waiting, 0) + max(charging, 0)
-                        ratios = [0.0, 0.0, 0.0] if s == 0 else [working/s, waiting/s, charging/s]
-
-                        w = h = _DONUT_SIZE
-                        img = np.zeros((h, w, 4), dtype=np.uint8)
-                        cx, cy = (w - 1) * 0.5, (h - 1) * 0.5
-                        outer_r = min(w, h) * 0.5
-                        inner_r = outer_r * _INNER_RATIO
-                        outer_r2, inner_r2 = outer_r * outer_r, inner_r * inner_r
-
-                        for y in range(h):
-                            dy = y - cy
-                            for x in range(w):
-                                dx = x - cx
-                                d2 = dx * dx + dy * dy
-                                if inner_r2 < d2 < outer_r2:
-                                    img[y, x, :4] = _TRACK_RGBA
-
-                        start = 0.0
-                        segs = []
-                        for i, r in enumerate(ratios):
-                            ang = 360.0 * float(r)
-                            end = start + max(0.0, ang - _GAP_DEG)
-                            if ang > 0.0:
-                                segs.append((start, end, _COLORS[i % len(_COLORS)]))
-                            start += ang
-
-                        for y in range(h):
-                            dy = y - cy
-                            for x in range(w):
-                                dx = x - cx
-                                d2 = dx * dx + dy * dy
-                                if not (inner_r2 < d2 < outer_r2):
-                                    continue
-                                ang = (math.degrees(math.atan2(dy, dx)) + 360.0) % 360.0
-                                for a0, a1, col in segs:
-                                    if a0 <= ang <= a1:
-                                        img[y, x, 0] = col[0]
-                                        img[y, x, 1] = col[1]
-                                        img[y, x, 2] = col[2]
-                                        img[y, x, 3] = col[3]
-                                        break
-
-                        _upload(self._amr_donut_provider, img, w, h)
+                    # 도넛: 모델 4개가 같은 프레임에 바뀌어도 그리기는 프레임당 1회
+                    self._amr_donut = DonutRenderer(
+                        self._amr_donut_provider,
+                        size=_DONUT_SIZE, inner_ratio=_INNER_RATIO, gap_deg=_GAP_DEG,
+                        colors=_COLORS, track_rgba=_TRACK_RGBA,
+                        center_label=self._amr_donut_center_label,
+                    )
 
                     def _refresh_from_models(_=None):
-                        total = _parse_num(self.m_amr_total)
-                        work  = _parse_num(self.m_amr_working)
-                        wait  = _parse_num(self.m_amr_waiting)
-                        chg   = _parse_num(self.m_amr_charging)
-                        _draw_donut(total, work, wait, chg)
+                        work  = max(_parse_num(self.m_amr_working), 0)
+                        wait  = max(_parse_num(self.m_amr_waiting), 0)
+                        chg   = max(_parse_num(self.m_amr_charging), 0)
+                        s = work + wait + chg
+                        ratios = (0.0, 0.0, 0.0) if s == 0 else (work / s, wait / s, chg / s)
+                        self._amr_donut.request(ratios, center_text=str(s))
 
                     for m in (self.m_amr_total, self.m_amr_working, self.m_amr_waiting, self.m_amr_charging):
                         m.add_value_changed_fn(_refresh_from_models)
 
-                    _draw_donut(total=5, working=0, waiting=3, charging=1)
                     _refresh_from_models()
 
                     ui.Separator(height=1)
@@ -182,6 +152,25 @@ def build_status_panel(self):
 
                     ui.Separator(height=1, width=_fill())
 
+                    # ───────── Trends (최근 10분) ─────────
+                    ui.Label("Trends (10 min)", style={"font_size": 16, "color": 0xFFFFFFFF}, word_wrap=True, width=_fill())
+                    self._sparklines = {}
+                    self._sparkline_values = {}
+                    with ui.VStack(spacing=2, width=_fill()):
+                        for key, title, col in _TRENDS:
+                            with ui.HStack(spacing=6, width=_fill(), height=18):
+                                ui.Label(title, width=90, style={"font_size": 10, "color": 0xFFCCCCCC})
+                                self._sparklines[key] = Sparkline(
+                                    width=150, height=18,
+                                    window_s=_TREND_WINDOW_S, resolution_s=_TREND_RES_S, color=col,
+                                )
+                                self._sparkline_values[key] = ui.Label(
+                                    "-", width=_fill(), alignment=ui.Alignment.RIGHT,
+                                    style={"font_size": 10, "color": 0xFFFFFFFF},
+                                )
+
+                    ui.Separator(height=1, width=_fill())
+
                     # ───────── Error Log ─────────
                     ui.Label("Error Log", style={"font_size": 16, "color": 0xFFFFFFFF}, word_wrap=True, width=_fill())
                     with ui.Frame(height=70, width=_fill()):
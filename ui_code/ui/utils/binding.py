@@ -0,0 +1,80 @@
+# binding.py — UI 모델/위젯 쓰기 no-op 억제
+# 마지막으로 쓴 값/스타일을 (대상, 슬롯) 단위로 기억하고 같은 값이면 set 을 건너뛴다.
+# set_value/style/text 는 값이 같아도 위젯 무효화 + value_changed 콜백(도넛 재그리기 등)을 부르므로
+# 폴링마다 같은 값을 다시 쓰는 비용을 0 에 가깝게 만든다.
+#
+# 주의: 대상 객체를 캐시에 보관하므로(id 재사용 방지) 위젯/모델을 파괴할 때는 forget() 을 호출할 것.
+
+from typing import Any, Dict, Tuple
+
+__all__ = ["set_value", "set_text", "set_style", "forget", "stats"]
+
+_last: Dict[Tuple[int, str], Tuple[Any, Any]] = {}
+_stats = {"written": 0, "suppressed": 0}
+
+
+def _same(key: Tuple[int, str], target, value) -> bool:
+    prev = _last.get(key)
+    return prev is not None and prev[0] is target and prev[1] == value
+
+
+def _remember(key: Tuple[int, str], target, value):
+    _last[key] = (target, value)
+    _stats["written"] += 1
+
+
+def set_value(model, value) -> bool:
+    """SimpleStringModel / SimpleFloatModel 등. 실제로 썼으면 True."""
+    if model is None:
+        return False
+    key = (id(model), "value")
+    if _same(key, model, value):
+        _stats["suppressed"] += 1
+        return False
+    model.set_value(value)
+    _remember(key, model, value)
+    return True
+
+
+def set_text(widget, text: str) -> bool:
+    if widget is None:
+        return False
+    key = (id(widget), "text")
+    if _same(key, widget, text):
+        _stats["suppressed"] += 1
+        return False
+    widget.text = text
+    _remember(key, widget, text)
+    return True
+
+
+def set_style(widget, style: dict) -> bool:
+    if widget is None:
+        return False
+    key = (id(widget), "style")
+    if _same(key, widget, style):
+        _stats["suppressed"] += 1
+        return False
+    try:
+        widget.set_style(style)
+    except Exception:
+        widget.style = style
+    _remember(key, widget, dict(style))
+    return True
+
+
+def forget(*targets):
+    """파괴되는 위젯/모델의 캐시 항목 제거."""
+    for t in targets:
+        if t is None:
+            continue
+        i = id(t)
+        for slot in ("value", "text", "style"):
+            prev = _last.get((i, slot))
+            if prev is not None and prev[0] is t:
+                del _last[(i, slot)]
+
+
+def stats() -> Dict[str, int]:
+    """{"written", "suppressed", "cached"} 누적 카운터."""
+    return {"written": _stats["written"], "suppressed": _stats["suppressed"], "cached": len(_last)}
@@ -0,0 +1,26 @@
+# cache.py — 확장 로컬 캐시 폴더(빌드 산출물/검사 결과 등, 지워도 다시 만들어짐)
+# - 기본: ~/.platform_ext/cache, PLATFORM_CACHE_DIR 로 변경 가능
+
+import hashlib
+import os
+
+
+def cache_dir(*sub: str) -> str:
+    root = os.getenv("PLATFORM_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".platform_ext", "cache")
+    path = os.path.join(root, *sub)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except Exception as e:
+        print(f"[Cache] cannot create {path}: {e}")
+    return path
+
+
+def file_digest(path: str, *extra, length: int = 16) -> str:
+    """파일 내용 + 추가 키(빌드 파라미터 등)의 sha1 앞부분."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    for e in extra:
+        h.update(repr(e).encode("utf-8"))
+    return h.hexdigest()[:length]
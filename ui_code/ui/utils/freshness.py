@@ -0,0 +1,228 @@
+# freshness.py — DataType / 로봇 단위 데이터 신선도(age) 추적
+#
+# 타임라인(샘플 1개 기준):
+#   server_ts(서버가 찍은 시각, 있을 때만) → recv_ts(응답 수신) → apply_ts(UI 반영) → usd_ts(USD 기록)
+# 서버 시계는 로컬과 다를 수 있으므로 요청/응답 왕복(RTT)으로 offset 을 추정한다(NTP 방식, 최소 RTT 샘플 채택).
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+__all__ = ["FreshnessTracker"]
+
+# 응답/아이템에서 서버 시각을 찾을 키 후보(서버/버전별 호환)
+_SERVER_TS_KEYS = ("serverTime", "timestamp", "timeStamp", "ts", "updateTime", "updatedAt", "time")
+
+
+def _parse_ts(v) -> Optional[float]:
+    """epoch 초/밀리초 숫자 또는 ISO8601 문자열 → epoch 초. 해석 불가면 None."""
+    if v is None or isinstance(v, bool):
+        return None
+    if isinstance(v, (int, float)):
+        t = float(v)
+    else:
+        s = str(v).strip()
+        if not s:
+            return None
+        try:
+            t = float(s)
+        except ValueError:
+            try:
+                return datetime.fromisoformat(s.replace("Z", "+00:00")).timestamp()
+            except Exception:
+                return None
+    if t <= 0:
+        return None
+    return t / 1000.0 if t > 1e11 else t  # ms → s
+
+
+def _find_ts(d) -> Optional[float]:
+    if not isinstance(d, dict):
+        return None
+    for k in _SERVER_TS_KEYS:
+        if k in d:
+            t = _parse_ts(d.get(k))
+            if t is not None:
+                return t
+    return None
+
+
+def _pct(vals: List[float], q: float) -> float:
+    if not vals:
+        return 0.0
+    s = sorted(vals)
+    i = min(len(s) - 1, max(0, int(round(q * (len(s) - 1)))))
+    return s[i]
+
+
+class _Stamp:
+    __slots__ = ("server_ts", "recv_ts", "apply_ts", "usd_ts")
+
+    def __init__(self, server_ts: Optional[float], recv_ts: float):
+        self.server_ts = server_ts
+        self.recv_ts = recv_ts
+        self.apply_ts = 0.0
+        self.usd_ts = 0.0
+
+
+class FreshnessTracker:
+    """
+    - note_request / note_response : 폴링 스레드에서 호출(송신/수신 시각 + 서버 시각)
+    - mark_applied / mark_usd_written : UI 스레드에서 호출(반영 시각)
+    - age() / robot_age() / is_stale() : 현재 화면에 표시 중인 데이터의 나이(초)
+    - report() : SLA(기본 1초) 대비 통계(p50/p95/max, 준수율)
+    """
+
+    def __init__(self, sla_s: float = 1.0, stale_s: Optional[float] = None, window: int = 512):
+        self.sla_s = float(sla_s)
+        self.stale_s = float(stale_s) if stale_s is not None else self.sla_s * 2.0
+
+        self._lock = threading.Lock()
+        self._sent: Dict[str, float] = {}                 # dataType → 마지막 송신 시각
+        self._types: Dict[str, _Stamp] = {}               # dataType → 최신 샘플
+        self._robots: Dict[str, _Stamp] = {}              # robotId → 최신 샘플
+        self._offset_samples = deque(maxlen=32)           # (rtt, offset)
+        self._offset = 0.0                                # server - local (초)
+
+        # 샘플별 "origin → apply / usd" 지연 기록(SLA 검증용)
+        self._apply_lat: Dict[str, deque] = {}
+        self._usd_lat = deque(maxlen=int(window))
+        self._window = int(window)
+
+    # ───────────────── clock ─────────────────
+    @property
+    def clock_offset(self) -> float:
+        """서버 시계 - 로컬 시계 추정치(초)."""
+        return self._offset
+
+    def _origin(self, st: _Stamp) -> float:
+        """샘플이 만들어진 시각(로컬 시계 기준). 서버 시각이 없으면 수신 시각."""
+        if st.server_ts is not None:
+            return min(st.server_ts - self._offset, st.recv_ts)
+        return st.recv_ts
+
+    def sample_time(self, item, default: float) -> float:
+        """아이템의 서버 시각을 로컬 시계로 환산(없으면 default). 수신 시각보다 미래면 default."""
+        ts = _find_ts(item)
+        if ts is None:
+            return default
+        return min(ts - self._offset, default)
+
+    def _add_offset_sample(self, sent: float, recv: float, server_ts: float):
+        rtt = max(0.0, recv - sent)
+        self._offset_samples.append((rtt, server_ts - (sent + recv) * 0.5))
+        self._offset = min(self._offset_samples)[1]
+
+    # ───────────────── 수신(폴링 스레드) ─────────────────
+    def note_request(self, data_type: str, t: Optional[float] = None):
+        if not data_type:
+            return
+        with self._lock:
+            self._sent[data_type] = time.time() if t is None else float(t)
+
+    def note_response(self, data_type: str, response: Optional[dict], items: Optional[Iterable[Any]] = None,
+                      id_of=None, t: Optional[float] = None):
+        if not data_type:
+            return
+        recv = time.time() if t is None else float(t)
+        server_ts = _find_ts(response)
+
+        with self._lock:
+            sent = self._sent.get(data_type)
+            if server_ts is not None and sent is not None and sent <= recv:
+                self._add_offset_sample(sent, recv, server_ts)
+            self._types[data_type] = _Stamp(server_ts, recv)
+
+            # 로봇 목록은 응답이 전체 스냅샷이므로 빠진 로봇은 추적에서 제외
+            if items is not None and id_of:
+                robots: Dict[str, _Stamp] = {}
+                for it in items:
+                    try:
+                        rid = id_of(it)
+                    except Exception:
+                        rid = None
+                    if not rid:
+                        continue
+                    ts = _find_ts(it)
+                    robots[str(rid)] = _Stamp(ts if ts is not None else server_ts, recv)
+                self._robots = robots
+
+    # ───────────────── 반영(UI 스레드) ─────────────────
+    def mark_applied(self, data_type: str, ids: Optional[Iterable[str]] = None):
+        now = time.time()
+        with self._lock:
+            st = self._types.get(data_type)
+            if st is None or st.apply_ts >= st.recv_ts:
+                return
+            st.apply_ts = now
+            lat = self._apply_lat.get(data_type)
+            if lat is None:
+                lat = self._apply_lat[data_type] = deque(maxlen=self._window)
+            lat.append(now - self._origin(st))
+            for rid in (ids or ()):
+                rs = self._robots.get(str(rid))
+                if rs is not None:
+                    rs.apply_ts = now
+
+    def mark_usd_written(self, ids: Iterable[str]):
+        now = time.time()
+        with self._lock:
+            for rid in ids:
+                rs = self._robots.get(str(rid))
+                if rs is None or rs.usd_ts >= rs.recv_ts:
+                    continue
+                rs.usd_ts = now
+                self._usd_lat.append(now - self._origin(rs))
+
+    def forget(self, ids: Iterable[str]):
+        with self._lock:
+            for rid in ids:
+                self._robots.pop(str(rid), None)
+
+    # ───────────────── 조회 ─────────────────
+    def age(self, data_type: str, now: Optional[float] = None) -> Optional[float]:
+        """현재 표시 중인 data_type 데이터의 나이(초). 아직 반영된 적 없으면 None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            st = self._types.get(data_type)
+            if st is None:
+                return None
+            return max(0.0, now - self._origin(st))
+
+    def robot_age(self, rid: str, now: Optional[float] = None) -> Optional[float]:
+        now = time.time() if now is None else now
+        with self._lock:
+            st = self._robots.get(str(rid))
+            if st is None:
+                return None
+            return max(0.0, now - self._origin(st))
+
+    def is_stale(self, rid: str, now: Optional[float] = None) -> bool:
+        a = self.robot_age(rid, now)
+        return a is None or a > self.stale_s
+
+    def stale_ids(self, now: Optional[float] = None) -> set:
+        now = time.time() if now is None else now
+        with self._lock:
+            return {rid for rid, st in self._robots.items() if (now - self._origin(st)) > self.stale_s}
+
+    def report(self) -> Dict[str, Any]:
+        """SLA 검증용 요약. {dataType: {p50,p95,max,within_sla,n}, "usd": {...}, "clock_offset": s}"""
+        def _summ(vals: List[float]) -> Dict[str, float]:
+            n = len(vals)
+            ok = sum(1 for v in vals if v <= self.sla_s)
+            return {
+                "n": n,
+                "p50": _pct(vals, 0.50),
+                "p95": _pct(vals, 0.95),
+                "max": max(vals) if vals else 0.0,
+                "within_sla": (ok / n) if n else 1.0,
+            }
+
+        with self._lock:
+            out: Dict[str, Any] = {k: _summ(list(v)) for k, v in self._apply_lat.items()}
+            out["usd"] = _summ(list(self._usd_lat))
+            out["clock_offset"] = self._offset
+        return out
@@ -0,0 +1,75 @@
+# map_graph.py — 맵 JSON(floorList/nodeList/edgeList) 로더(omni 의존 없음)
+# - 노드 좌표는 mm 로 통일(맵 JSON 은 m 단위) → Amr3D 의 서버 좌표(mm)와 같은 축
+# - 노드는 nodeLabel / nodeCode 어느 쪽으로도 조회 가능(missionData.position 이 둘 중 하나)
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 이 파일 경로: platform_ext/ui_code/ui/utils/map_graph.py → resource: platform_ext/resource
+_RESOURCE_DIR = Path(__file__).resolve().parents[3] / "resource"
+
+
+def resolve_map_path(map_code: Optional[str]) -> str:
+    """platform_ext/resource/map_<code>_<code>_1pf.json (PathFinderPanel 과 같은 규칙)."""
+    code = map_code or "GBFTT"
+    return str(_RESOURCE_DIR / f"map_{code}_{code}_1pf.json")
+
+
+class MapGraph:
+    def __init__(self):
+        self.nodes: Dict[str, Tuple[float, float]] = {}   # label → (x_mm, y_mm)
+        self.edges: List[Tuple[str, str]] = []            # (beginLabel, endLabel)
+        self._alias: Dict[str, str] = {}                  # nodeCode 등 → label
+        self.path: Optional[str] = None
+
+    @classmethod
+    def load(cls, path: str, *, unit_to_mm: float = 1000.0) -> "MapGraph":
+        g = cls()
+        g.path = path
+        if not path or not os.path.exists(path):
+            print(f"[MapGraph] not found: {path}")
+            return g
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"[MapGraph] load failed: {e}")
+            return g
+
+        for fl in (data or {}).get("floorList") or []:
+            for n in (fl or {}).get("nodeList") or []:
+                label = n.get("nodeLabel")
+                if label is None:
+                    continue
+                try:
+                    x = float(n.get("xCoordinate")) * unit_to_mm
+                    y = float(n.get("yCoordinate")) * unit_to_mm
+                except Exception:
+                    continue
+                label = str(label)
+                g.nodes[label] = (x, y)
+                for k in ("nodeCode", "nodeUuid", "nodeNumber"):
+                    if n.get(k) not in (None, ""):
+                        g._alias[str(n[k])] = label
+            for e in (fl or {}).get("edgeList") or []:
+                a, b = e.get("beginNodeLabel"), e.get("endNodeLabel")
+                if a is not None and b is not None:
+                    g.edges.append((str(a), str(b)))
+        print(f"[MapGraph] nodes={len(g.nodes)} edges={len(g.edges)} ({os.path.basename(path)})")
+        return g
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def position(self, key) -> Optional[Tuple[float, float]]:
+        """nodeLabel 또는 nodeCode → (x_mm, y_mm)."""
+        if key is None:
+            return None
+        key = str(key)
+        p = self.nodes.get(key)
+        if p is None:
+            label = self._alias.get(key)
+            p = self.nodes.get(label) if label is not None else None
+        return p
@@ -0,0 +1,186 @@
+# spatial_index.py — 점/선분 균일 격자 인덱스(NumPy 만, omni 의존 없음)
+# - 생성 1회: 셀 id 로 정렬한 CSR(order + starts) → 셀 한 행의 내용이 order 안에서 연속 구간
+# - 사각형 질의 = 격자 행마다 슬라이스 1개 + 정확한 좌표 필터 → 맵 크기와 무관(결과 수 비례)
+# - k-최근접 / 선분 스냅 = 질의 셀에서 링을 넓혀 가며 후보 수집, 남은 링이 더 멀어지면 중단
+# - 선분은 bbox 가 걸치는 모든 셀에 등록(맵 엣지는 대부분 축 정렬이라 셀 수가 적음)
+
+import math
+from typing import Optional, Tuple
+
+import numpy as np
+
+
+class SpatialGrid:
+    def __init__(self, points=None, segments=None, *, cell: Optional[float] = None):
+        """
+        points: (N,2) x,y / segments: (M,4) x0,y0,x1,y1 (같은 좌표계).
+        cell: 셀 한 변 길이. 생략 시 셀당 점 ~4개가 되도록(셀 수는 최대 ~n 개).
+        """
+        self.points = np.asarray(points if points is not None else np.zeros((0, 2)), dtype=np.float64).reshape(-1, 2)
+        self.segments = np.asarray(segments if segments is not None else np.zeros((0, 4)), dtype=np.float64).reshape(-1, 4)
+
+        allxy = np.concatenate([self.points, self.segments[:, :2], self.segments[:, 2:]])
+        if len(allxy):
+            lo, hi = allxy.min(axis=0), allxy.max(axis=0)
+        else:
+            lo, hi = np.zeros(2), np.ones(2)
+        span = np.maximum(hi - lo, 1e-9)
+        if cell is None:
+            n = max(len(self.points), len(self.segments), 1)
+            # 한 축이 거의 0(일직선 통로 등)이면 면적 기준 셀이 극소 → 긴 축 기준 하한(nx, ny ≤ n + 1)
+            cell = max(math.sqrt(float(span[0] * span[1]) * 4.0 / n), float(span.max()) / n)
+        self.cell = max(float(cell), 1e-9)
+        self.x0, self.y0 = float(lo[0]), float(lo[1])
+        self.nx = int(span[0] // self.cell) + 1
+        self.ny = int(span[1] // self.cell) + 1
+
+        cx, cy = self._cells(self.points[:, 0], self.points[:, 1])
+        self._p_order, self._p_starts = self._csr(cy * self.nx + cx)
+        self._s_ids, self._s_starts = self._build_segment_cells()
+
+    # ───────────────────────── build ─────────────────────────
+    def _cells(self, x, y) -> Tuple[np.ndarray, np.ndarray]:
+        cx = np.clip(((np.asarray(x) - self.x0) // self.cell).astype(np.int64), 0, self.nx - 1)
+        cy = np.clip(((np.asarray(y) - self.y0) // self.cell).astype(np.int64), 0, self.ny - 1)
+        return cx, cy
+
+    def _csr(self, cid: np.ndarray, ids: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(cid, kind="stable")
+        starts = np.searchsorted(cid[order], np.arange(self.nx * self.ny + 1))
+        return (order if ids is None else ids[order]), starts
+
+    def _build_segment_cells(self) -> Tuple[np.ndarray, np.ndarray]:
+        s = self.segments
+        if not len(s):
+            return np.zeros(0, dtype=np.int64), np.zeros(self.nx * self.ny + 1, dtype=np.int64)
+        cx0, cy0 = self._cells(np.minimum(s[:, 0], s[:, 2]), np.minimum(s[:, 1], s[:, 3]))
+        cx1, cy1 = self._cells(np.maximum(s[:, 0], s[:, 2]), np.maximum(s[:, 1], s[:, 3]))
+        w = cx1 - cx0 + 1
+        counts = w * (cy1 - cy0 + 1)
+        seg = np.repeat(np.arange(len(s)), counts)
+        k = np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+        cid = (cy0[seg] + k // w[seg]) * self.nx + (cx0[seg] + k % w[seg])
+        return self._csr(cid, seg)
+
+    # ───────────────────────── cell ranges ─────────────────────────
+    def _gather(self, ids: np.ndarray, starts: np.ndarray, cx0: int, cx1: int, cy0: int, cy1: int) -> np.ndarray:
+        """셀 사각형 [cx0..cx1]×[cy0..cy1] 의 내용(격자 밖은 잘라냄). 행마다 연속 슬라이스 1개."""
+        cx0, cx1 = max(cx0, 0), min(cx1, self.nx - 1)
+        cy0, cy1 = max(cy0, 0), min(cy1, self.ny - 1)
+        if cx0 > cx1 or cy0 > cy1:
+            return ids[:0]
+        parts = [ids[starts[cy * self.nx + cx0]:starts[cy * self.nx + cx1 + 1]] for cy in range(cy0, cy1 + 1)]
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def _ring(self, ids: np.ndarray, starts: np.ndarray, cx: int, cy: int, r: int) -> np.ndarray:
+        """(cx,cy) 에서 체비셰프 거리 정확히 r 인 셀들의 내용."""
+        if r == 0:
+            return self._gather(ids, starts, cx, cx, cy, cy)
+        parts = [self._gather(ids, starts, cx - r, cx + r, cy - r, cy - r),
+                 self._gather(ids, starts, cx - r, cx + r, cy + r, cy + r),
+                 self._gather(ids, starts, cx - r, cx - r, cy - r + 1, cy + r - 1),
+                 self._gather(ids, starts, cx + r, cx + r, cy - r + 1, cy + r - 1)]
+        return np.concatenate(parts)
+
+    def _ring_limit(self, cx: int, cy: int, max_dist: float) -> int:
+        far = max(cx, self.nx - 1 - cx, cy, self.ny - 1 - cy)
+        if math.isfinite(max_dist):
+            far = min(far, int(max_dist // self.cell) + 1)
+        return far
+
+    def _query_cell(self, x: float, y: float) -> Tuple[int, int]:
+        # 격자 밖 질의도 가장 가까운 테두리 셀에서 시작(링 하한은 아래에서 보정)
+        cx, cy = self._cells(x, y)
+        return int(cx), int(cy)
+
+    def _outside(self, x: float, y: float) -> float:
+        """질의점 ~ 격자 경계 거리(격자 안이면 0). 링 r 밖의 하한 = hypot(이 값, r*cell)."""
+        x1 = self.x0 + self.nx * self.cell
+        y1 = self.y0 + self.ny * self.cell
+        dx = max(self.x0 - x, 0.0, x - x1)
+        dy = max(self.y0 - y, 0.0, y - y1)
+        return math.hypot(dx, dy)
+
+    # ───────────────────────── queries ─────────────────────────
+    def query_rect(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """사각형 안의 점 인덱스."""
+        if not len(self.points):
+            return self._p_order[:0]
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        (cx0, cx1), (cy0, cy1) = self._cells([x0, x1], [y0, y1])
+        idx = self._gather(self._p_order, self._p_starts, cx0, cx1, cy0, cy1)
+        p = self.points[idx]
+        keep = (p[:, 0] >= x0) & (p[:, 0] <= x1) & (p[:, 1] >= y0) & (p[:, 1] <= y1)
+        return idx[keep]
+
+    def query_segments(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """bbox 가 사각형과 겹치는 선분 인덱스(컬링용 보수적 판정, 중복 없음)."""
+        if not len(self.segments):
+            return self._s_ids[:0]
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        (cx0, cx1), (cy0, cy1) = self._cells([x0, x1], [y0, y1])
+        idx = np.unique(self._gather(self._s_ids, self._s_starts, cx0, cx1, cy0, cy1))
+        s = self.segments[idx]
+        keep = ((np.minimum(s[:, 0], s[:, 2]) <= x1) & (np.maximum(s[:, 0], s[:, 2]) >= x0) &
+                (np.minimum(s[:, 1], s[:, 3]) <= y1) & (np.maximum(s[:, 1], s[:, 3]) >= y0))
+        return idx[keep]
+
+    def nearest(self, x: float, y: float, k: int = 1,
+                max_dist: float = math.inf) -> Tuple[np.ndarray, np.ndarray]:
+        """가까운 점 최대 k 개 (인덱스, 거리), 거리 오름차순. max_dist 밖은 제외."""
+        k = int(k)
+        if k <= 0 or not len(self.points):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        cx, cy = self._query_cell(x, y)
+        base = self._outside(x, y)
+        found_i = []
+        found_d = []
+        kth = math.inf
+        for r in range(self._ring_limit(cx, cy, max_dist) + 1):
+            idx = self._ring(self._p_order, self._p_starts, cx, cy, r)
+            if len(idx):
+                p = self.points[idx]
+                d = np.hypot(p[:, 0] - x, p[:, 1] - y)
+                found_i.append(idx)
+                found_d.append(d)
+                if sum(len(a) for a in found_i) >= k:
+                    kth = float(np.partition(np.concatenate(found_d), k - 1)[k - 1])
+            # 링 r+1 이후 점들의 거리 하한
+            if kth <= math.hypot(base, r * self.cell):
+                break
+        if not found_i:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        idx = np.concatenate(found_i)
+        d = np.concatenate(found_d)
+        o = np.argsort(d, kind="stable")[:k]
+        o = o[d[o] <= max_dist]
+        return idx[o], d[o]
+
+    def snap(self, x: float, y: float,
+             max_dist: float = math.inf) -> Optional[Tuple[int, float, float, float, float]]:
+        """가장 가까운 선분 위의 점: (선분 인덱스, px, py, t[0..1], 거리). 없으면 None."""
+        if not len(self.segments):
+            return None
+        cx, cy = self._query_cell(x, y)
+        base = self._outside(x, y)
+        best = None
+        for r in range(self._ring_limit(cx, cy, max_dist) + 1):
+            idx = self._ring(self._s_ids, self._s_starts, cx, cy, r)
+            if len(idx):
+                s = self.segments[idx]
+                ax, ay = s[:, 0], s[:, 1]
+                vx, vy = s[:, 2] - ax, s[:, 3] - ay
+                ll = vx * vx + vy * vy
+                t = np.clip(((x - ax) * vx + (y - ay) * vy) / np.where(ll > 0, ll, 1.0), 0.0, 1.0)
+                px, py = ax + t * vx, ay + t * vy
+                d = np.hypot(px - x, py - y)
+                j = int(np.argmin(d))
+                if best is None or d[j] < best[4]:
+                    best = (int(idx[j]), float(px[j]), float(py[j]), float(t[j]), float(d[j]))
+            if best is not None and best[4] <= math.hypot(base, r * self.cell):
+                break
+        if best is None or best[4] > max_dist:
+            return None
+        return best